@@ -0,0 +1,78 @@
+import argparse
+import functools
+import logging
+import re
+import time
+
+import pyoctopus
+from pyoctopus.octopus import Octopus
+from fixture_server import FixtureServer, SyntheticSite
+
+_DETAIL = re.compile(r'href="/detail/(\d+)"')
+_NEXT = re.compile(r'href="(/list/\d+)"')
+
+
+class _Detail:
+    title = pyoctopus.css("h1.title", text=True)
+    price = pyoctopus.css(".price", text=True, converter=pyoctopus.float_converter())
+    tags = pyoctopus.css(".tags .tag", text=True, multi=True)
+    paragraphs = pyoctopus.xpath("//div[@class='desc']/p/text()", multi=True)
+
+
+def _follow(hosts: list[str], res: pyoctopus.Response) -> list[pyoctopus.Request]:
+    # 详情页分散到各个主机，制造跨分片的链接；同一详情页无论从哪个主机的列表页发现，地址都相同
+    base = res.request.url[:res.request.url.index("/list/")]
+    links = [pyoctopus.request(base + path, repeatable=False) for path in _NEXT.findall(res.text)]
+    for id in _DETAIL.findall(res.text):
+        links.append(pyoctopus.request(f"{hosts[int(id) % len(hosts)]}/detail/{id}", repeatable=False))
+    return links
+
+
+def _factory(hosts: list[str], threads: int, shard: int) -> Octopus:
+    processors = [
+        (pyoctopus.url_matcher(r".*/list/\d+$"), functools.partial(_follow, hosts)),
+        (pyoctopus.url_matcher(r".*/detail/\d+$"), pyoctopus.extractor(_Detail)),
+    ]
+    return pyoctopus.new(processors=processors, threads=threads)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Single process crawl vs host-sharded multi-process crawl")
+    parser.add_argument("--hosts", type=int, default=8)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--fan-out", type=int, default=40)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--shards", type=int, default=4)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    site = SyntheticSite(pages=args.pages, fan_out=args.fan_out, size=32 * 1024)
+    # 127.0.0.0/8 都指向本机，每个地址是一个独立的主机
+    servers = [FixtureServer(site, host=f"127.0.0.{i + 1}").start() for i in range(args.hosts)]
+    try:
+        hosts = [s.url for s in servers]
+        seeds = [f"{h}/list/0" for h in hosts]
+        expected = args.hosts * args.pages + site.detail_count
+        for shards in (1, args.shards):
+            for s in servers:
+                s.requests = 0
+            begin = time.perf_counter()
+            if shards == 1:
+                octopus = _factory(hosts, args.threads, 0)
+                octopus.start(*seeds)
+                completed = octopus.get_live_stats()["frontier"]["completed"]
+                routed = 0
+            else:
+                stats = pyoctopus.cluster(functools.partial(_factory, hosts, args.threads), shards).start(*seeds)
+                completed = stats["frontier"]["completed"]
+                routed = stats["routed"]
+            elapsed = time.perf_counter() - begin
+            fetched = sum(s.requests for s in servers)
+            assert completed == expected == fetched, (completed, expected, fetched)
+            print(f"mode=shards_{shards:<3} pages/s={completed / elapsed:.1f} pages={completed} routed={routed}")
+    finally:
+        for s in servers:
+            s.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import argparse
+import os
+import tempfile
+import time
+
+import openpyxl
+
+import pyoctopus
+
+
+class _Record:
+    def __init__(self, i: int):
+        self.id = i
+        self.name = f"项目 {i}"
+        self.url = f"https://example.com/projects/{i}"
+        self.tags = ["python", "crawler", str(i % 7)]
+        self.stars = i * 3
+
+
+_COLUMNS = [
+    pyoctopus.excel_column("id", "编号"),
+    pyoctopus.excel_column("name", "名称"),
+    pyoctopus.excel_column("url", "地址"),
+    pyoctopus.excel_column("tags", "标签", style=pyoctopus.excel_style(delimiter="、")),
+    pyoctopus.excel_column("stars", "星数"),
+]
+
+
+def _run(rows: int, streaming: bool, d: str) -> float:
+    file = os.path.join(d, f"{'streaming' if streaming else 'default'}-{rows}.xlsx")
+    begin = time.perf_counter()
+    collector = pyoctopus.excel_collector(file, columns=_COLUMNS, streaming=streaming)
+    for i in range(rows):
+        collector(_Record(i))
+    collector.close()
+    elapsed = time.perf_counter() - begin
+    wb = openpyxl.load_workbook(file, read_only=True)
+    written = sum(1 for _ in wb.active.iter_rows(values_only=True)) - 1
+    wb.close()
+    assert written == rows, f"expected {rows} rows, got {written}"
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Excel collector benchmark")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--default-rows", type=int, default=200, help="rows for the per-record saving mode")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as d:
+        elapsed = _run(args.default_rows, False, d)
+        print(f"mode=default rows={args.default_rows} elapsed={elapsed:.2f}s rows/s={args.default_rows / elapsed:.0f}")
+        elapsed = _run(args.rows, True, d)
+        print(f"mode=streaming rows={args.rows} elapsed={elapsed:.2f}s rows/s={args.rows / elapsed:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+import functools
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_WORDS = ("octopus", "crawler", "python", "spider", "selector", "request", "response", "store", "collector", "site")
+
+_ROUTE = re.compile(r"^/(list|detail|api/list)/(\d+)$")
+
+
+class SyntheticSite:
+    """
+    确定性生成的合成站点
+
+    /list/<page> 是包含 fan_out 个详情链接和下一页链接的列表页，共 pages 页；
+    /detail/<id> 是大小约为 size 字节的详情页；/api/list/<page> 是与列表页对应的 JSON 接口。
+    """
+
+    def __init__(self, *, pages: int = 10, fan_out: int = 20, size: int = 8 * 1024, seed: int = 0):
+        self.pages = pages
+        self.fan_out = fan_out
+        self.size = size
+        self.seed = seed
+
+    @property
+    def detail_count(self) -> int:
+        return self.pages * self.fan_out
+
+    @property
+    def page_count(self) -> int:
+        return self.pages + self.detail_count
+
+    def _item(self, id: int) -> dict:
+        rnd = random.Random(self.seed * 1_000_003 + id)
+        return {
+            "id": id,
+            "title": " ".join(rnd.choice(_WORDS) for _ in range(4)).title(),
+            "price": round(rnd.uniform(1, 1000), 2),
+            "stars": rnd.randint(0, 100_000),
+            "tags": rnd.sample(_WORDS, 3),
+            "author": {"name": rnd.choice(_WORDS), "url": f"/author/{rnd.randint(1, 1000)}"},
+            "created": f"2024-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d} 12:00:00",
+        }
+
+    @functools.lru_cache(maxsize=4096)
+    def list_page(self, page: int) -> bytes:
+        rows = []
+        for i in range(self.fan_out):
+            item = self._item(page * self.fan_out + i)
+            rows.append(
+                f'<li class="item" data-id="{item["id"]}">'
+                f'<a class="title" href="/detail/{item["id"]}">{item["title"]}</a>'
+                f'<span class="price">{item["price"]}</span><span class="stars">{item["stars"]}</span></li>'
+            )
+        nav = f'<a class="next" href="/list/{page + 1}">next</a>' if page + 1 < self.pages else ""
+        return (
+            f'<html><head><title>List {page}</title></head><body>'
+            f'<ul class="items">{"".join(rows)}</ul>{nav}</body></html>'
+        ).encode("utf-8")
+
+    @functools.lru_cache(maxsize=4096)
+    def detail_page(self, id: int) -> bytes:
+        item = self._item(id)
+        tags = "".join(f'<li class="tag">{t}</li>' for t in item["tags"])
+        head = (
+            f'<html><head><title>{item["title"]}</title></head><body><div id="detail">'
+            f'<h1 class="title">{item["title"]}</h1><div class="price">{item["price"]}</div>'
+            f'<div class="stars">{item["stars"]}</div><ul class="tags">{tags}</ul>'
+            f'<a class="author" href="{item["author"]["url"]}">{item["author"]["name"]}</a>'
+            f'<span class="created">{item["created"]}</span><div class="desc">'
+        )
+        tail = "</div></div></body></html>"
+        rnd = random.Random(id)
+        paragraphs = []
+        remaining = self.size - len(head) - len(tail)
+        while remaining > 0:
+            p = f"<p>{' '.join(rnd.choice(_WORDS) for _ in range(16))}</p>"
+            paragraphs.append(p)
+            remaining -= len(p)
+        return (head + "".join(paragraphs) + tail).encode("utf-8")
+
+    @functools.lru_cache(maxsize=4096)
+    def json_page(self, page: int) -> bytes:
+        data = {
+            "data": [self._item(page * self.fan_out + i) for i in range(self.fan_out)],
+            "meta": {"page": page, "next": f"/api/list/{page + 1}" if page + 1 < self.pages else None},
+        }
+        return json.dumps(data).encode("utf-8")
+
+    def render(self, path: str) -> tuple[bytes, str] | None:
+        m = _ROUTE.match(path)
+        if m is None:
+            return None
+        kind, n = m.group(1), int(m.group(2))
+        if kind == "list" and n < self.pages:
+            return self.list_page(n), "text/html; charset=utf-8"
+        if kind == "detail" and n < self.detail_count:
+            return self.detail_page(n), "text/html; charset=utf-8"
+        if kind == "api/list" and n < self.pages:
+            return self.json_page(n), "application/json; charset=utf-8"
+        return None
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class FixtureServer:
+    """
+    在后台线程运行的本地 HTTP 服务，为基准测试提供合成站点
+
+    latency 为每个响应的固定延迟（秒），用来模拟网络耗时。
+    """
+
+    def __init__(self, site: SyntheticSite = None, *, latency: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        self.site = site or SyntheticSite()
+        self.latency = latency
+        self._address = (host, port)
+        self._server = None
+        self._thread = None
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FixtureServer":
+        fixture = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                with fixture._lock:
+                    fixture.requests += 1
+                if fixture.latency > 0:
+                    time.sleep(fixture.latency)
+                rendered = fixture.site.render(self.path.split("?", 1)[0])
+                if rendered is None:
+                    self.send_error(404)
+                    return
+                body, content_type = rendered
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = _Server(self._address, _Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, name="FixtureServer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FixtureServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+        return False
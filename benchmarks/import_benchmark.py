@@ -0,0 +1,61 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# 只在真正用到时才应该加载的依赖
+_HEAVY = ("curl_cffi", "requests", "redis", "openpyxl", "bs4", "lxml", "jsonpath_ng", "pyarrow")
+
+_SCENARIOS = {
+    "bare": "import pyoctopus",
+    "json_crawler": (
+        "import pyoctopus\n"
+        "octopus = pyoctopus.new(processors=[(pyoctopus.JSON, pyoctopus.extractor(dict, pyoctopus.jsonl_collector('/dev/null')))])\n"
+        "pyoctopus.json('$.data[*].id')"
+    ),
+    "full": "from pyoctopus import *",
+}
+
+_CHILD = """
+import json, sys, time
+begin = time.perf_counter()
+exec(compile({code!r}, "<scenario>", "exec"), {{}})
+elapsed = time.perf_counter() - begin
+print(json.dumps({{"seconds": elapsed, "modules": sorted(m for m in {heavy!r} if m in sys.modules)}}))
+"""
+
+
+def measure(scenario: str, runs: int) -> tuple[float, list[str]]:
+    """
+    在新的解释器中执行场景，返回耗时的中位数（秒）与加载的重量级依赖
+    """
+    code = _CHILD.format(code=_SCENARIOS[scenario], heavy=_HEAVY)
+    times, modules = [], []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        times.append(result["seconds"])
+        modules = result["modules"]
+    return statistics.median(times), modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import time of pyoctopus measured in fresh interpreters")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--check", action="store_true",
+                        help="exit with status 1 if `import pyoctopus` loads any heavy dependency")
+    args = parser.parse_args()
+    failed = False
+    for scenario in _SCENARIOS:
+        seconds, modules = measure(scenario, args.runs)
+        print(f"scenario={scenario:<13} ms={seconds * 1000:8.1f} loaded={','.join(modules) or '-'}")
+        if scenario == "bare" and modules:
+            failed = True
+    if args.check and failed:
+        print("`import pyoctopus` loads heavy dependencies eagerly")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
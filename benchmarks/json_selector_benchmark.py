@@ -0,0 +1,119 @@
+import argparse
+import json
+import random
+import time
+
+from jsonpath_ng import parse
+
+import pyoctopus
+
+
+class _Details:
+    # 与 samples/wallhaven.py 中 WallpaperDetailsResponse 相同的 18 个字段
+    id = pyoctopus.json("$.data.id")
+    url = pyoctopus.json("$.data.url")
+    short_url = pyoctopus.json("$.data.short_url")
+    ratio = pyoctopus.json("$.data.ratio", converter=pyoctopus.float_converter())
+    category = pyoctopus.json("$.data.category")
+    purity = pyoctopus.json("$.data.purity")
+    width = pyoctopus.json("$.data.dimension_x", converter=pyoctopus.int_converter())
+    height = pyoctopus.json("$.data.dimension_y", converter=pyoctopus.int_converter())
+    file_size = pyoctopus.json("$.data.file_size", converter=pyoctopus.int_converter())
+    file_type = pyoctopus.json("$.data.file_type")
+    created_at = pyoctopus.json("$.data.created_at")
+    src = pyoctopus.json("$.data.path")
+    colors = pyoctopus.json("$.data.colors[*]", multi=True)
+    tags = pyoctopus.json("$.data.tags[*].name", multi=True)
+    uploader = pyoctopus.json("$.data.uploader.username")
+    large_url = pyoctopus.json("$.data.thumbs.large")
+    original_url = pyoctopus.json("$.data.thumbs.original")
+    small_url = pyoctopus.json("$.data.thumbs.small")
+
+
+def _document(rnd: random.Random) -> dict:
+    id = "".join(rnd.choice("abcdefghijklmnopqrstuvwxyz0123456789") for _ in range(6))
+    return {
+        "data": {
+            "id": id,
+            "url": f"https://wallhaven.cc/w/{id}",
+            "short_url": f"https://whvn.cc/{id}",
+            "uploader": {"username": "user", "group": "User", "avatar": {"200px": "https://example.com/a.png"}},
+            "views": rnd.randint(0, 100000),
+            "favorites": rnd.randint(0, 1000),
+            "source": "",
+            "purity": "sfw",
+            "category": "general",
+            "dimension_x": 3840,
+            "dimension_y": 2160,
+            "resolution": "3840x2160",
+            "ratio": "1.78",
+            "file_size": rnd.randint(100000, 9000000),
+            "file_type": "image/jpeg",
+            "created_at": "2024-01-01 00:00:00",
+            "colors": ["#000000", "#424153", "#999999", "#cccccc", "#ffffff"],
+            "path": f"https://w.wallhaven.cc/full/{id[:2]}/wallhaven-{id}.jpg",
+            "thumbs": {
+                "large": f"https://th.wallhaven.cc/lg/{id[:2]}/{id}.jpg",
+                "original": f"https://th.wallhaven.cc/orig/{id[:2]}/{id}.jpg",
+                "small": f"https://th.wallhaven.cc/small/{id[:2]}/{id}.jpg",
+            },
+            "tags": [{"id": i, "name": f"tag{i}", "alias": "", "category_id": 1, "purity": "sfw"} for i in range(12)],
+        }
+    }
+
+
+def _legacy_select(selector, parser, content: str):
+    # 重构前 Json 选择器的实现：每个字段都解码一次正文并使用 jsonpath_ng 查找
+    matches = parser.find(json.loads(content))
+    selected = [(x.value if isinstance(x.value, str) else json.dumps(x.value)) if x.value is not None else ''
+                for x in matches]
+    selected = selected if selector.multi else ([selected[0]] if selected else [])
+    selected = [x.strip() for x in selected]
+    selected = [x for x in selected if x]
+    if selector.converter:
+        if selector.multi:
+            selected = [selector.converter(x) for x in selected]
+        else:
+            selected = [selector.converter(selected[0]) if selected else selector.converter(None)]
+    return selected if selector.multi else (selected[0] if selected else None)
+
+
+def _legacy(responses: list[pyoctopus.Response]) -> list[dict]:
+    selectors = {k: (v, parse(v.expr)) for k, v in _Details.__dict__.items()
+                 if isinstance(v, pyoctopus.selector.selector.Selector)}
+    return [{k: _legacy_select(s, p, res.text) for k, (s, p) in selectors.items()} for res in responses]
+
+
+def _current(responses: list[pyoctopus.Response]) -> list[dict]:
+    return [pyoctopus.select(res.text, res, _Details)[0].__dict__ for res in responses]
+
+
+def _responses(n: int) -> list[pyoctopus.Response]:
+    rnd = random.Random(0)
+    request = pyoctopus.request("https://wallhaven.cc/api/v1/w/x")
+    return [pyoctopus.response(request, 200, json.dumps(_document(rnd)).encode("utf-8")) for _ in range(n)]
+
+
+def _run(fn, n: int) -> tuple[float, list[dict]]:
+    # 每次使用新的响应，避免复用上一轮解码的结果
+    responses = _responses(n)
+    begin = time.perf_counter()
+    results = fn(responses)
+    return n / (time.perf_counter() - begin), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON selector benchmark on a wallhaven-like detail response")
+    parser.add_argument("--responses", type=int, default=2000)
+    args = parser.parse_args()
+
+    legacy_rate, legacy = _run(_legacy, args.responses)
+    print(f"mode=legacy  responses/s={legacy_rate:.0f}")
+    current_rate, current = _run(_current, args.responses)
+    print(f"mode=current responses/s={current_rate:.0f} ({current_rate / legacy_rate:.1f}x)")
+    if legacy != current:
+        raise RuntimeError("results differ between legacy and current selectors")
+
+
+if __name__ == "__main__":
+    main()
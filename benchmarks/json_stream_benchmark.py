@@ -0,0 +1,59 @@
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+import pyoctopus
+
+
+class _Item:
+    id = pyoctopus.json("$.id", converter=pyoctopus.int_converter())
+    name = pyoctopus.json("$.name")
+    tags = pyoctopus.json("$.tags[*]", multi=True)
+    score = pyoctopus.json("$.meta.score", converter=pyoctopus.float_converter())
+
+
+def _body(n: int) -> bytes:
+    data = [{"id": i, "name": f"item {i}", "tags": ["a", "b"], "meta": {"score": i / 3}, "pad": "x" * 50}
+            for i in range(n)]
+    return json.dumps({"total": n, "data": data}).encode("utf-8")
+
+
+def _run(selector, body: bytes, trace: bool) -> tuple[int, float, float]:
+    res = pyoctopus.response(pyoctopus.request("https://example.com/api/items"), 200, body)
+    count = 0
+
+    def _collect(_):
+        nonlocal count
+        count += 1
+
+    process = pyoctopus.stream_extractor(pyoctopus.embedded(selector, _Item), _collect)
+    gc.collect()
+    if trace:
+        tracemalloc.start()
+    begin = time.perf_counter()
+    process(res)
+    elapsed = time.perf_counter() - begin
+    peak = 0
+    if trace:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return count, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming vs in-memory extraction of a large JSON array")
+    parser.add_argument("--items", type=int, default=100_000)
+    args = parser.parse_args()
+    body = _body(args.items)
+    print(f"body={len(body) / 1e6:.1f}MB items={args.items}")
+    for mode, factory in [("json", pyoctopus.json), ("json_stream", pyoctopus.json_stream)]:
+        # 吞吐与峰值内存分开测量，tracemalloc 会显著拖慢解析
+        count, elapsed, _ = _run(factory("$.data[*]", multi=True), body, False)
+        _, _, peak = _run(factory("$.data[*]", multi=True), body, True)
+        print(f"mode={mode:<12} items/s={count / elapsed:.0f} peak={peak / 1e6:.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
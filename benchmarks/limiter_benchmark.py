@@ -0,0 +1,56 @@
+import argparse
+import threading
+import time
+
+import pyoctopus
+
+
+def _contend(limiter, threads: int, seconds: float, blocking: bool) -> tuple[int, int]:
+    acquired = [0] * threads
+    attempts = [0] * threads
+    start = threading.Barrier(threads + 1)
+    deadline = [0.0]
+
+    def _run(i: int):
+        start.wait()
+        while time.monotonic() < deadline[0]:
+            attempts[i] += 1
+            if blocking:
+                if limiter.acquire(timeout_milliseconds=50):
+                    acquired[i] += 1
+            elif limiter.try_acquire() == 0:
+                acquired[i] += 1
+
+    workers = [threading.Thread(target=_run, args=(i,)) for i in range(threads)]
+    for w in workers:
+        w.start()
+    deadline[0] = time.monotonic() + seconds
+    start.wait()
+    for w in workers:
+        w.join()
+    return sum(acquired), sum(attempts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Limiter contention benchmark")
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=2)
+    parser.add_argument("--rate", type=float, default=5000)
+    parser.add_argument("--burst", type=int, default=10)
+    args = parser.parse_args()
+
+    for blocking in (False, True):
+        limiter = pyoctopus.rate_limiter(args.rate, args.burst)
+        begin = time.monotonic()
+        acquired, attempts = _contend(limiter, args.threads, args.seconds, blocking)
+        elapsed = time.monotonic() - begin
+        expected = args.rate * elapsed + args.burst
+        print(
+            f"mode={'acquire' if blocking else 'try_acquire'} threads={args.threads} elapsed={elapsed:.3f}s "
+            f"attempts/s={attempts / elapsed:.0f} acquired={acquired} expected<={expected:.0f} "
+            f"accuracy={acquired / expected:.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
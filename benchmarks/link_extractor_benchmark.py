@@ -0,0 +1,76 @@
+import argparse
+import random
+import time
+from urllib.parse import urljoin, urlsplit
+
+import pyoctopus
+
+
+@pyoctopus.hyperlink(pyoctopus.link(pyoctopus.css("a", multi=True, attr="href"), repeatable=False))
+class _Links:
+    pass
+
+
+def _page(anchors: int) -> bytes:
+    rnd = random.Random(0)
+    rows = []
+    for i in range(anchors):
+        kind = rnd.random()
+        if kind < 0.6:
+            href = f"/item/{rnd.randint(0, anchors)}?page={rnd.randint(1, 9)}"
+        elif kind < 0.8:
+            href = f"https://example.com/tag/{rnd.randint(0, 100)}#top"
+        elif kind < 0.9:
+            href = f"https://other.com/{i}"
+        else:
+            href = f"detail/{i}.html"
+        rows.append(f'<li><a href="{href}">link {i}</a> <span style="color: red">{i}</span></li>')
+    return f'<html><body><ul>{"".join(rows)}</ul></body></html>'.encode("utf-8")
+
+
+def _legacy(res: pyoctopus.Response) -> set[str]:
+    # 通过结果类的链接选择所有 a 标签，再像 Octopus 那样逐个解析为绝对地址，最后按同主机过滤并去重
+    process = pyoctopus.extractor(_Links)
+    host = urlsplit(res.request.url).hostname
+    urls = set()
+    for r in process(res):
+        url = r.url if r.url.startswith("http") else urljoin(res.request.url, r.url)
+        url = url.split("#")[0]
+        if urlsplit(url).hostname == host:
+            urls.add(url)
+    return urls
+
+
+def _fast(res: pyoctopus.Response) -> set[str]:
+    return {r.url for r in pyoctopus.link_extractor()(res)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Link discovery on a page with many anchors")
+    parser.add_argument("--anchors", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    body = _page(args.anchors)
+    request = pyoctopus.request("https://example.com/list/1")
+    base_rate = None
+    base = None
+    for mode, fn in [("css", _legacy), ("link_extractor", _fast)]:
+        elapsed = 0
+        for _ in range(args.repeat):
+            res = pyoctopus.response(request, 200, body)
+            _ = res.text
+            begin = time.perf_counter()
+            urls = fn(res)
+            elapsed += time.perf_counter() - begin
+        rate = args.repeat / elapsed
+        if base is None:
+            base_rate, base = rate, urls
+            print(f"mode={mode:<14} pages/s={rate:.1f} links={len(urls)}")
+            continue
+        print(f"mode={mode:<14} pages/s={rate:.1f} links={len(urls)} ({rate / base_rate:.1f}x)")
+        if urls != base:
+            raise RuntimeError(f"links differ between css and {mode}")
+
+
+if __name__ == "__main__":
+    main()
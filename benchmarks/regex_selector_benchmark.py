@@ -0,0 +1,119 @@
+import argparse
+import random
+import re
+import time
+
+import pyoctopus
+
+
+def _fields() -> dict[str, tuple[str, int | list[int], bool]]:
+    # 豆瓣电影详情页常用的正则字段：表达式、分组、是否多值
+    return {
+        "title": (r'<span property="v:itemreviewed">([^<]*)</span>', 1, False),
+        "year": (r'<span class="year">\((\d+)\)</span>', 1, False),
+        "rating": (r'<strong class="ll rating_num" property="v:average">([\d.]*)</strong>', 1, False),
+        "votes": (r'<span property="v:votes">(\d+)</span>', 1, False),
+        "genres": (r'<span property="v:genre">([^<]*)</span>', 1, True),
+        "runtime": (r'<span property="v:runtime" content="(\d+)">', 1, False),
+        "directors": (r'<a href="/celebrity/(\d+)/" rel="v:directedBy">([^<]*)</a>', [1, 2], True),
+        "actors": (r'<a href="/celebrity/(\d+)/" rel="v:starring">([^<]*)</a>', 2, True),
+        "summary": (r'<span property="v:summary"[^>]*>([^<]*)</span>', 1, False),
+        "og_title": (r'<meta property="og:title" content="([^"]*)"', 1, False),
+        "og_description": (r'<meta property="og:description" content="([^"]*)"', 1, False),
+        "og_url": (r'<meta property="og:url" content="([^"]*)"', 1, False),
+        "og_image": (r'<meta property="og:image" content="([^"]*)"', 1, False),
+        "og_type": (r'<meta property="og:type" content="([^"]*)"', 1, False),
+        "og_site_name": (r'<meta property="og:site_name" content="([^"]*)"', 1, False),
+        "video_release_date": (r'<meta property="video:release_date" content="([^"]*)"', 1, False),
+        "video_duration": (r'<meta property="video:duration" content="(\d+)"', 1, False),
+    }
+
+
+def _result_class(**kwargs) -> type:
+    return type("_Movie", (), {k: pyoctopus.regex(e, g, multi=m, **kwargs) for k, (e, g, m) in _fields().items()})
+
+
+def _page(rnd: random.Random) -> str:
+    filler = "".join(f'<div class="item"><a href="/subject/{rnd.randint(1, 10 ** 7)}/">相关推荐 {i}</a></div>\n'
+                     for i in range(300))
+    actors = "".join(f'<a href="/celebrity/{rnd.randint(1, 10 ** 6)}/" rel="v:starring">演员{i}</a> / '
+                     for i in range(20))
+    meta = "".join(f'<meta property="og:{k}" content="{v}" />\n'
+                   for k, v in [("title", "肖申克的救赎"), ("description", "一场谋杀案使银行家安迪蒙冤入狱"),
+                                ("url", "https://movie.douban.com/subject/1292052/"), ("type", "video.movie"),
+                                ("image", "https://img2.doubanio.com/view/photo/s_ratio_poster/public/p480747492.jpg"),
+                                ("site_name", "豆瓣")])
+    return f"""<html><head><title>电影</title>
+<meta property="video:release_date" content="1994-09-10" /><meta property="video:duration" content="8520" />
+{meta}</head><body>{filler}
+<span property="v:itemreviewed">肖申克的救赎 The Shawshank Redemption</span><span class="year">(1994)</span>
+<a href="/celebrity/1047973/" rel="v:directedBy">弗兰克·德拉邦特</a>
+{actors}
+<span property="v:genre">剧情</span> / <span property="v:genre">犯罪</span>
+<span property="v:runtime" content="142">142分钟</span>
+<strong class="ll rating_num" property="v:average">9.7</strong><span property="v:votes">{rnd.randint(1, 10 ** 6)}</span>
+<span property="v:summary" class="">  一场谋杀案使银行家安迪蒙冤入狱……  </span>
+{filler}</body></html>"""
+
+
+def _legacy(responses: list[pyoctopus.Response]) -> list[dict]:
+    # 重构前 Regex 选择器的实现：每次选择都用表达式字符串调用 re.finditer
+    fields = _fields()
+    results = []
+    for res in responses:
+        r = {}
+        for k, (expr, group, multi) in fields.items():
+            groups = group if isinstance(group, list) else [group]
+            selected = [''.join([m.group(g) for g in groups]) for m in re.finditer(expr, res.text)]
+            selected = selected if multi else selected[:1]
+            selected = [x.strip() for x in selected]
+            selected = [x for x in selected if x]
+            r[k] = selected if multi else (selected[0] if selected else None)
+        results.append(r)
+    return results
+
+
+def _current(**kwargs):
+    cls = _result_class(**kwargs)
+
+    def _select(responses: list[pyoctopus.Response]) -> list[dict]:
+        # 与 extractor 相同，不指定内容时选择响应正文，binary 的字段不解码正文
+        return [pyoctopus.select(None, res, cls)[0].__dict__ for res in responses]
+
+    return _select
+
+
+def _responses(request: pyoctopus.Request, bodies: list[bytes]) -> list[pyoctopus.Response]:
+    # 每种模式使用新的响应，解码正文的开销计入各自的耗时，也不复用上一种模式的选择结果
+    return [pyoctopus.response(request, 200, body) for body in bodies]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regex selector benchmark on a douban-like movie page")
+    parser.add_argument("--responses", type=int, default=500)
+    args = parser.parse_args()
+    rnd = random.Random(0)
+    request = pyoctopus.request("https://movie.douban.com/subject/1292052/")
+    bodies = [_page(rnd).encode("utf-8") for _ in range(args.responses)]
+    base_rate = None
+    base = None
+    for mode, fn in [("legacy", _legacy),
+                     ("compiled", _current()),
+                     ("combined", _current(combine=True)),
+                     ("binary", _current(binary=True)),
+                     ("binary+combined", _current(binary=True, combine=True))]:
+        responses = _responses(request, bodies)
+        begin = time.perf_counter()
+        results = fn(responses)
+        rate = len(responses) / (time.perf_counter() - begin)
+        if base is None:
+            base_rate, base = rate, results
+            print(f"mode={mode:<16} responses/s={rate:.0f}")
+            continue
+        print(f"mode={mode:<16} responses/s={rate:.0f} ({rate / base_rate:.1f}x)")
+        if results != base:
+            raise RuntimeError(f"results differ between legacy and {mode} selectors")
+
+
+if __name__ == "__main__":
+    main()
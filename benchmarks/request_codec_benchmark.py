@@ -0,0 +1,76 @@
+import argparse
+import time
+
+import pyoctopus
+from pyoctopus.octopus import _Lineage
+from pyoctopus.request import State
+from pyoctopus.store.codec import RequestCodec
+
+_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
+    "Cookie": "session=" + "0123456789abcdef" * 8,
+}
+
+_ATTRS = {"category": "books", "keyword": "python", "page": 1}
+
+
+def _requests(parents: int, fan_out: int) -> list[pyoctopus.Request]:
+    octopus = pyoctopus.new()
+    canonicalizer = pyoctopus.canonicalizer()
+    requests = []
+    for i in range(parents):
+        p = pyoctopus.request(f"https://example.com/list/{i}", headers=dict(_HEADERS), attrs=dict(_ATTRS))
+        p.id = canonicalizer.request_id(p)
+        lineage = _Lineage(p)
+        for j in range(fan_out):
+            r = pyoctopus.request(f"https://example.com/detail/{i}/{j}", inherit=True, priority=j % 3)
+            octopus._prepare(r, p, lineage)
+            r.state = State.WAITING
+            requests.append(r)
+    return requests
+
+
+def _run(requests: list[pyoctopus.Request], encode, decode) -> tuple[float, float, int]:
+    begin = time.perf_counter()
+    blobs = [encode(r) for r in requests]
+    encoded = time.perf_counter() - begin
+    begin = time.perf_counter()
+    for b in blobs:
+        decode(b)
+    decoded = time.perf_counter() - begin
+    return len(requests) / encoded, len(requests) / decoded, sum(len(b) for b in blobs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Request serialization benchmark: JSON vs binary codec")
+    parser.add_argument("--parents", type=int, default=100)
+    parser.add_argument("--fan-out", type=int, default=200)
+    args = parser.parse_args()
+    requests = _requests(args.parents, args.fan_out)
+    n = len(requests)
+
+    encode_rate, decode_rate, size = _run(requests, lambda r: r.to_json().encode("utf-8"), pyoctopus.Request.from_json)
+    print(f"codec=json   encode/s={encode_rate:.0f} decode/s={decode_rate:.0f} bytes/request={size / n:.0f}")
+
+    dictionary = {}
+    codec = RequestCodec(dictionary.get, dictionary.__setitem__)
+    encode_rate, decode_rate, size = _run(requests, codec.encode, codec.decode)
+    dict_size = sum(len(k) + len(v) for k, v in dictionary.items())
+    print(
+        f"codec=binary encode/s={encode_rate:.0f} decode/s={decode_rate:.0f} bytes/request={size / n:.0f} "
+        f"dictionary={len(dictionary)} entries/{dict_size} bytes ({(size + dict_size) / n:.0f} bytes/request amortized)"
+    )
+
+    # 解码端没有本地缓存（例如另一个进程）时需要从字典中取回请求头
+    cold = RequestCodec(dictionary.get, dictionary.__setitem__)
+    blobs = [codec.encode(r) for r in requests]
+    begin = time.perf_counter()
+    for b in blobs:
+        cold.decode(b)
+    print(f"codec=binary cold decode/s={n / (time.perf_counter() - begin):.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import argparse
+import hashlib
+import random
+import time
+from urllib.parse import parse_qs, urlencode, urlparse
+
+import pyoctopus
+
+
+def _legacy_request_id(r: pyoctopus.Request) -> str:
+    # 重构前 octopus._generate_request_id 的实现
+    parsed_url = urlparse(r.url)
+    existing_params = parse_qs(parsed_url.query)
+    if r.queries:
+        for k, v in r.queries.items():
+            existing_params[k] = sorted([*existing_params.get(k, []), *(v or [])])
+    url = parsed_url._replace(query=urlencode(sorted(existing_params.items()), doseq=True)).geturl()
+    if r.data:
+        url = f"{url}&{r.data}"
+    return hashlib.md5(f"{r.method}{url}".encode("utf-8")).hexdigest()
+
+
+def _urls(n: int, distinct: int) -> list[str]:
+    rnd = random.Random(0)
+    base = [
+        f"https://Example.com:443/items/{i}?page={i % 50}&sort=desc&utm_source=feed&utm_medium=rss#reviews"
+        for i in range(distinct)
+    ]
+    return [rnd.choice(base) for _ in range(n)]
+
+
+def _run(urls: list[str], fn) -> tuple[float, int]:
+    requests = [pyoctopus.request(u) for u in urls]
+    begin = time.perf_counter()
+    ids = {fn(r) for r in requests}
+    return len(requests) / (time.perf_counter() - begin), len(ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Request id generation benchmark")
+    parser.add_argument("--requests", type=int, default=200_000)
+    parser.add_argument("--distinct", type=int, default=20_000, help="distinct urls among the requests")
+    args = parser.parse_args()
+    urls = _urls(args.requests, args.distinct)
+
+    rate, ids = _run(urls, _legacy_request_id)
+    print(f"mode=legacy        ids/s={rate:.0f} unique={ids}")
+    rate, ids = _run(urls, pyoctopus.canonicalizer(cache_size=0).request_id)
+    print(f"mode=canonical     ids/s={rate:.0f} unique={ids}")
+    rate, ids = _run(urls, pyoctopus.canonicalizer().request_id)
+    print(f"mode=canonical+lru ids/s={rate:.0f} unique={ids}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import argparse
+import gc
+import hashlib
+import re
+import tracemalloc
+
+import pyoctopus
+from pyoctopus.octopus import _Lineage
+
+_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
+    "Cookie": "session=" + "0123456789abcdef" * 8,
+    "Authorization": "Bearer " + "abcdefghijklmnopqrstuvwxyz" * 4,
+}
+
+_ATTRS = {"category": "books", "keyword": "python", "page": 1}
+
+_REGEX_REFERER = re.compile(r"^(https?://([^/]+)).*$")
+
+
+class _DictRequest:
+    """
+    重构前的 Request：普通对象，每个请求持有自己的 queries、headers、attrs 字典
+    """
+
+    def __init__(self, url: str, *, headers: dict = None, attrs: dict = None, inherit: bool = False):
+        self.url = url
+        self.method = "GET"
+        self.queries = {}
+        self.data = None
+        self.headers = {} if headers is None else headers
+        self.priority = 0
+        self.repeatable = True
+        self.attrs = {} if attrs is None else attrs
+        self.inherit = inherit
+        self.not_before = None
+        self.parent = None
+        self.id = None
+        self.state = None
+        self.msg = None
+        self.depth = 1
+
+    def is_delayed(self, now: float = None) -> bool:
+        return False
+
+
+def _legacy_request_id(r) -> str:
+    # 重构前的请求 ID：URL 没有查询参数时等价于 md5(method + url)
+    return hashlib.md5(f"{r.method}{r.url}".encode("utf-8")).hexdigest()
+
+
+def _legacy_add(r: _DictRequest, p: _DictRequest):
+    # 重构前 Octopus._add 的逻辑
+    r.parent = p.id
+    r.depth = p.depth + 1
+    if r.inherit:
+        r.headers = {**p.headers, **r.headers}
+        r.attrs = {**p.attrs, **r.attrs}
+    if r.headers.get("Referer", None) is None:
+        m = _REGEX_REFERER.match(p.url)
+        if m is not None:
+            r.headers["Referer"] = m.group(1)
+    r.id = _legacy_request_id(r)
+    r.msg = "等待处理"
+
+
+def _legacy(parents: int, fan_out: int) -> pyoctopus.Store:
+    store = pyoctopus.memory_store()
+    for i in range(parents):
+        p = _DictRequest(f"https://example.com/list/{i}", headers=dict(_HEADERS), attrs=dict(_ATTRS))
+        p.id = _legacy_request_id(p)
+        for j in range(fan_out):
+            r = _DictRequest(f"https://example.com/detail/{i}/{j}", inherit=j % 4 != 0)
+            _legacy_add(r, p)
+            store.put(r)
+    return store
+
+
+def _current(parents: int, fan_out: int) -> pyoctopus.Store:
+    store = pyoctopus.memory_store()
+    octopus = pyoctopus.new(store=store)
+    for i in range(parents):
+        p = pyoctopus.request(f"https://example.com/list/{i}", headers=dict(_HEADERS), attrs=dict(_ATTRS))
+        p.id = _legacy_request_id(p)
+        lineage = _Lineage(p)
+        for j in range(fan_out):
+            octopus._add(pyoctopus.request(f"https://example.com/detail/{i}/{j}", inherit=j % 4 != 0), p, lineage)
+        # 把入队队列中的请求批量写入存储
+        octopus._drain_intake()
+    return store
+
+
+def _measure(fn, *args) -> tuple[int, object]:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = fn(*args)
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bytes per queued request, measured with tracemalloc")
+    parser.add_argument("--parents", type=int, default=200)
+    parser.add_argument("--fan-out", type=int, default=100)
+    args = parser.parse_args()
+    n = args.parents * args.fan_out
+
+    legacy, _ = _measure(_legacy, args.parents, args.fan_out)
+    current, _ = _measure(_current, args.parents, args.fan_out)
+    print(f"requests={n} inherit=75%")
+    print(f"mode=dict    bytes/request={legacy / n:.0f}")
+    print(f"mode=current bytes/request={current / n:.0f} ({current / legacy - 1:+.1%})")
+
+
+if __name__ == "__main__":
+    main()
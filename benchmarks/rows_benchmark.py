@@ -0,0 +1,77 @@
+import argparse
+import random
+import time
+
+import pyoctopus
+
+
+class _Item:
+    title = pyoctopus.css(".title a", text=True)
+    url = pyoctopus.css(".title a", attr="href", format_str="https://example.com{}")
+    price = pyoctopus.css(".price", text=True, converter=pyoctopus.float_converter())
+    stars = pyoctopus.css(".stars", text=True, converter=pyoctopus.int_converter())
+    tags = pyoctopus.css(".tag", text=True, multi=True)
+    author = pyoctopus.css("a.author", attr="href")
+    summary = pyoctopus.css(".summary", text=True)
+
+
+class _XpathItem:
+    title = pyoctopus.xpath("//div[@class='title']/a/text()")
+    url = pyoctopus.xpath("//div[@class='title']/a/@href", format_str="https://example.com{}")
+    price = pyoctopus.xpath("//div[@class='price']/text()", converter=pyoctopus.float_converter())
+    stars = pyoctopus.xpath("//div[@class='stars']/text()", converter=pyoctopus.int_converter())
+    tags = pyoctopus.xpath("//li[@class='tag']/text()", multi=True)
+    author = pyoctopus.xpath("//a[@class='author']/@href")
+    summary = pyoctopus.xpath("//p[@class='summary']/text()")
+
+
+def _page(rows: int) -> str:
+    rnd = random.Random(0)
+    items = "".join(f"""
+<li class="item">
+  <div class="title"><a href="/items/{i}">Item {i}</a></div>
+  <div class="price">{rnd.randint(100, 99999) / 100}</div>
+  <div class="stars">{rnd.randint(0, 5000)}</div>
+  <ul class="tags">{"".join(f'<li class="tag">tag{rnd.randint(0, 50)}</li>' for _ in range(3))}</ul>
+  <a class="author" href="/users/{rnd.randint(1, 1000)}">author</a>
+  <p class="summary">{"lorem ipsum " * rnd.randint(5, 20)}</p>
+</li>""" for i in range(rows))
+    return f"<html><head><title>items</title></head><body><ul class=\"items\">{items}</ul></body></html>"
+
+
+def _list_class(embedded) -> type:
+    return type("_List", (), {"items": embedded})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Row extraction of a list page: embedded vs rows")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    body = _page(args.rows).encode("utf-8")
+    res = pyoctopus.response(pyoctopus.request("https://example.com/items"), 200, body)
+    print(f"body={len(body) / 1e3:.0f}KB rows={args.rows}")
+    for family, row, item in [("css", pyoctopus.css(".items .item", multi=True), _Item),
+                              ("xpath", pyoctopus.xpath("//li[@class='item']", multi=True), _XpathItem)]:
+        base_rate = None
+        base = None
+        for mode, factory in [("embedded", pyoctopus.embedded), ("rows", pyoctopus.rows)]:
+            cls = _list_class(factory(row, item))
+            begin = time.perf_counter()
+            for _ in range(args.repeat):
+                result = pyoctopus.select(res.text, res, cls)[0]
+                # 每次都从头解析，不复用上一次的解析树和选择结果
+                res.release()
+            rate = args.repeat * args.rows / (time.perf_counter() - begin)
+            values = [r.__dict__ for r in result.items]
+            if base is None:
+                base_rate, base = rate, values
+                print(f"selector={family:<5} mode={mode:<8} rows/s={rate:.0f}")
+                continue
+            print(f"selector={family:<5} mode={mode:<8} rows/s={rate:.0f} ({rate / base_rate:.1f}x)")
+            if values != base:
+                raise RuntimeError(f"results differ between embedded and rows with {family} selectors")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import argparse
+import time
+
+import pyoctopus
+from fixture_server import SyntheticSite
+
+
+class _Item:
+    title = pyoctopus.css("a.title", text=True)
+    url = pyoctopus.css("a.title", attr="href")
+    price = pyoctopus.css("span.price", text=True, converter=pyoctopus.float_converter())
+    stars = pyoctopus.css("span.stars", text=True, converter=pyoctopus.int_converter())
+
+
+class _ListPage:
+    title = pyoctopus.xpath("//title/text()")
+    items = pyoctopus.embedded(pyoctopus.css("ul.items li.item", multi=True), _Item)
+
+
+@pyoctopus.hyperlink(pyoctopus.link(pyoctopus.css("ul.items li.item a.title", attr="href", multi=True)),
+                     pyoctopus.link(pyoctopus.css("a.next", attr="href")))
+class _ListLinks:
+    # 只产生链接的结果类，与 _ListPage 使用结构相同的选择器
+    title = pyoctopus.xpath("//title/text()")
+
+
+def _run(pages: list[bytes], shared: bool) -> float:
+    processors = [pyoctopus.extractor(_ListPage, lambda _: None), pyoctopus.extractor(_ListLinks)]
+    request = pyoctopus.request("https://example.com/list/0")
+    responses = [pyoctopus.response(request, 200, page) for page in pages]
+    for res in responses:
+        _ = res.text
+    begin = time.perf_counter()
+    for res in responses:
+        for p in processors:
+            p(res)
+            if not shared:
+                # 模拟每个处理器各自解析和选择
+                res.release()
+        res.release()
+    return len(responses) / (time.perf_counter() - begin)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Two processors on one list page: isolated vs shared extraction")
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--fan-out", type=int, default=100)
+    args = parser.parse_args()
+    site = SyntheticSite(pages=args.pages, fan_out=args.fan_out)
+    pages = [site.list_page(i) for i in range(args.pages)]
+    isolated = _run(pages, False)
+    print(f"mode=isolated responses/s={isolated:.0f}")
+    shared = _run(pages, True)
+    print(f"mode=shared   responses/s={shared:.0f} ({shared / isolated:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
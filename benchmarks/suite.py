@@ -0,0 +1,370 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import pyoctopus
+from pyoctopus.octopus import State as OctopusState
+from pyoctopus.request import State
+
+from fixture_server import FixtureServer, SyntheticSite
+from import_benchmark import measure as measure_import
+
+_LINK = re.compile(rb'href="(/(?:list|detail)/\d+)"')
+
+# name -> (function, unit)，所有指标都是越大越好
+_BENCHMARKS = {}
+
+
+def _benchmark(name: str, unit: str):
+    def decorator(fn):
+        _BENCHMARKS[name] = (fn, unit)
+        return fn
+
+    return decorator
+
+
+class _Config:
+    def __init__(self, args: argparse.Namespace):
+        scale = 0.1 if args.quick else 1
+        self.threads = args.threads
+        self.latency = args.latency
+        self.pages = max(2, int(args.pages * scale))
+        self.fan_out = args.fan_out
+        self.size = args.size
+        self.requests = int(20_000 * scale)
+        self.records = int(50_000 * scale)
+        self.selects = int(500 * scale)
+        self.redis = args.redis
+        self.quick = args.quick
+
+
+# ---------------------------------------------------------------- dispatcher
+
+
+def _crawl(config: _Config, store_factory) -> float:
+    site = SyntheticSite(pages=config.pages, fan_out=config.fan_out, size=config.size)
+
+    def _follow(res: pyoctopus.Response) -> list[pyoctopus.Request]:
+        return [pyoctopus.request(u.decode()) for u in _LINK.findall(res.content)]
+
+    with FixtureServer(site, latency=config.latency) as server, tempfile.TemporaryDirectory() as d:
+        store = store_factory(d)
+        octopus = pyoctopus.new(
+            store=store,
+            processors=[(pyoctopus.url_matcher(r".*/list/\d+$"), _follow)],
+            threads=config.threads,
+            retries=0,
+        )
+        begin = time.perf_counter()
+        octopus.start(f"{server.url}/list/0")
+        elapsed = time.perf_counter() - begin
+        # 爬虫在单独的线程中停止，等待停止完成后再清理临时目录
+        while octopus.state != OctopusState.STOPPED:
+            time.sleep(0.01)
+        completed = store.get_statistics()[3]
+        if completed != site.page_count:
+            raise RuntimeError(f"expected {site.page_count} pages, got {completed}")
+    return site.page_count / elapsed
+
+
+@_benchmark("dispatcher.memory_store", "pages/s")
+def _dispatcher_memory(config: _Config) -> float:
+    return _crawl(config, lambda d: pyoctopus.memory_store())
+
+
+@_benchmark("dispatcher.sqlite_store", "pages/s")
+def _dispatcher_sqlite(config: _Config) -> float:
+    return _crawl(config, lambda d: pyoctopus.sqlite_store(os.path.join(d, "crawl.db")))
+
+
+# ---------------------------------------------------------------- store
+
+
+def _store_cycle(store: pyoctopus.Store, n: int) -> float:
+    requests = []
+    for i in range(n):
+        r = pyoctopus.request(f"https://example.com/detail/{i}", priority=i % 5,
+                              headers={"Referer": "https://example.com"})
+        r.id = f"{i:032x}"
+        requests.append(r)
+    begin = time.perf_counter()
+    for r in requests:
+        store.put(r)
+    while (r := store.get()) is not None:
+        store.update_state(r, State.COMPLETED)
+    return n / (time.perf_counter() - begin)
+
+
+@_benchmark("store.memory", "requests/s")
+def _store_memory(config: _Config) -> float:
+    return _store_cycle(pyoctopus.memory_store(), config.requests)
+
+
+@_benchmark("store.sqlite", "requests/s")
+def _store_sqlite(config: _Config) -> float:
+    with tempfile.TemporaryDirectory() as d:
+        return _store_cycle(pyoctopus.sqlite_store(os.path.join(d, "store.db")), config.requests)
+
+
+@_benchmark("store.redis", "requests/s")
+def _store_redis(config: _Config) -> float | None:
+    if not config.redis:
+        return None
+    host, _, port = config.redis.partition(":")
+    prefix = f"benchmark{os.getpid()}"
+    store = pyoctopus.redis_store(prefix=prefix, host=host, port=int(port or 6379))
+    try:
+        return _store_cycle(store, config.requests // 10)
+    finally:
+        keys = store._client.keys(f"{prefix}:*")
+        if keys:
+            store._client.delete(*keys)
+
+
+# ---------------------------------------------------------------- selector
+
+
+class _CssItem:
+    title = pyoctopus.css("h1.title", text=True)
+    price = pyoctopus.css("div.price", text=True, converter=pyoctopus.float_converter())
+    stars = pyoctopus.css("div.stars", text=True, converter=pyoctopus.int_converter())
+    tags = pyoctopus.css("li.tag", text=True, multi=True)
+    author = pyoctopus.css("a.author", attr="href")
+
+
+class _XpathItem:
+    title = pyoctopus.xpath("//h1[@class='title']/text()")
+    price = pyoctopus.xpath("//div[@class='price']/text()", converter=pyoctopus.float_converter())
+    stars = pyoctopus.xpath("//div[@class='stars']/text()", converter=pyoctopus.int_converter())
+    tags = pyoctopus.xpath("//li[@class='tag']/text()", multi=True)
+    author = pyoctopus.xpath("//a[@class='author']/@href")
+
+
+class _RegexItem:
+    title = pyoctopus.regex(r'<h1 class="title">([^<]*)</h1>', 1)
+    price = pyoctopus.regex(r'<div class="price">([^<]*)</div>', 1, converter=pyoctopus.float_converter())
+    stars = pyoctopus.regex(r'<div class="stars">([^<]*)</div>', 1, converter=pyoctopus.int_converter())
+    tags = pyoctopus.regex(r'<li class="tag">([^<]*)</li>', 1, multi=True)
+    author = pyoctopus.regex(r'<a class="author" href="([^"]*)"', 1)
+
+
+class _JsonItem:
+    title = pyoctopus.json("$.title")
+    price = pyoctopus.json("$.price", converter=pyoctopus.float_converter())
+    stars = pyoctopus.json("$.stars", converter=pyoctopus.int_converter())
+    tags = pyoctopus.json("$.tags[*]", multi=True)
+    author = pyoctopus.json("$.author.name")
+
+
+class _JsonPage:
+    items = pyoctopus.embedded(pyoctopus.json("$.data[*]", multi=True), _JsonItem)
+
+
+class _ListItem:
+    title = pyoctopus.css("a.title", text=True)
+    url = pyoctopus.css("a.title", attr="href")
+    price = pyoctopus.css("span.price", text=True, converter=pyoctopus.float_converter())
+    stars = pyoctopus.css("span.stars", text=True, converter=pyoctopus.int_converter())
+
+
+class _ListPage:
+    items = pyoctopus.rows(pyoctopus.css("ul.items li.item", multi=True), _ListItem)
+
+
+def _select(config: _Config, result_class: type, content: bytes, items: int) -> float:
+    res = pyoctopus.response(pyoctopus.request("https://example.com/"), 200, content)
+    begin = time.perf_counter()
+    for _ in range(config.selects):
+        pyoctopus.select(res.text, res, result_class)
+        # 每次都从头解析，不复用上一次的解析树和选择结果
+        res.release()
+    return config.selects * items / (time.perf_counter() - begin)
+
+
+def _detail(config: _Config) -> bytes:
+    return SyntheticSite(size=config.size).detail_page(0)
+
+
+@_benchmark("selector.css", "items/s")
+def _selector_css(config: _Config) -> float:
+    return _select(config, _CssItem, _detail(config), 1)
+
+
+@_benchmark("selector.xpath", "items/s")
+def _selector_xpath(config: _Config) -> float:
+    return _select(config, _XpathItem, _detail(config), 1)
+
+
+@_benchmark("selector.regex", "items/s")
+def _selector_regex(config: _Config) -> float:
+    return _select(config, _RegexItem, _detail(config), 1)
+
+
+@_benchmark("selector.json", "items/s")
+def _selector_json(config: _Config) -> float:
+    site = SyntheticSite(fan_out=config.fan_out)
+    return _select(config, _JsonPage, site.json_page(0), config.fan_out)
+
+
+@_benchmark("selector.rows", "items/s")
+def _selector_rows(config: _Config) -> float:
+    site = SyntheticSite(fan_out=config.fan_out)
+    return _select(config, _ListPage, site.list_page(0), config.fan_out)
+
+
+# ---------------------------------------------------------------- collector
+
+
+class _Record:
+    def __init__(self, i: int):
+        self.id = i
+        self.title = f"Item {i}"
+        self.price = i * 0.5
+        self.stars = i * 3
+        self.tags = ["python", "crawler", str(i % 7)]
+        self.author = f"/author/{i % 100}"
+
+
+def _collect(config: _Config, factory) -> float:
+    with tempfile.TemporaryDirectory() as d:
+        collector = factory(d)
+        records = [_Record(i) for i in range(config.records)]
+        begin = time.perf_counter()
+        for r in records:
+            collector(r)
+        collector.close()
+        return config.records / (time.perf_counter() - begin)
+
+
+@_benchmark("collector.jsonl", "records/s")
+def _collector_jsonl(config: _Config) -> float:
+    return _collect(config, lambda d: pyoctopus.jsonl_collector(os.path.join(d, "out.jsonl")))
+
+
+@_benchmark("collector.csv", "records/s")
+def _collector_csv(config: _Config) -> float:
+    return _collect(config, lambda d: pyoctopus.csv_collector(os.path.join(d, "out.csv")))
+
+
+@_benchmark("collector.sqlite", "records/s")
+def _collector_sqlite(config: _Config) -> float:
+    return _collect(config, lambda d: pyoctopus.sqlite_collector(os.path.join(d, "out.db"), "items"))
+
+
+@_benchmark("collector.columnar", "records/s")
+def _collector_columnar(config: _Config) -> float:
+    return _collect(config, lambda d: pyoctopus.columnar_collector(os.path.join(d, "out.parquet"), _CssItem))
+
+
+@_benchmark("collector.excel_streaming", "records/s")
+def _collector_excel(config: _Config) -> float:
+    return _collect(config, lambda d: pyoctopus.excel_collector(os.path.join(d, "out.xlsx"), streaming=True))
+
+
+# ---------------------------------------------------------------- startup
+
+
+@_benchmark("startup.import", "imports/s")
+def _startup_import(config: _Config) -> float:
+    seconds, _ = measure_import("bare", 3 if config.quick else 9)
+    return 1 / seconds
+
+
+@_benchmark("startup.json_crawler", "starts/s")
+def _startup_json_crawler(config: _Config) -> float:
+    seconds, _ = measure_import("json_crawler", 3 if config.quick else 9)
+    return 1 / seconds
+
+
+# ---------------------------------------------------------------- runner
+
+
+def _meta() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "commit": commit,
+    }
+
+
+def _compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    regressions = []
+    print(f"\n{'benchmark':<28} {'baseline':>14} {'current':>14} {'change':>9}")
+    for name, r in results.items():
+        b = baseline.get("results", {}).get(name, None)
+        if b is None or b.get("value") is None or r["value"] is None:
+            continue
+        change = r["value"] / b["value"] - 1 if b["value"] else 0.0
+        flag = ""
+        if change < -threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<28} {b['value']:>14.1f} {r['value']:>14.1f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PyOctopus benchmark suite")
+    parser.add_argument("names", nargs="*", help="benchmark name prefixes to run, e.g. store selector.css")
+    parser.add_argument("--list", action="store_true", help="list benchmarks and exit")
+    parser.add_argument("--quick", action="store_true", help="run with a tenth of the default workload")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.0, help="fixture server latency per response in seconds")
+    parser.add_argument("--pages", type=int, default=20, help="list pages of the synthetic site")
+    parser.add_argument("--fan-out", type=int, default=20, help="detail links per list page")
+    parser.add_argument("--size", type=int, default=8 * 1024, help="detail page size in bytes")
+    parser.add_argument("--redis", help="host[:port] of a redis server for store.redis, skipped if not given")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="compare results with a JSON file written by --output")
+    parser.add_argument("--threshold", type=float, default=0.1, help="relative slowdown reported as regression")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, (_, unit) in _BENCHMARKS.items():
+            print(f"{name:<28} {unit}")
+        return
+    logging.disable(logging.WARNING)
+    config = _Config(args)
+    results = {}
+    for name, (fn, unit) in _BENCHMARKS.items():
+        if args.names and not any(name.startswith(n) for n in args.names):
+            continue
+        try:
+            value = fn(config)
+        except Exception as e:
+            print(f"{name:<28} error: {e}")
+            results[name] = {"value": None, "unit": unit, "error": str(e)}
+            continue
+        if value is None:
+            print(f"{name:<28} skipped")
+        else:
+            print(f"{name:<28} {value:>14.1f} {unit}")
+        results[name] = {"value": value, "unit": unit}
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"meta": _meta(), "config": vars(args), "results": results}, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if _compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,124 @@
-from .site import new as site
+from typing import TYPE_CHECKING
 
-from .request import Request
-from .request import new as request
-from .response import Response
-from .response import new as response
-from .limiter import new as limiter
-from .octopus import new
-from .types import R, Converter, Collector, Processor, Matcher, Terminable, Downloader
+from ._lazy import attach
 
-from .converter import *
-from .selector import *
-from .matcher import *
-from .processor import *
-from .store import *
-from .collector import *
+# 导出在首次访问时才导入对应模块（PEP 562），只用到部分功能时不会加载 curl_cffi、openpyxl、bs4 等依赖
+_EXPORTS = {
+    "site": ".site:new",
+    "Request": ".request:Request",
+    "request": ".request:new",
+    "Response": ".response:Response",
+    "response": ".response:new",
+    "limiter": ".limiter:new",
+    "rate_limiter": ".limiter:new_rate",
+    "hedge": ".hedge:new",
+    "profiler": ".profiler:new",
+    "canonicalizer": ".canonicalizer:new",
+    "seen_filter": ".dedup:new",
+    "new": ".octopus:new",
+    "cluster": ".cluster:new",
+    "MetricsRegistry": ".metrics:Registry",
+    "metrics_registry": ".metrics:get_registry",
+    "R": ".types:R",
+    "Converter": ".types:Converter",
+    "Collector": ".types:Collector",
+    "Processor": ".types:Processor",
+    "Matcher": ".types:Matcher",
+    "Terminable": ".types:Terminable",
+    "Downloader": ".types:Downloader",
+    # converter
+    "int_converter": ".converter:int_converter",
+    "float_converter": ".converter:float_converter",
+    "bool_converter": ".converter:bool_converter",
+    "datetime_converter": ".converter:datetime_converter",
+    # selector
+    "embedded": ".selector:embedded",
+    "rows": ".selector:rows",
+    "select": ".selector:select",
+    "css": ".selector:css",
+    "xpath": ".selector:xpath",
+    "regex": ".selector:regex",
+    "json": ".selector:json",
+    "json_stream": ".selector:json_stream",
+    "attr": ".selector:attr",
+    "url": ".selector:url",
+    "link": ".selector:link",
+    "hyperlink": ".selector:hyperlink",
+    "lazy": ".selector:lazy",
+    "fields": ".selector:fields",
+    "query": ".selector:query",
+    "header": ".selector:header",
+    "id": ".selector:id",
+    # matcher
+    "and_matcher": ".matcher:and_matcher",
+    "or_matcher": ".matcher:or_matcher",
+    "not_matcher": ".matcher:not_matcher",
+    "host_matcher": ".matcher:host_matcher",
+    "url_matcher": ".matcher:url_matcher",
+    "header_matcher": ".matcher:header_matcher",
+    "content_type_matcher": ".matcher:content_type_matcher",
+    "ALL": ".matcher:ALL",
+    "JSON": ".matcher:JSON",
+    "HTML": ".matcher:HTML",
+    "IMAGE": ".matcher:IMAGE",
+    "PDF": ".matcher:PDF",
+    "WORD": ".matcher:WORD",
+    "EXCEL": ".matcher:EXCEL",
+    "OCTET_STREAM": ".matcher:OCTET_STREAM",
+    "MEDIA": ".matcher:MEDIA",
+    "AUDIO": ".matcher:AUDIO",
+    "VIDEO": ".matcher:VIDEO",
+    # processor
+    "downloader": ".processor:downloader",
+    "extractor": ".processor:extractor",
+    "stream_extractor": ".processor:stream_extractor",
+    "link_extractor": ".processor:link_extractor",
+    # store
+    "memory_store": ".store:memory_store",
+    "sqlite_store": ".store:sqlite_store",
+    "redis_store": ".store:redis_store",
+    "Store": ".store:Store",
+    # collector
+    "columnar_collector": ".collector:columnar_collector",
+    "csv_collector": ".collector:csv_collector",
+    "excel_collector": ".collector:excel_collector",
+    "excel_column": ".collector:excel_column",
+    "excel_style": ".collector:excel_style",
+    "jsonl_collector": ".collector:jsonl_collector",
+    "logging_collector": ".collector:logging_collector",
+    "sqlite_collector": ".collector:sqlite_collector",
+    # downloader
+    "requests_downloader": ".downloader:requests_downloader",
+    "curl_cffi_downloader": ".downloader:curl_cffi_downloader",
+}
 
-from .downloader import *
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = attach(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .site import new as site
+    from .request import Request
+    from .request import new as request
+    from .response import Response
+    from .response import new as response
+    from .limiter import new as limiter
+    from .limiter import new_rate as rate_limiter
+    from .hedge import new as hedge
+    from .profiler import new as profiler
+    from .canonicalizer import new as canonicalizer
+    from .dedup import new as seen_filter
+    from .octopus import new
+    from .cluster import new as cluster
+    from .metrics import Registry as MetricsRegistry
+    from .metrics import get_registry as metrics_registry
+    from .types import R, Converter, Collector, Processor, Matcher, Terminable, Downloader
+
+    from .converter import *
+    from .selector import *
+    from .matcher import *
+    from .processor import *
+    from .store import *
+    from .collector import *
+
+    from .downloader import *
@@ -0,0 +1,50 @@
+import importlib
+import sys
+import types
+from typing import Any, Callable
+
+
+class _LazyModule(types.ModuleType):
+    """
+    导入子模块时解释器会把子模块设为包的同名属性，很多导出名与子模块同名（例如 site、css），
+    这里保证同名的导出不会被子模块覆盖
+    """
+
+    def __setattr__(self, name: str, value: Any):
+        if isinstance(value, types.ModuleType) and name in self.__dict__.get("_lazy_exports", ()):
+            return
+        super().__setattr__(name, value)
+
+
+def attach(module_name: str, exports: dict[str, str]) -> tuple[Callable[[str], Any], Callable[[], list[str]]]:
+    """
+    为包提供 PEP 562 的 __getattr__ 和 __dir__，导出在首次访问时才导入对应模块
+
+    exports 为 名称 -> "相对模块:属性"，例如 {"css": ".css:new"}。
+    """
+    module = sys.modules[module_name]
+    module._lazy_exports = exports
+    module.__class__ = _LazyModule
+
+    def __getattr__(name: str) -> Any:
+        target = exports.get(name, None)
+        if target is None:
+            if name.startswith("__"):
+                raise AttributeError(f"module '{module_name}' has no attribute '{name}'")
+            # 兼容通过属性访问尚未导入的子模块，例如 pyoctopus.octopus
+            try:
+                return importlib.import_module(f".{name}", module_name)
+            except ModuleNotFoundError as e:
+                if e.name != f"{module_name}.{name}":
+                    raise
+            raise AttributeError(f"module '{module_name}' has no attribute '{name}'")
+        path, _, attr = target.partition(":")
+        value = getattr(importlib.import_module(path, module_name), attr)
+        # 写入模块字典，之后的访问不再经过 __getattr__
+        module.__dict__[name] = value
+        return value
+
+    def __dir__() -> list[str]:
+        return sorted({*module.__dict__, *exports})
+
+    return __getattr__, __dir__
@@ -0,0 +1,173 @@
+import functools
+import hashlib
+import re
+from urllib.parse import quote_from_bytes, quote_plus, unquote_to_bytes, urlsplit
+
+from .request import Request
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+# 常见的跟踪参数，以 * 结尾的表示前缀匹配
+DEFAULT_TRACKING_PARAMS = (
+    "utm_*",
+    "gclid",
+    "dclid",
+    "fbclid",
+    "msclkid",
+    "yclid",
+    "igshid",
+    "mc_cid",
+    "mc_eid",
+    "_ga",
+    "_gl",
+    "spm",
+)
+
+_DEFAULT_PORTS = {"http": ":80", "https": ":443"}
+
+_UNRESERVED = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-._~")
+
+_REGEX_PERCENT = re.compile(r"%([0-9a-fA-F]{2})")
+_REGEX_FORM_PLAIN = re.compile(r"[A-Za-z0-9._~-]*")
+
+
+def _percent(m: re.Match) -> str:
+    c = chr(int(m.group(1), 16))
+    return c if c in _UNRESERVED else "%" + m.group(1).upper()
+
+
+def _normalize_percent(s: str) -> str:
+    # 解码非保留字符的转义，其余转义统一为大写
+    return _REGEX_PERCENT.sub(_percent, s) if "%" in s else s
+
+
+def _form(s: str) -> str:
+    """
+    查询参数的名称或值统一为与 quote_plus 相同的表单编码：+ 和 %20 都是空格，非保留字符不转义，
+    其余字节转义为大写的 %XX；按字节处理，不是 UTF-8 的转义也保持不变
+    """
+    if (s.isascii() and s.isalnum()) or _REGEX_FORM_PLAIN.fullmatch(s):
+        return s
+    return quote_from_bytes(unquote_to_bytes(s.replace("+", " ")), safe=" ").replace(" ", "+")
+
+
+def _remove_dot_segments(path: str) -> str:
+    segments = []
+    for s in path.split("/"):
+        if s == "..":
+            if len(segments) > 1:
+                segments.pop()
+        elif s != ".":
+            segments.append(s)
+    if path.endswith(("/.", "/..")):
+        segments.append("")
+    return "/".join(segments)
+
+
+def _hash_blake2s(s: str) -> str:
+    return hashlib.blake2s(s.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _hash_xxh3(s: str) -> str:
+    return xxhash.xxh3_128_hexdigest(s.encode("utf-8"))
+
+
+def _hash_md5(s: str) -> str:
+    return hashlib.md5(s.encode("utf-8")).hexdigest()
+
+
+_HASHES = {"blake2s": _hash_blake2s, "xxh3": _hash_xxh3, "md5": _hash_md5}
+
+
+class Canonicalizer:
+    """
+    URL 规范化与请求 ID 生成
+
+    规范化时 scheme 和 host 转为小写，去掉默认端口、片段和跟踪参数，统一百分号编码，
+    移除路径中的 . 和 ..，查询参数按名称和值排序。规范化结果只用于生成请求 ID（去重），不会改变实际请求的 URL。
+
+    请求 ID 为 128 位哈希的十六进制表示，默认使用 blake2s；安装了 xxhash 时可以指定 hash_name="xxh3"。
+    使用持久化存储时切换哈希算法会改变所有请求的 ID。
+    """
+
+    def __init__(self,
+                 strip_params: tuple[str, ...] = DEFAULT_TRACKING_PARAMS,
+                 *,
+                 hash_name: str = "blake2s",
+                 cache_size: int = 65536):
+        if hash_name not in _HASHES:
+            raise ValueError(f"Unsupported hash [{hash_name}], available: {', '.join(_HASHES)}")
+        if hash_name == "xxh3" and xxhash is None:
+            raise ValueError("xxhash is not installed, install it with `pip install xxhash`")
+        strip_params = strip_params or ()
+        self._strip_exact = frozenset(p for p in strip_params if not p.endswith("*"))
+        self._strip_prefixes = tuple(p[:-1] for p in strip_params if p.endswith("*"))
+        self._hash = _HASHES[hash_name]
+        self.canonicalize = functools.lru_cache(maxsize=cache_size)(self._canonicalize)
+        self._request_id = functools.lru_cache(maxsize=cache_size)(self._simple_request_id)
+
+    def _stripped(self, name: str) -> bool:
+        return name in self._strip_exact or (bool(self._strip_prefixes) and name.startswith(self._strip_prefixes))
+
+    def _query_pairs(self, query: str) -> list[tuple[str, str]]:
+        pairs = []
+        for part in query.split("&"):
+            if not part:
+                continue
+            k, sep, v = part.partition("=")
+            k = _form(k)
+            if self._stripped(k):
+                continue
+            pairs.append((k, _form(v)))
+        return pairs
+
+    def _canonicalize(self, url: str) -> str:
+        parts = urlsplit(url.strip())
+        scheme = parts.scheme.lower()
+        netloc = parts.netloc
+        userinfo, at, hostport = netloc.rpartition("@")
+        hostport = hostport.lower()
+        default_port = _DEFAULT_PORTS.get(scheme, None)
+        if default_port is not None and hostport.endswith(default_port):
+            hostport = hostport[:-len(default_port)]
+        if hostport.endswith(":"):
+            hostport = hostport[:-1]
+        netloc = f"{userinfo}{at}{hostport}"
+        path = _normalize_percent(parts.path) or "/"
+        if "." in path:
+            path = _remove_dot_segments(path)
+        query = "&".join(f"{k}={v}" for k, v in sorted(self._query_pairs(parts.query))) if parts.query else ""
+        return f"{scheme}://{netloc}{path}?{query}" if query else f"{scheme}://{netloc}{path}"
+
+    def _simple_request_id(self, method: str, url: str) -> str:
+        return self._hash(f"{method}{self.canonicalize(url)}")
+
+    def request_id(self, r: Request) -> str:
+        if not r.queries and not r.data:
+            return self._request_id(r.method, r.url)
+        url = self.canonicalize(r.url)
+        if r.queries:
+            base, _, query = url.partition("?")
+            pairs = self._query_pairs(query) if query else []
+            for k, v in r.queries.items():
+                if not self._stripped(k):
+                    # 与 URL 中的查询参数使用同一种编码
+                    name = quote_plus(k)
+                    pairs.extend((name, quote_plus(str(x))) for x in (v or []))
+            url = f"{base}?{'&'.join(f'{k}={v}' for k, v in sorted(pairs))}"
+        if r.data:
+            url = f"{url}&{r.data}"
+        return self._hash(f"{r.method}{url}")
+
+    def cache_info(self):
+        return self.canonicalize.cache_info()
+
+
+def new(strip_params: tuple[str, ...] = DEFAULT_TRACKING_PARAMS,
+        *,
+        hash_name: str = "blake2s",
+        cache_size: int = 65536) -> Canonicalizer:
+    return Canonicalizer(strip_params, hash_name=hash_name, cache_size=cache_size)
@@ -0,0 +1,335 @@
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+import zlib
+from typing import Callable
+from urllib.parse import urlparse
+
+from .octopus import Octopus, State
+from .request import Request
+from .seeds import SeedSource
+
+_logger = logging.getLogger("pyoctopus.cluster")
+
+# 空闲分片上报状态、检查是否结束的间隔（秒）
+_POLL_INTERVAL = 0.2
+# 忙碌分片上报状态的间隔（秒）
+_REPORT_INTERVAL = 1.0
+# 等待分片进程退出的时间（秒）
+_JOIN_TIMEOUT = 10
+
+_FRONTIER = ("all", "waiting", "executing", "completed", "failed")
+
+# 分片序号 -> 爬虫，必须能被 pickle（模块级函数），在分片进程中调用
+Factory = Callable[[int], Octopus]
+
+
+def owner(host: str | None, shards: int) -> int:
+    """
+    主机所属的分片；使用 crc32 而不是 hash()，各进程的计算结果一致
+    """
+    if not host or shards <= 1:
+        return 0
+    return zlib.crc32(host.lower().encode("utf-8")) % shards
+
+
+def _drain(q) -> list:
+    items = []
+    while True:
+        try:
+            items.append(q.get_nowait())
+        except queue.Empty:
+            return items
+
+
+class _Router:
+    """
+    分片进程中的请求路由
+
+    不属于本分片的请求按目标分片缓冲，攒够一批或调度线程每轮循环时通过进程间队列发出；
+    收到和发出的请求数随状态一起上报给启动进程，用来判断整个集群是否已经没有任务；
+    状态只包含计数，统计信息要扫描存储，只在分片结束时上报一次。
+    """
+
+    def __init__(self, index: int, shards: int, inboxes: list, reports, done, *,
+                 batch_size: int = 500, poll_interval: float = _POLL_INTERVAL):
+        self.index = index
+        self.shards = shards
+        self.poll_interval = poll_interval
+        self._inboxes = inboxes
+        self._reports = reports
+        self._done = done
+        self._batch_size = max(1, batch_size)
+        self._outbox: dict[int, list[str]] = {}
+        self._pending: list[str] = []
+        self._lock = threading.Lock()
+        self.sent = 0
+        self.received = 0
+        self._idle = False
+        self._reported = 0.0
+
+    def owns(self, r: Request) -> bool:
+        return owner(urlparse(r.url).hostname, self.shards) == self.index
+
+    def route(self, r: Request) -> bool:
+        """
+        请求不属于本分片时放入发送缓冲并返回 True
+        """
+        target = owner(urlparse(r.url).hostname, self.shards)
+        if target == self.index:
+            return False
+        with self._lock:
+            batch = self._outbox.setdefault(target, [])
+            batch.append(r.to_json())
+            if len(batch) < self._batch_size:
+                return True
+            del self._outbox[target]
+            self.sent += len(batch)
+        self._inboxes[target].put(batch)
+        return True
+
+    def flush(self):
+        with self._lock:
+            outbox, self._outbox = self._outbox, {}
+            self.sent += sum(len(x) for x in outbox.values())
+        for target, batch in outbox.items():
+            self._inboxes[target].put(batch)
+
+    def receive(self) -> list[Request]:
+        batch, self._pending = self._pending, []
+        inbox = self._inboxes[self.index]
+        while True:
+            try:
+                batch.extend(inbox.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            self.received += len(batch)
+            self._idle = False
+        if not self._idle and time.monotonic() - self._reported >= _REPORT_INTERVAL:
+            # 忙碌时也定期上报，启动进程据此汇总实时的转发数
+            self._report()
+        return [Request.from_json(x) for x in batch]
+
+    def wait(self, timeout: float):
+        """
+        等待其他分片转来请求，最多等待 timeout 秒
+        """
+        try:
+            self._pending.extend(self._inboxes[self.index].get(timeout=timeout))
+        except queue.Empty:
+            pass
+
+    def idle(self) -> bool:
+        """
+        本分片没有任务时由调度线程调用，上报空闲状态，整个集群都没有任务时返回 True
+        """
+        self._idle = True
+        self._report()
+        return self._done.is_set()
+
+    def _report(self):
+        self._reported = time.monotonic()
+        self._reports.put(("status", self.index, self._idle, self.sent, self.received))
+
+    def close(self):
+        # 强制停止时队列中可能还有对方不再读取的请求，不等待后台线程写完
+        for inbox in self._inboxes:
+            inbox.cancel_join_thread()
+
+
+def _run_shard(index: int, shards: int, factory: Factory, seeds: tuple, inboxes: list, reports, done, halt,
+               batch_size: int, poll_interval: float):
+    # Ctrl+C 由启动进程处理，通过 halt 通知各分片停止
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    octopus = factory(index)
+    router = _Router(index, shards, inboxes, reports, done,
+                     batch_size=batch_size, poll_interval=poll_interval)
+    octopus._router = router
+    future = octopus.start_async(*seeds)
+
+    def _watch():
+        # 轮询而不是 halt.wait：在 wait 中的分片异常退出后，启动进程的 halt.set() 会一直等待它被唤醒
+        while not halt.is_set():
+            if future.done():
+                return
+            time.sleep(poll_interval)
+        try:
+            octopus.stop()
+        except RuntimeError:
+            # 已经在停止
+            pass
+
+    threading.Thread(target=_watch, name="HaltWatcher", daemon=True).start()
+    try:
+        future.result()
+    except BaseException:
+        if octopus.state == State.STARTED:
+            octopus.stop()
+        raise
+    finally:
+        router.close()
+    # 调度线程结束后由 StopThread 或 HaltWatcher 完成停止
+    while octopus.state != State.STOPPED:
+        time.sleep(0.05)
+    reports.put(("stats", index, router.sent, router.received, octopus.get_live_stats()))
+
+
+class _Termination:
+    """
+    判断集群是否已经没有任务
+
+    所有分片都报告空闲且发出与收到的请求总数相等时记录快照，之后每个分片都再次报告空闲且计数与快照相同才算结束：
+    只看一次报告时，先报告空闲后又收到请求的分片与另一个分片的计数可能恰好抵消。
+    """
+
+    def __init__(self, shards: int):
+        self._status: list[tuple[bool, int, int] | None] = [None] * shards
+        self._fresh = [False] * shards
+        self._snapshot = None
+
+    def update(self, index: int, idle: bool, sent: int, received: int):
+        self._status[index] = (idle, sent, received)
+        self._fresh[index] = True
+
+    def quiescent(self) -> bool:
+        status = self._status
+        if any(s is None or not s[0] for s in status) or sum(s[1] for s in status) != sum(s[2] for s in status):
+            self._snapshot = None
+            return False
+        if self._snapshot is None or self._snapshot != status:
+            self._snapshot = list(status)
+            self._fresh = [False] * len(status)
+            return False
+        return all(self._fresh)
+
+
+class Cluster:
+    """
+    按主机分片的多进程爬虫
+
+    启动 shards 个进程，每个进程调用 factory(分片序号) 创建自己的爬虫，负责 crc32(主机名) % shards 等于该序号的主机，
+    同一主机的请求只在一个进程中调度，站点的限速和 Retry-After 暂停仍然有效。每个分片都读取全部种子，只保留自己的主机；
+    处理器发现的其他主机的链接在本进程去重后按批通过进程间队列转给所属的分片。
+    所有分片都空闲且转发的请求都已被接收时集群结束，start 返回汇总的统计信息。
+
+    factory 和 seeds 在使用 spawn 启动进程时需要能被 pickle；各分片的存储、种子检查点、统计端口等应按分片序号区分。
+    调用 stop 时各分片各自停止，尚未被对方接收的转发请求会丢失。
+    """
+
+    def __init__(self,
+                 factory: Factory,
+                 shards: int = os.cpu_count() or 1,
+                 *,
+                 batch_size: int = 500,
+                 poll_interval: float = _POLL_INTERVAL,
+                 context: str = None):
+        self.factory = factory
+        self.shards = max(1, shards)
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._context = multiprocessing.get_context(context)
+        self._processes = []
+        self._stats: list[dict | None] = [None] * self.shards
+        self._routed = [0] * self.shards
+        self._halt = None
+        self._lock = threading.Lock()
+
+    def start(self, *seeds: SeedSource) -> dict:
+        if self._processes:
+            raise RuntimeError("Cluster has already been started")
+        ctx = self._context
+        inboxes = [ctx.Queue() for _ in range(self.shards)]
+        reports = ctx.Queue()
+        done = ctx.Event()
+        self._halt = ctx.Event()
+        for i in range(self.shards):
+            p = ctx.Process(target=_run_shard,
+                            args=(i, self.shards, self.factory, seeds, inboxes, reports, done, self._halt,
+                                  self.batch_size, self.poll_interval),
+                            name=f"octopus-shard-{i}")
+            p.start()
+            self._processes.append(p)
+        _logger.info(f"Cluster started with {self.shards} shards")
+        termination = _Termination(self.shards)
+        # 已经收到最终统计或已判定异常退出的分片
+        finished = [False] * self.shards
+        failed = []
+        while not all(finished):
+            try:
+                messages = [reports.get(timeout=self.poll_interval)]
+            except queue.Empty:
+                messages = []
+            except KeyboardInterrupt:
+                _logger.info("Interrupted, cluster will stop")
+                self._halt.set()
+                continue
+            exited = [i for i, p in enumerate(self._processes) if not finished[i] and p.exitcode is not None]
+            if exited:
+                # 分片进程退出前已把消息全部写入队列，读完队列后仍没有最终统计才是异常退出
+                messages.extend(_drain(reports))
+            for message in messages:
+                if message[0] == "status":
+                    _, i, idle, sent, received = message
+                    termination.update(i, idle, sent, received)
+                    with self._lock:
+                        self._routed[i] = sent
+                else:
+                    _, i, sent, received, live = message
+                    finished[i] = True
+                    with self._lock:
+                        self._stats[i] = live
+                        self._routed[i] = sent
+            for i in exited:
+                if not finished[i]:
+                    # 分片异常退出，其他分片不会再收到它的请求，停止整个集群
+                    _logger.error(f"Shard {i} exited with code {self._processes[i].exitcode}")
+                    failed.append(i)
+                    finished[i] = True
+                    self._halt.set()
+            if not done.is_set() and termination.quiescent():
+                _logger.info("No more tasks found in all shards, cluster will stop")
+                done.set()
+        for p in self._processes:
+            p.join(_JOIN_TIMEOUT)
+        stats = self.get_live_stats()
+        _logger.info(f"Cluster stats: {stats['frontier']}, routed = {stats['routed']}")
+        if failed:
+            raise RuntimeError(f"Shards {failed} exited abnormally")
+        return stats
+
+    def stop(self):
+        """
+        通知所有分片停止，start 在所有分片停止后返回
+        """
+        if self._halt is None:
+            raise RuntimeError("Cluster is not started")
+        self._halt.set()
+
+    def get_live_stats(self) -> dict:
+        """
+        汇总各分片的统计信息；各分片的统计在分片结束时上报，运行中只有 routed 实时更新
+        """
+        with self._lock:
+            shards = [dict(x) if x else {} for x in self._stats]
+            routed = sum(self._routed)
+        frontier = {k: sum(s.get("frontier", {}).get(k, 0) for s in shards) for k in _FRONTIER}
+        return {
+            "shards": shards,
+            "frontier": frontier,
+            "busy_workers": sum(s.get("busy_workers", 0) for s in shards),
+            "routed": routed,
+        }
+
+
+def new(factory: Factory,
+        shards: int = os.cpu_count() or 1,
+        *,
+        batch_size: int = 500,
+        poll_interval: float = _POLL_INTERVAL,
+        context: str = None) -> Cluster:
+    return Cluster(factory, shards, batch_size=batch_size, poll_interval=poll_interval, context=context)
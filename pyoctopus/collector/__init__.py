@@ -1,11 +1,37 @@
-from .excel_collector import new as excel_collector
-from .excel_collector import new_cell_style as excel_style
-from .excel_collector import new_column as excel_column
-from .logging_collector import new as logging_collector
+from typing import TYPE_CHECKING
+
+from .._lazy import attach
+
+_EXPORTS = {
+    "columnar_collector": ".columnar_collector:new",
+    "csv_collector": ".csv_collector:new",
+    "excel_collector": ".excel_collector:new",
+    "excel_column": ".excel_collector:new_column",
+    "excel_style": ".excel_collector:new_cell_style",
+    "jsonl_collector": ".jsonl_collector:new",
+    "logging_collector": ".logging_collector:new",
+    "sqlite_collector": ".sqlite_collector:new",
+}
 
 __all__ = [
+    'columnar_collector',
+    'csv_collector',
     'excel_collector',
     'excel_column',
     'excel_style',
-    'logging_collector'
+    'jsonl_collector',
+    'logging_collector',
+    'sqlite_collector'
 ]
+
+__getattr__, __dir__ = attach(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .columnar_collector import new as columnar_collector
+    from .csv_collector import new as csv_collector
+    from .excel_collector import new as excel_collector
+    from .excel_collector import new_cell_style as excel_style
+    from .excel_collector import new_column as excel_column
+    from .jsonl_collector import new as jsonl_collector
+    from .logging_collector import new as logging_collector
+    from .sqlite_collector import new as sqlite_collector
@@ -0,0 +1,169 @@
+import json
+import logging
+import queue
+import threading
+from abc import abstractmethod
+from datetime import date, datetime
+from time import monotonic, sleep
+from typing import Any
+
+from ..metrics import get_registry
+from ..selector.selector import fields
+from ..types import R
+
+_logger = logging.getLogger('pyoctopus.collector.buffered')
+
+_CLOSE = object()
+
+
+class Sink:
+    """
+    结果写入目标，所有方法都只在 BufferedCollector 的后台写线程中调用
+    """
+
+    def open(self):
+        pass
+
+    @abstractmethod
+    def write(self, records: list[dict[str, Any]]):
+        pass
+
+    def close(self):
+        pass
+
+
+class BufferedCollector:
+    """
+    带有界缓冲和后台写线程的收集器
+
+    收集结果时只把记录放入缓冲队列，由后台线程按 batch_size 条或每 flush_interval 秒批量写入 sink。
+    缓冲队列满时收集方阻塞等待（背压），close 时写出剩余记录并关闭 sink。
+    写入失败的批次按 retry_backoff 秒起、每次翻倍的间隔最多重试 retries 次，仍然失败时丢弃并计入
+    collector_records_dropped_total 指标；重试时整批重新写入，sink 已经写出部分记录时可能重复。
+    """
+
+    def __init__(self, sink: Sink, *, buffer_size: int = 10000, batch_size: int = 500, flush_interval: float = 1,
+                 retries: int = 3, retry_backoff: float = 0.5):
+        if batch_size <= 0:
+            raise ValueError('batch_size must be greater than 0')
+        self._sink = sink
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._retries = max(0, retries)
+        self._retry_backoff = retry_backoff
+        self._queue = queue.Queue(maxsize=buffer_size)
+        self._closed = False
+        self._lock = threading.Lock()
+        self._writer = threading.Thread(target=self._run, name=f'collector-{type(sink).__name__}', daemon=True)
+        self._writer.start()
+
+    def __call__(self, r: R) -> None:
+        record = to_record(r)
+        # 检查和放入都在锁内，close 之后不会再有记录放入队列；队列满时写线程仍在运行，等待不会一直阻塞
+        with self._lock:
+            if self._closed:
+                raise RuntimeError(f'Collector [{self._sink}] is closed')
+            self._queue.put(record)
+
+    def flush(self):
+        done = threading.Event()
+        with self._lock:
+            if self._closed:
+                return
+            self._queue.put(done)
+        done.wait()
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_CLOSE)
+        self._writer.join()
+
+    def _run(self):
+        try:
+            self._sink.open()
+        except BaseException as e:
+            _logger.error(f'Open sink [{self._sink}] error\n{e}', exc_info=True)
+        batch = []
+        deadline = monotonic() + self._flush_interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - monotonic()))
+            except queue.Empty:
+                item = None
+            if item is _CLOSE:
+                self._close(batch)
+                return
+            if isinstance(item, threading.Event):
+                self._write(batch)
+                batch = []
+                item.set()
+            elif item is not None:
+                batch.append(item)
+            if len(batch) >= self._batch_size or monotonic() >= deadline:
+                self._write(batch)
+                batch = []
+                deadline = monotonic() + self._flush_interval
+
+    def _close(self, batch: list[dict[str, Any]]):
+        # 写出 _CLOSE 之后仍在队列中的记录并唤醒等待的 flush，写线程退出后不会再有人读取队列
+        waiting = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, threading.Event):
+                waiting.append(item)
+            elif item is not _CLOSE:
+                batch.append(item)
+        self._write(batch)
+        for done in waiting:
+            done.set()
+        try:
+            self._sink.close()
+        except BaseException as e:
+            _logger.error(f'Close sink [{self._sink}] error\n{e}', exc_info=True)
+
+    def _write(self, batch: list[dict[str, Any]]):
+        if not batch:
+            return
+        for attempt in range(self._retries + 1):
+            try:
+                self._sink.write(batch)
+                return
+            except Exception as e:
+                if attempt < self._retries:
+                    delay = self._retry_backoff * 2 ** attempt
+                    _logger.warning(f'Write {len(batch)} records to sink [{self._sink}] error, retry in {delay}s: {e}')
+                    # 重试期间收集方由有界队列背压
+                    sleep(delay)
+                else:
+                    _logger.error(f'Write {len(batch)} records to sink [{self._sink}] error, records dropped\n{e}',
+                                  exc_info=True)
+        get_registry().inc('collector_records_dropped_total', len(batch), sink=type(self._sink).__name__)
+
+
+def to_record(r: R) -> dict[str, Any]:
+    if isinstance(r, dict):
+        return dict(r)
+    return fields(r)
+
+
+def to_json_default(o: Any) -> Any:
+    if isinstance(o, (datetime, date)):
+        return o.isoformat()
+    if hasattr(o, '__dict__'):
+        return fields(o)
+    return str(o)
+
+
+def to_scalar(v: Any) -> Any:
+    # 嵌套结构序列化为 JSON，其余转为数据库和 CSV 都能直接保存的标量
+    if v is None or isinstance(v, (str, int, float, bytes)):
+        return v
+    if isinstance(v, (datetime, date)):
+        return v.isoformat()
+    return json.dumps(v, ensure_ascii=False, default=to_json_default)
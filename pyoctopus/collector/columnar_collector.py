@@ -0,0 +1,225 @@
+import csv
+import gzip
+import inspect
+import io
+import json
+import logging
+import os
+from array import array
+from datetime import datetime, timedelta, timezone
+from typing import Any, Type
+
+from .buffered_collector import BufferedCollector, Sink, to_json_default
+from ..selector.selector import Embedded, _get_type_selectors_links
+from ..types import Collector, R
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+_logger = logging.getLogger('pyoctopus.collector.columnar')
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_INT64_MIN = -2 ** 63
+_INT64_MAX = 2 ** 63 - 1
+
+# 定长类型使用 array 存储，其余类型使用 list
+_TYPECODES = {int: 'q', float: 'd', bool: 'b', datetime: 'q'}
+_SCALAR_TYPES = (int, float, bool, datetime, str)
+
+
+class Field:
+    def __init__(self, name: str, kind: type, multi: bool = False):
+        self.name = name
+        self.kind = kind
+        self.multi = multi
+
+    def __str__(self):
+        return f'{{name={self.name}, kind={self.kind.__name__}, multi={self.multi}}}'
+
+    __repr__ = __str__
+
+
+def _converter_type(converter) -> type:
+    if converter is None:
+        return str
+    try:
+        t = inspect.signature(converter).return_annotation
+    except (TypeError, ValueError):
+        return object
+    return t if t in _SCALAR_TYPES else object
+
+
+def infer_schema(result_class: Type[R]) -> list[Field]:
+    """
+    根据结果类上声明的选择器推断列结构
+
+    选择器的类型来自 converter 的返回类型标注，没有 converter 时为 str；
+    multi 选择器为列表列，embedded 及无法识别的类型以 JSON 字符串保存。
+    """
+    selectors, _ = _get_type_selectors_links(result_class)
+    fields = []
+    for name, s in selectors.items():
+        if isinstance(s, Embedded):
+            fields.append(Field(name, object))
+        else:
+            fields.append(Field(name, _converter_type(s.converter), s.multi))
+    return fields
+
+
+def _coerce(kind: type, v: Any) -> Any:
+    # 无法转换为列类型的值保存为空值
+    try:
+        if kind is datetime:
+            if not isinstance(v, datetime):
+                return None
+            if v.tzinfo is not None:
+                # 带时区的时间统一转换为 UTC 保存
+                v = v.astimezone(timezone.utc).replace(tzinfo=None)
+            return (v - _EPOCH) // _MICROSECOND
+        if kind is object:
+            return json.dumps(v, ensure_ascii=False, default=to_json_default)
+        v = kind(v)
+    except (TypeError, ValueError, OverflowError):
+        return None
+    if kind is int and not _INT64_MIN <= v <= _INT64_MAX:
+        return None
+    return v
+
+
+class _ColumnBuffer:
+    def __init__(self, field: Field):
+        self.field = field
+        typecode = None if field.multi else _TYPECODES.get(field.kind, None)
+        self._typecode = typecode
+        self.values = array(typecode) if typecode else []
+        self.valid = bytearray()
+
+    def convert(self, v: Any) -> Any:
+        if v is None:
+            return None
+        if self.field.multi:
+            return [_coerce(self.field.kind, x) for x in v] if isinstance(v, list) else [_coerce(self.field.kind, v)]
+        return _coerce(self.field.kind, v)
+
+    def append(self, v: Any):
+        # v 为 convert 的结果
+        if v is None:
+            self.values.append(0 if self._typecode else None)
+            self.valid.append(0)
+        else:
+            self.values.append(v)
+            self.valid.append(1)
+
+    def clear(self):
+        self.values = array(self._typecode) if self._typecode else []
+        self.valid = bytearray()
+
+    def to_arrow(self):
+        f = self.field
+        if self._typecode:
+            # 直接复用 array 的内存作为数据缓冲区，只额外生成有效位图
+            validity = pa.array(self.valid, type=pa.uint8()).cast(pa.bool_()).buffers()[1]
+            if f.kind is bool:
+                return pa.Array.from_buffers(pa.int8(), len(self.values),
+                                             [validity, pa.py_buffer(self.values)]).cast(pa.bool_())
+            return pa.Array.from_buffers(_arrow_type(f.kind), len(self.values), [validity, pa.py_buffer(self.values)])
+        return pa.array(self.values, type=_arrow_type(f.kind, f.multi))
+
+    def to_python(self) -> list:
+        f = self.field
+        if f.kind is datetime and not f.multi:
+            return [(_EPOCH + v * _MICROSECOND).isoformat() if ok else None for v, ok in zip(self.values, self.valid)]
+        if f.multi:
+            return [json.dumps(v, ensure_ascii=False) if ok else None for v, ok in zip(self.values, self.valid)]
+        return [v if ok else None for v, ok in zip(self.values, self.valid)]
+
+
+def _arrow_type(kind: type, multi: bool = False):
+    t = {
+        int: pa.int64(),
+        float: pa.float64(),
+        bool: pa.bool_(),
+        datetime: pa.timestamp('us'),
+    }.get(kind, pa.string())
+    return pa.list_(t) if multi else t
+
+
+class ColumnarSink(Sink):
+    """
+    按列缓存结果，每 chunk_size 行写出一个压缩的列式分块
+
+    安装了 pyarrow 时写 Parquet（每个分块一个 row group），否则退化为 gzip 压缩的 CSV。
+    """
+
+    def __init__(self, file: str, result_class: Type[R], *, chunk_size: int = 65536, compression: str = 'zstd'):
+        self._fields = infer_schema(result_class)
+        if not self._fields:
+            raise ValueError(f'No selector found in [{result_class}]')
+        self._columns = [_ColumnBuffer(f) for f in self._fields]
+        self._chunk_size = chunk_size
+        self._compression = compression
+        self._rows = 0
+        self._writer = None
+        if pa is not None:
+            self._file = file
+        else:
+            self._file = file if file.endswith('.csv.gz') else os.path.splitext(file)[0] + '.csv.gz'
+            _logger.warning(f'pyarrow is not installed, results will be written to [{self._file}] as gzip csv')
+
+    def write(self, records: list[dict]):
+        for r in records:
+            # 整行转换成功后才追加，各列的行数始终一致
+            try:
+                row = [c.convert(r.get(c.field.name, None)) for c in self._columns]
+            except Exception as e:
+                _logger.warning(f'Skip record that can not be converted to columns of [{self._file}]: {e}')
+                continue
+            for c, v in zip(self._columns, row):
+                c.append(v)
+            self._rows += 1
+            if self._rows >= self._chunk_size:
+                self._write_chunk()
+
+    def close(self):
+        if self._rows > 0:
+            self._write_chunk()
+        if self._writer is not None:
+            self._writer.close()
+
+    def _write_chunk(self):
+        if pa is not None:
+            self._write_parquet()
+        else:
+            self._write_csv()
+        for c in self._columns:
+            c.clear()
+        self._rows = 0
+
+    def _write_parquet(self):
+        if self._writer is None:
+            schema = pa.schema([(f.name, _arrow_type(f.kind, f.multi)) for f in self._fields])
+            self._writer = pq.ParquetWriter(self._file, schema, compression=self._compression)
+        self._writer.write_table(pa.Table.from_arrays([c.to_arrow() for c in self._columns],
+                                                      schema=self._writer.schema))
+
+    def _write_csv(self):
+        if self._writer is None:
+            self._writer = gzip.open(self._file, 'wt', encoding='utf-8', newline='')
+            csv.writer(self._writer).writerow([f.name for f in self._fields])
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(zip(*[c.to_python() for c in self._columns]))
+        self._writer.write(buffer.getvalue())
+
+    def __str__(self):
+        return f'ColumnarSink{{file={self._file}}}'
+
+
+def new(file: str, result_class: Type[R], *, chunk_size: int = 65536, compression: str = 'zstd',
+        buffer_size: int = 10000, batch_size: int = 500, flush_interval: float = 1) -> Collector:
+    return BufferedCollector(ColumnarSink(file, result_class, chunk_size=chunk_size, compression=compression),
+                             buffer_size=buffer_size, batch_size=batch_size, flush_interval=flush_interval)
@@ -0,0 +1,56 @@
+import csv
+import os
+
+from .buffered_collector import BufferedCollector, Sink, to_scalar
+from ..types import Collector
+
+
+def _to_cell(v):
+    v = to_scalar(v)
+    return '' if v is None else v
+
+
+class CsvSink(Sink):
+    def __init__(self, file: str, append: bool = True, fields: list[str] = None, encoding: str = 'utf-8'):
+        self._file = file
+        self._append = append
+        self._fields = fields
+        self._encoding = encoding
+        self._f = None
+        self._writer = None
+
+    def open(self):
+        d = os.path.dirname(os.path.abspath(self._file))
+        if not os.path.exists(d):
+            os.makedirs(d)
+        has_header = self._append and os.path.exists(self._file) and os.path.getsize(self._file) > 0
+        if has_header and self._fields is None:
+            with open(self._file, 'r', encoding=self._encoding, newline='') as f:
+                self._fields = next(csv.reader(f), None)
+        self._f = open(self._file, 'a' if self._append else 'w', encoding=self._encoding, newline='')
+        if has_header:
+            self._writer = csv.writer(self._f)
+
+    def write(self, records: list[dict]):
+        if self._writer is None:
+            # 未指定字段时以第一条记录的字段作为表头
+            if self._fields is None:
+                self._fields = list(records[0].keys())
+            self._writer = csv.writer(self._f)
+            self._writer.writerow(self._fields)
+        self._writer.writerows([[_to_cell(r.get(k, None)) for k in self._fields] for r in records])
+        self._f.flush()
+
+    def close(self):
+        if self._f is not None:
+            self._f.close()
+
+    def __str__(self):
+        return f'CsvSink{{file={self._file}}}'
+
+
+def new(file: str, append: bool = True, *, fields: list[str] = None, encoding: str = 'utf-8',
+        buffer_size: int = 10000, batch_size: int = 500, flush_interval: float = 1, retries: int = 3,
+        retry_backoff: float = 0.5) -> Collector:
+    return BufferedCollector(CsvSink(file, append, fields, encoding), buffer_size=buffer_size, batch_size=batch_size,
+                             flush_interval=flush_interval, retries=retries, retry_backoff=retry_backoff)
@@ -1,10 +1,21 @@
+import json
+import logging
 import os.path
+import tempfile
+import threading
+import time
+from itertools import islice
 
 import openpyxl
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
+from openpyxl.utils import get_column_letter
 
+from ..selector.selector import field, fields
 from ..types import Collector, R
 
+_logger = logging.getLogger('pyoctopus.collector.excel')
+
 
 class CellStyle:
     def __init__(self, *,
@@ -34,74 +45,295 @@ class Column:
             self.style = style
 
 
-def _set_cell_style(cell, style: CellStyle):
-    cell.font = Font(size=style.font_size, bold=style.font_bold, color=style.font_color)
-    cell.fill = PatternFill(fill_type="solid", start_color=style.background_color,
-                            end_color=style.background_color)
-    cell.alignment = Alignment(horizontal=style.alignment, vertical="center", wrap_text=True)
-    cell.border = Border(
-        left=Side(style="thin", color=style.border_color),
-        right=Side(style="thin", color=style.border_color),
-        top=Side(style="thin", color=style.border_color),
-        bottom=Side(style="thin", color=style.border_color),
-    )
+class _CellFormat:
+    # 样式对象只创建一次，所有单元格共享
+    def __init__(self, style: CellStyle):
+        self.name = (f'pyoctopus {style.font_size} {style.font_bold} {style.font_color} {style.background_color} '
+                     f'{style.border_color} {style.alignment}')
+        self.font = Font(size=style.font_size, bold=style.font_bold, color=style.font_color)
+        self.fill = PatternFill(fill_type="solid", start_color=style.background_color,
+                                end_color=style.background_color)
+        self.alignment = Alignment(horizontal=style.alignment, vertical="center", wrap_text=True)
+        self.border = Border(
+            left=Side(style="thin", color=style.border_color),
+            right=Side(style="thin", color=style.border_color),
+            top=Side(style="thin", color=style.border_color),
+            bottom=Side(style="thin", color=style.border_color),
+        )
 
+    def register(self, wb) -> str:
+        # 样式作为命名样式在工作簿中注册一次，之后的单元格按名称引用，避免每个单元格都做样式去重
+        if self.name not in wb.named_styles:
+            wb.add_named_style(NamedStyle(name=self.name, font=self.font, fill=self.fill,
+                                          alignment=self.alignment, border=self.border))
+        return self.name
 
-def new(file: str, append: bool = False, header_style: CellStyle = None,
-        columns: list[Column] = None) -> Collector:
-    if header_style is None:
-        header_style = CellStyle(font_size=12, font_bold=True, font_color='FFFFFF', background_color='808080',
-                                 alignment='left')
 
-    if not append and os.path.exists(file):
-        os.remove(file)
+def _default_header_style() -> CellStyle:
+    return CellStyle(font_size=12, font_bold=True, font_color='FFFFFF', background_color='808080', alignment='left')
+
+
+def _display_width(value) -> int:
+    return sum(2 if '\u4e00' <= char <= '\u9fff' else 1 for char in str(value))
+
 
-    if os.path.exists(file):
-        wb = openpyxl.load_workbook(file)
+def _to_row(r: R, columns: list[Column] | None) -> list[str]:
+    if not columns:
+        values = [(v, None) for v in fields(r).values()]
     else:
-        wb = openpyxl.Workbook()
+        # 只读取列中的字段，lazy 结果对象的其他字段不会求值
+        values = [(field(r, c.field), c) for c in columns]
+    row = []
+    for value in values:
+        if value[0] is None:
+            row.append('')
+        elif isinstance(value[0], list):
+            row.append((value[1].style.delimiter if value[1] else '\n').join([str(v) for v in value[0]]))
+        else:
+            row.append(str(value[0]))
+    return row
 
-    sheet = wb.active
 
-    if columns and sheet.max_row == 1:
-        sheet.append([c.name for c in columns])
-        for cell in sheet[1]:
-            _set_cell_style(cell, header_style)
-        wb.save(file)
+class _ColumnWidths:
+    # 增量记录每列的最大宽度，避免每写一行都扫描整张表
+    def __init__(self):
+        self.widths: list[int] = []
+
+    def update(self, row: list) -> list[int]:
+        changed = []
+        for i, v in enumerate(row):
+            w = _display_width(v) + 2 if v is not None else 2
+            if i >= len(self.widths):
+                self.widths.append(w)
+                changed.append(i)
+            elif w > self.widths[i]:
+                self.widths[i] = w
+                changed.append(i)
+        return changed
+
 
-    def _collect(r: R) -> None:
-        keys = r.__dict__.keys()
-        _vals = []
-        if not columns:
-            values = [(r.__dict__.get(k, None), None) for k in keys]
+class ExcelCollector:
+    def __init__(self, file: str, append: bool = False, header_style: CellStyle = None,
+                 columns: list[Column] = None):
+        self._file = file
+        self._columns = columns
+        self._lock = threading.Lock()
+        self._widths = _ColumnWidths()
+        self._default_format = _CellFormat(CellStyle())
+        self._formats = [_CellFormat(c.style) if c.style else self._default_format for c in columns or []]
+
+        if not append and os.path.exists(file):
+            os.remove(file)
+
+        if os.path.exists(file):
+            self._wb = openpyxl.load_workbook(file)
         else:
-            values = [(r.__dict__.get(c.field, None), c) for c in columns]
-        for value in values:
-            if value[0] is None:
-                _vals.append('')
-            elif isinstance(value[0], list):
-                _vals.append((value[1].style.delimiter if value[1] else '\n').join([str(v) for v in value[0]]))
-            else:
-                _vals.append(str(value[0]))
-        sheet.append(_vals)
-        for i, cell in enumerate(sheet[sheet.max_row]):
-            col_style = columns[i].style if columns and columns[i].style else CellStyle()
-            _set_cell_style(cell, col_style)
-
-        # 自动设置列宽
-        for column in sheet.columns:
-            max_length = 0
-            column_letter = column[0].column_letter  # 获取列字母
-            for cell in column:
-                length = sum(
-                    2 if '\u4e00' <= char <= '\u9fff' else 1 for char in str(cell.value))
-                max_length = max(max_length, length)
-            adjusted_width = max_length + 2
-            sheet.column_dimensions[column_letter].width = adjusted_width
+            self._wb = openpyxl.Workbook()
+
+        self._sheet = self._wb.active
+        for row in self._sheet.iter_rows(values_only=True):
+            self._widths.update(row)
+        self._default_style = self._default_format.register(self._wb)
+        self._styles = [f.register(self._wb) for f in self._formats]
+
+        if columns and self._sheet.max_row == 1:
+            header = _CellFormat(header_style or _default_header_style()).register(self._wb)
+            self._append([c.name for c in columns], [header] * len(columns))
+            self._wb.save(file)
+
+    def __call__(self, r: R) -> None:
+        row = _to_row(r, self._columns)
+        with self._lock:
+            self._append(row, self._styles)
+            self._wb.save(self._file)
+
+    def _append(self, row: list[str], styles: list[str]):
+        self._sheet.append(row)
+        for i, cell in enumerate(self._sheet[self._sheet.max_row]):
+            cell.style = styles[i] if i < len(styles) else self._default_style
+        for i in self._widths.update(row):
+            self._sheet.column_dimensions[get_column_letter(i + 1)].width = self._widths.widths[i]
+
+    def close(self):
+        with self._lock:
+            self._wb.save(self._file)
+
 
+class StreamingExcelCollector:
+    """
+    基于 openpyxl 只写模式的 Excel 收集器
+
+    记录先缓存在内存中，缓存满后追加到临时文件；每隔 flush_interval 秒以及 close 时，
+    用只写工作簿从临时文件流式生成完整的 Excel，写入同目录的临时文件后原子替换目标文件。
+    定时生成在后台线程中进行，只读取触发时已写入临时文件的行，收集记录的线程不必等待。
+    """
+
+    def __init__(self, file: str, append: bool = False, header_style: CellStyle = None,
+                 columns: list[Column] = None, *, buffer_size: int = 1000, flush_interval: float = 300):
+        self._file = file
+        self._columns = columns
+        self._header_style = header_style or _default_header_style()
+        self._buffer_size = buffer_size
+        self._flush_interval = flush_interval
+        self._lock = threading.Lock()
+        # 同一时间只生成一个文件，并且不会用较旧的快照覆盖较新的
+        self._write_lock = threading.Lock()
+        self._buffer: list[list[str]] = []
+        self._widths = _ColumnWidths()
+        fd, self._spool_path = tempfile.mkstemp(suffix='.jsonl')
+        self._spool = os.fdopen(fd, 'w', encoding='utf-8')
+        # 已写入临时文件的行数与已生成到 Excel 中的行数
+        self._rows = 0
+        self._written = -1
+        self._dirty = False
+        self._closed = False
+        self._last_flush = time.monotonic()
+        self._flusher: threading.Thread | None = None
+
+        if columns:
+            self._widths.update([c.name for c in columns])
+        if append and os.path.exists(file):
+            self._load_existing()
+        elif not append and os.path.exists(file):
+            os.remove(file)
+
+    def __call__(self, r: R) -> None:
+        row = _to_row(r, self._columns)
+        snapshot = None
+        with self._lock:
+            if self._closed:
+                raise RuntimeError(f'Excel collector for [{self._file}] is closed')
+            self._buffer.append(row)
+            self._widths.update(row)
+            self._dirty = True
+            if len(self._buffer) >= self._buffer_size:
+                self._spill()
+            if (self._flush_interval is not None and time.monotonic() - self._last_flush >= self._flush_interval
+                    and (self._flusher is None or not self._flusher.is_alive())):
+                snapshot = self._snapshot()
+                if snapshot is not None:
+                    self._flusher = threading.Thread(target=self._flush_in_background, args=snapshot,
+                                                     name='ExcelFlusher', daemon=True)
+                    self._flusher.start()
+
+    def flush(self):
+        with self._lock:
+            if self._closed:
+                return
+            snapshot = self._snapshot()
+        if snapshot is not None:
+            self._rebuild(*snapshot)
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            flusher = self._flusher
+        if flusher is not None:
+            # 后台生成失败时会重新标记为需要生成
+            flusher.join()
+        with self._lock:
+            snapshot = self._snapshot()
+            self._spool.close()
+        try:
+            if snapshot is not None:
+                self._rebuild(*snapshot)
+        finally:
+            os.remove(self._spool_path)
+
+    def _load_existing(self):
+        wb = openpyxl.load_workbook(self._file, read_only=True)
+        try:
+            rows = wb.active.iter_rows(values_only=True)
+            if self._columns:
+                # 表头由本收集器重新生成
+                next(rows, None)
+            for row in rows:
+                row = ['' if v is None else str(v) for v in row]
+                self._spool.write(json.dumps(row, ensure_ascii=False))
+                self._spool.write('\n')
+                self._rows += 1
+                self._widths.update(row)
+        finally:
+            wb.close()
+        self._dirty = True
+
+    def _spill(self):
+        self._spool.writelines(json.dumps(row, ensure_ascii=False) + '\n' for row in self._buffer)
+        self._rows += len(self._buffer)
+        self._buffer = []
+
+    def _snapshot(self) -> tuple[int, list[int]] | None:
+        # 在 self._lock 中调用：把缓存写入临时文件，返回此刻的行数和列宽
+        self._last_flush = time.monotonic()
+        if not self._dirty:
+            return None
+        self._spill()
+        self._spool.flush()
+        self._dirty = False
+        return self._rows, list(self._widths.widths)
+
+    def _flush_in_background(self, rows: int, widths: list[int]):
+        try:
+            self._rebuild(rows, widths)
+        except Exception:
+            _logger.exception(f'Can not flush excel file [{self._file}]')
+
+    def _rebuild(self, rows: int, widths: list[int]):
+        with self._write_lock:
+            if rows <= self._written:
+                return
+            d = os.path.dirname(os.path.abspath(self._file))
+            fd, tmp = tempfile.mkstemp(suffix='.xlsx', dir=d)
+            os.close(fd)
+            try:
+                self._write(tmp, rows, widths)
+                os.replace(tmp, self._file)
+            except BaseException:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                with self._lock:
+                    # 下一次定时生成或 close 时重试
+                    self._dirty = True
+                raise
+            self._written = rows
+        _logger.debug(f'Flushed excel file [{self._file}]')
+
+    def _write(self, file: str, rows: int, widths: list[int]):
+        wb = openpyxl.Workbook(write_only=True)
+        sheet = wb.create_sheet()
+        # 只写模式下列宽必须在写入任何行之前设置
+        for i, w in enumerate(widths):
+            sheet.column_dimensions[get_column_letter(i + 1)].width = w
+        default_style = _CellFormat(CellStyle()).register(wb)
+        styles = [_CellFormat(c.style).register(wb) if c.style else default_style for c in self._columns or []]
+
+        def _cells(values: list[str], ss: list[str]):
+            cells = []
+            for i, v in enumerate(values):
+                cell = WriteOnlyCell(sheet, v)
+                cell.style = ss[i] if i < len(ss) else default_style
+                cells.append(cell)
+            return cells
+
+        if self._columns:
+            header = _CellFormat(self._header_style).register(wb)
+            sheet.append(_cells([c.name for c in self._columns], [header] * len(self._columns)))
+        # 单独打开临时文件读取，收集线程可以继续追加；只读取快照时已经写入的行
+        with open(self._spool_path, encoding='utf-8') as spool:
+            for line in islice(spool, rows):
+                sheet.append(_cells(json.loads(line), styles))
         wb.save(file)
 
-    return _collect
+
+def new(file: str, append: bool = False, header_style: CellStyle = None,
+        columns: list[Column] = None, *, streaming: bool = False, buffer_size: int = 1000,
+        flush_interval: float = 300) -> Collector:
+    if streaming:
+        return StreamingExcelCollector(file, append, header_style, columns, buffer_size=buffer_size,
+                                       flush_interval=flush_interval)
+    return ExcelCollector(file, append, header_style, columns)
 
 
 def new_column(field: str, column: str, style: CellStyle = None) -> Column:
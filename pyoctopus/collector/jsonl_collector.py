@@ -0,0 +1,36 @@
+import json
+import os
+
+from .buffered_collector import BufferedCollector, Sink, to_json_default
+from ..types import Collector
+
+
+class JsonlSink(Sink):
+    def __init__(self, file: str, append: bool = True, encoding: str = 'utf-8'):
+        self._file = file
+        self._append = append
+        self._encoding = encoding
+        self._f = None
+
+    def open(self):
+        d = os.path.dirname(os.path.abspath(self._file))
+        if not os.path.exists(d):
+            os.makedirs(d)
+        self._f = open(self._file, 'a' if self._append else 'w', encoding=self._encoding)
+
+    def write(self, records: list[dict]):
+        self._f.write(''.join(json.dumps(r, ensure_ascii=False, default=to_json_default) + '\n' for r in records))
+        self._f.flush()
+
+    def close(self):
+        if self._f is not None:
+            self._f.close()
+
+    def __str__(self):
+        return f'JsonlSink{{file={self._file}}}'
+
+
+def new(file: str, append: bool = True, *, encoding: str = 'utf-8', buffer_size: int = 10000, batch_size: int = 500,
+        flush_interval: float = 1, retries: int = 3, retry_backoff: float = 0.5) -> Collector:
+    return BufferedCollector(JsonlSink(file, append, encoding), buffer_size=buffer_size, batch_size=batch_size,
+                             flush_interval=flush_interval, retries=retries, retry_backoff=retry_backoff)
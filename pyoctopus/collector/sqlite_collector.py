@@ -0,0 +1,48 @@
+import sqlite3
+
+from .buffered_collector import BufferedCollector, Sink, to_scalar
+from ..types import Collector
+
+
+class SqliteSink(Sink):
+    def __init__(self, db: str, table: str, fields: list[str] = None):
+        self._db = db
+        self._table = table
+        self._fields = fields
+        self._sql_insert = None
+        self._connection = None
+
+    def open(self):
+        # 连接在后台写线程中创建，只在该线程中使用
+        self._connection = sqlite3.connect(self._db)
+        if self._fields:
+            self._init_table()
+
+    def write(self, records: list[dict]):
+        if self._sql_insert is None:
+            if self._fields is None:
+                self._fields = list(records[0].keys())
+            self._init_table()
+        rows = [tuple(to_scalar(r.get(k, None)) for k in self._fields) for r in records]
+        # 一个批次在同一个事务中写入
+        with self._connection:
+            self._connection.executemany(self._sql_insert, rows)
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+
+    def _init_table(self):
+        cols = ", ".join(f'"{f}"' for f in self._fields)
+        with self._connection:
+            self._connection.execute(f'CREATE TABLE IF NOT EXISTS "{self._table}" ({cols})')
+        self._sql_insert = f'INSERT INTO "{self._table}" ({cols}) VALUES ({", ".join("?" for _ in self._fields)})'
+
+    def __str__(self):
+        return f'SqliteSink{{db={self._db}, table={self._table}}}'
+
+
+def new(db: str, table: str, *, fields: list[str] = None, buffer_size: int = 10000, batch_size: int = 500,
+        flush_interval: float = 1, retries: int = 3, retry_backoff: float = 0.5) -> Collector:
+    return BufferedCollector(SqliteSink(db, table, fields), buffer_size=buffer_size, batch_size=batch_size,
+                             flush_interval=flush_interval, retries=retries, retry_backoff=retry_backoff)
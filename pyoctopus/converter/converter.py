@@ -3,19 +3,44 @@ from typing import List
 
 from ..types import Converter
 
+
+# 转换函数标注了返回类型，收集器可以据此推断结果字段的类型
+# native_types 中类型的值（例如 JSON 中的数值）可以不转为字符串直接交给转换函数
 def int_converter(default_value: int = None) -> Converter:
-    return lambda x: int(x) if x else default_value
+    def _convert(x: str) -> int:
+        if type(x) is int:
+            return x
+        return int(x) if x else default_value
+
+    _convert.native_types = (int,)
+    return _convert
 
 
 def float_converter(default_value: int = None) -> Converter:
-    return lambda x: float(x) if x else default_value
+    def _convert(x: str) -> float:
+        if type(x) in (int, float):
+            return float(x)
+        return float(x) if x else default_value
+
+    _convert.native_types = (int, float)
+    return _convert
 
 
 def bool_converter(true_values: List[str] = None, default_value: int = None) -> Converter:
     if true_values is None:
         true_values = ['true', '1', 'y', 'yes', 'on', 't']
-    return lambda x: x.lower() in true_values if x else default_value
+
+    def _convert(x: str) -> bool:
+        if type(x) is bool:
+            return x
+        return x.lower() in true_values if x else default_value
+
+    _convert.native_types = (bool,)
+    return _convert
 
 
 def datetime_converter(pattern='%Y-%m-%d %H:%M:%S', default_value: datetime = None) -> Converter:
-    return lambda x: datetime.strptime(x, pattern) if x else default_value
+    def _convert(x: str) -> datetime:
+        return datetime.strptime(x, pattern) if x else default_value
+
+    return _convert
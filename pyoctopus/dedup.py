@@ -0,0 +1,68 @@
+import threading
+
+
+class SeenFilter:
+    """
+    工作线程侧的链接去重过滤器
+
+    由所有工作线程共享的已见请求 ID 集合，加上每个线程自己的小缓存：同一页面或同一线程中反复出现的链接
+    在本地缓存中就能命中，不必访问共享集合。共享集合按两代轮换，当前一代达到容量的一半时整体降为旧一代，
+    因此内存有上限，被淘汰的 ID 仍会由调度线程通过 Store.exists_all 兜底去重。
+
+    过滤器只用于提前丢弃确定重复的链接，判断为未见过的链接仍然需要经过存储检查；没有写入存储的链接需要通过 discard 移除，
+    否则之后再次发现时会被误判为重复。每个 ID 约占 100 字节，默认容量约占用 10MB 内存。
+    """
+
+    def __init__(self, capacity: int = 100_000, local_size: int = 4096):
+        self._generation_size = max(1, capacity // 2)
+        self._local_size = local_size
+        self._current: set[str] = set()
+        self._previous: set[str] = set()
+        # 移除 ID 时递增，各线程的本地缓存发现版本变化后清空
+        self._version = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def add(self, id: str) -> bool:
+        """
+        记录请求 ID，返回 ID 之前是否未见过
+        """
+        local = getattr(self._local, "seen", None)
+        if local is None or self._local.version != self._version:
+            local = self._local.seen = set()
+            self._local.version = self._version
+        if id in local:
+            return False
+        if len(local) >= self._local_size:
+            local.clear()
+        local.add(id)
+        with self._lock:
+            if id in self._current or id in self._previous:
+                return False
+            self._current.add(id)
+            if len(self._current) >= self._generation_size:
+                self._previous = self._current
+                self._current = set()
+        return True
+
+    def discard(self, ids: list[str]) -> None:
+        """
+        移除请求 ID，用于没有成功写入存储的请求
+        """
+        if not ids:
+            return
+        with self._lock:
+            for id in ids:
+                self._current.discard(id)
+                self._previous.discard(id)
+            self._version += 1
+
+    def __contains__(self, id: str) -> bool:
+        return id in self._current or id in self._previous
+
+    def __len__(self) -> int:
+        return len(self._current) + len(self._previous)
+
+
+def new(capacity: int = 100_000, local_size: int = 4096) -> SeenFilter:
+    return SeenFilter(capacity, local_size)
@@ -1,3 +1,16 @@
-from .downloader import requests_downloader, curl_cffi_downloader
+from typing import TYPE_CHECKING
+
+from .._lazy import attach
+
+_EXPORTS = {
+    "requests_downloader": ".downloader:requests_downloader",
+    "curl_cffi_downloader": ".curl_cffi_downloader:curl_cffi_downloader",
+}
 
 __all__ = ["requests_downloader", "curl_cffi_downloader"]
+
+__getattr__, __dir__ = attach(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .downloader import requests_downloader
+    from .curl_cffi_downloader import curl_cffi_downloader
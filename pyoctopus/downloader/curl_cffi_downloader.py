@@ -0,0 +1,57 @@
+from curl_cffi import CurlInfo
+from curl_cffi import requests as curl_cffi
+
+from .downloader import _DEFAULT_HEADERS
+from ..request import Request
+from ..response import Response
+from ..site import Site
+
+_CURL_TIMING_INFOS = [
+    CurlInfo.NAMELOOKUP_TIME,
+    CurlInfo.CONNECT_TIME,
+    CurlInfo.APPCONNECT_TIME,
+    CurlInfo.STARTTRANSFER_TIME,
+    CurlInfo.TOTAL_TIME,
+]
+
+
+def _curl_timings(infos: dict) -> dict[str, float]:
+    # curl 给出的是从请求开始累计的时间点，这里换算为各阶段耗时
+    dns = infos.get(CurlInfo.NAMELOOKUP_TIME, 0.0)
+    connect = infos.get(CurlInfo.CONNECT_TIME, 0.0)
+    tls = infos.get(CurlInfo.APPCONNECT_TIME, 0.0)
+    start_transfer = infos.get(CurlInfo.STARTTRANSFER_TIME, 0.0)
+    total = infos.get(CurlInfo.TOTAL_TIME, 0.0)
+    ready = max(connect, tls)
+    return {
+        "dns": dns,
+        "connect": max(0.0, connect - dns),
+        "tls": max(0.0, tls - connect) if tls > 0 else 0.0,
+        "ttfb": max(0.0, start_transfer - ready),
+        "body": max(0.0, total - start_transfer),
+    }
+
+
+def curl_cffi_downloader(request: Request, site: Site) -> Response:
+    h = {**_DEFAULT_HEADERS, **site.headers, **request.headers}
+    p = {}
+    if site.proxy:
+        p = {"http": site.proxy, "https": site.proxy}
+    with curl_cffi.Session(curl_infos=_CURL_TIMING_INFOS) as s:
+        r = s.request(
+            request.method,
+            request.url,
+            params=request.queries,
+            data=request.data,
+            headers=h,
+            proxies=p,
+            timeout=site.timeout,
+            impersonate="chrome",
+        )
+    res = Response(request)
+    res.timings = _curl_timings(r.infos)
+    res.status = r.status_code
+    res.content = r.content
+    res.headers = {k.lower(): v for k, v in r.headers.items()}
+    res.encoding = r.encoding or site.encoding or "utf-8"
+    return res
@@ -1,4 +1,5 @@
-from curl_cffi import requests as curl_cffi
+from time import perf_counter
+
 import requests
 from ..request import Request
 from ..response import Response
@@ -8,35 +9,12 @@ _DEFAULT_HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
 }
 
-
-def curl_cffi_downloader(request: Request, site: Site) -> Response:
-    h = {**_DEFAULT_HEADERS, **site.headers, **request.headers}
-    p = {}
-    if site.proxy:
-        p = {"http": site.proxy, "https": site.proxy}
-    r = curl_cffi.request(
-        request.method,
-        request.url,
-        params=request.queries,
-        data=request.data,
-        headers=h,
-        proxies=p,
-        timeout=site.timeout,
-        impersonate="chrome",
-    )
-    res = Response(request)
-    res.status = r.status_code
-    res.content = r.content
-    res.headers = {k.lower(): v for k, v in r.headers.items()}
-    res.encoding = r.encoding or site.encoding or "utf-8"
-    return res
-
-
 def requests_downloader(request: Request, site: Site) -> Response:
     h = {**_DEFAULT_HEADERS, **site.headers, **request.headers}
     p = {}
     if site.proxy:
         p = {"http": site.proxy, "https": site.proxy}
+    start = perf_counter()
     r = requests.request(
         request.method,
         request.url,
@@ -46,7 +24,11 @@ def requests_downloader(request: Request, site: Site) -> Response:
         proxies=p,
         timeout=site.timeout,
     )
+    total = perf_counter() - start
     res = Response(request)
+    # requests 只提供收到响应头的耗时，无法区分 DNS 与建立连接
+    ttfb = r.elapsed.total_seconds()
+    res.timings = {"ttfb": ttfb, "body": max(0.0, total - ttfb)}
     res.status = r.status_code
     res.content = r.content
     res.headers = {k.lower(): v for k, v in r.headers.items()}
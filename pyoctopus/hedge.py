@@ -0,0 +1,209 @@
+import itertools
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from time import monotonic
+
+from .request import Request
+from .response import Response
+
+_logger = logging.getLogger("pyoctopus.hedge")
+
+# 每新增多少个样本重新计算一次延迟分位数
+_RECOMPUTE_EVERY = 16
+
+# 没有调用方预留线程（单独使用策略）时线程池的大小
+_DEFAULT_WORKERS = 32
+
+
+class HedgePolicy:
+    """
+    对冲请求策略
+
+    请求耗时超过站点近期观测到的分位数延迟（默认 p95）仍未完成时，再发出一个相同的请求（可以换用其他代理），
+    取先成功的一个结果，另一个尽量取消。对冲请求数不超过总请求数的 budget 比例。
+
+    原始请求和对冲请求都在线程池中执行，每个同时下载的调用方最多占用两个线程。max_workers 为空时线程池按
+    reserve 预留的调用方数量确定大小（Octopus 按工作线程数预留），原始请求不会在线程池中排队。
+    """
+
+    def __init__(
+        self,
+        *,
+        percentile: float = 0.95,
+        budget: float = 0.05,
+        min_samples: int = 20,
+        window: int = 200,
+        min_delay: float = 0.05,
+        proxies: list[str] = None,
+        max_workers: int = None,
+    ):
+        if not 0 < percentile < 1:
+            raise ValueError("percentile must be between 0 and 1")
+        if budget < 0:
+            raise ValueError("budget can not be negative")
+        self._percentile = percentile
+        self._budget = budget
+        self._min_samples = max(1, min_samples)
+        self._min_delay = min_delay
+        self._proxies = itertools.cycle(proxies) if proxies else None
+        self._max_workers = max_workers
+        self._callers = 0
+        self._samples = deque(maxlen=window)
+        self._unsorted = 0
+        self._delay = None
+        self._requests = 0
+        self._hedges = 0
+        self._wins = 0
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def download(self, downloader, request: Request, site) -> Response:
+        delay = self._start()
+        start = monotonic()
+        if delay is None:
+            res = downloader(request, site)
+            self._observe(monotonic() - start)
+            return res
+
+        started = threading.Event()
+
+        def _primary():
+            # 只统计原始请求开始执行后的耗时，以反映站点真实的响应延迟
+            nonlocal start
+            start = monotonic()
+            started.set()
+            res = downloader(request, site)
+            self._observe(monotonic() - start)
+            return res
+
+        primary = self._get_executor().submit(_primary)
+        try:
+            return primary.result(timeout=delay)
+        except TimeoutError:
+            pass
+        if not started.is_set():
+            # 线程池已满、原始请求还在排队时不对冲，排队时间不是站点的延迟
+            return primary.result()
+        remaining = delay - (monotonic() - start)
+        if remaining > 0:
+            try:
+                return primary.result(timeout=remaining)
+            except TimeoutError:
+                pass
+
+        if not self._take_budget():
+            return primary.result()
+        if site.limiter is not None and site.limiter.try_acquire() > 0:
+            # 对冲请求同样受站点限速约束，没有空闲令牌时不再对冲
+            self._give_back_budget()
+            return primary.result()
+
+        _logger.debug(f"Hedge [{request}] after {delay:.3f}s")
+        hedge = self._get_executor().submit(downloader, request, self._hedge_site(site))
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for f in done:
+                if f.exception() is None:
+                    for other in pending:
+                        # 已经开始执行的请求无法中断，只能丢弃其结果
+                        other.cancel()
+                    if f is hedge:
+                        with self._lock:
+                            self._wins += 1
+                    return f.result()
+        raise primary.exception()
+
+    def reserve(self, callers: int):
+        """
+        预留 callers 个同时下载的调用方，需要在第一次下载前调用
+        """
+        with self._lock:
+            self._callers += callers
+            if self._executor is not None:
+                _logger.warning("Hedge executor already started, reserved callers are ignored")
+
+    def get_statistics(self) -> tuple[int, int, int]:
+        """
+        :return: (请求数, 对冲请求数, 对冲请求先完成的次数)
+        """
+        with self._lock:
+            return self._requests, self._hedges, self._wins
+
+    @property
+    def delay(self) -> float | None:
+        with self._lock:
+            return self._delay
+
+    def _start(self) -> float | None:
+        with self._lock:
+            self._requests += 1
+            return self._delay
+
+    def _take_budget(self) -> bool:
+        with self._lock:
+            if self._hedges + 1 > self._budget * self._requests:
+                return False
+            self._hedges += 1
+            return True
+
+    def _give_back_budget(self):
+        with self._lock:
+            self._hedges -= 1
+
+    def _observe(self, elapsed: float):
+        with self._lock:
+            self._samples.append(elapsed)
+            self._unsorted += 1
+            if len(self._samples) < self._min_samples:
+                return
+            if self._delay is None or self._unsorted >= _RECOMPUTE_EVERY:
+                ordered = sorted(self._samples)
+                index = min(len(ordered) - 1, int(len(ordered) * self._percentile))
+                self._delay = max(self._min_delay, ordered[index])
+                self._unsorted = 0
+
+    def _hedge_site(self, site):
+        if self._proxies is None:
+            return site
+        with self._lock:
+            proxy = next(self._proxies)
+        return site.with_proxy(proxy)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    workers = self._max_workers
+                    if workers is None:
+                        workers = 2 * self._callers if self._callers > 0 else _DEFAULT_WORKERS
+                    self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hedge")
+        return self._executor
+
+    def __str__(self):
+        return f"{{percentile={self._percentile}, budget={self._budget}, delay={self._delay}}}"
+
+    __repr__ = __str__
+
+
+def new(
+    *,
+    percentile: float = 0.95,
+    budget: float = 0.05,
+    min_samples: int = 20,
+    window: int = 200,
+    min_delay: float = 0.05,
+    proxies: list[str] = None,
+    max_workers: int = None,
+) -> HedgePolicy:
+    return HedgePolicy(
+        percentile=percentile,
+        budget=budget,
+        min_samples=min_samples,
+        window=window,
+        min_delay=min_delay,
+        proxies=proxies,
+        max_workers=max_workers,
+    )
@@ -1,40 +1,95 @@
 import threading
-from datetime import datetime, timedelta
-from time import sleep
+from time import monotonic, sleep
 
 
 class Limiter:
+    """
+    基于 time.monotonic() 的令牌桶限速器
+
+    桶容量 capacity 即突发速率，每 interval_in_seconds 秒补充一个令牌即持续速率。
+    令牌以浮点数累计，不会因取整丢失。锁只保护令牌计算，等待总是在锁外进行。
+    """
+
     def __init__(self, interval_in_seconds: float, capacity: int):
-        self._capacity = capacity
+        if interval_in_seconds <= 0:
+            raise ValueError('interval_in_seconds must be greater than 0')
+        if capacity <= 0:
+            raise ValueError('capacity must be greater than 0')
+        self._capacity = float(capacity)
         self._interval = interval_in_seconds
-        self._count = 0
-        self._last_time = datetime.now()
-        self._lock = threading.RLock()
+        self._rate = 1.0 / interval_in_seconds
+        self._tokens = float(capacity)
+        self._last_time = monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> float:
+        return self._capacity
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    def try_acquire(self, tokens: float = 1) -> float:
+        """
+        非阻塞地获取令牌
+
+        :return: 0 表示获取成功，否则为令牌可用前需要等待的秒数（此时不消耗令牌）
+        """
+        with self._lock:
+            self._refill(monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self._rate
 
     def acquire(self, timeout_milliseconds: int = None) -> bool:
+        wait = self._reserve(timeout_milliseconds)
+        if wait is None:
+            return False
+        if wait > 0:
+            sleep(wait)
+        return True
+
+    async def acquire_async(self, timeout_milliseconds: int = None) -> bool:
+        wait = self._reserve(timeout_milliseconds)
+        if wait is None:
+            return False
+        if wait > 0:
+            # 调用方已在事件循环中，asyncio 必然已经导入，这里导入不会增加启动耗时
+            import asyncio
+
+            await asyncio.sleep(wait)
+        return True
+
+    def _reserve(self, timeout_milliseconds: int = None) -> float | None:
+        # 预约一个令牌，令牌数可以为负，调用方在锁外等待返回的时长
+        # 预约使并发调用方按到达顺序排队，而不是在令牌补充时一起醒来争抢
         with self._lock:
-            if timeout_milliseconds is None or timeout_milliseconds <= 0:
-                return self._acquire()
-            else:
-                return self._acquire(datetime.now() + timedelta(milliseconds=timeout_milliseconds))
-
-    def _acquire(self, end_time: datetime = None) -> bool:
-        now = datetime.now()
-        self._count = min(self._capacity,
-                          self._count + int((now.timestamp() - self._last_time.timestamp()) / self._interval))
-        if self._count > 0:
-            self._count = self._count - 1
+            self._refill(monotonic())
+            wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self._rate
+            if timeout_milliseconds is not None and 0 < timeout_milliseconds and wait > timeout_milliseconds / 1000:
+                return None
+            self._tokens -= 1
+            return wait
+
+    def _refill(self, now: float):
+        elapsed = now - self._last_time
+        if elapsed > 0:
+            self._tokens = min(self._capacity, self._tokens + elapsed * self._rate)
             self._last_time = now
-            return True
-        if end_time is None:
-            sleep(self._interval - now.timestamp() + self._last_time.timestamp())
-            return self._acquire(end_time)
-        else:
-            if now > end_time:
-                return False
-            sleep(min(self._interval, self._interval - now.timestamp() + self._last_time.timestamp()))
-            return self._acquire(end_time)
+
+    def __str__(self):
+        return f'{{rate={self._rate}/s, capacity={self._capacity}}}'
+
+    __repr__ = __str__
 
 
 def new(interval_in_seconds: float = 1, capacity: int = 1) -> Limiter:
     return Limiter(interval_in_seconds, capacity)
+
+
+def new_rate(rate: float, burst: int = 1) -> Limiter:
+    if rate <= 0:
+        raise ValueError('rate must be greater than 0')
+    return Limiter(1.0 / rate, burst)
@@ -0,0 +1,235 @@
+import bisect
+import math
+import threading
+from time import perf_counter
+
+# 默认直方图分桶（秒），与 Prometheus 客户端的默认值一致并向两端扩展
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, math.inf)
+
+# 字节数直方图分桶
+BYTES_BUCKETS = (1 << 10, 4 << 10, 16 << 10, 64 << 10, 256 << 10, 1 << 20, 4 << 20, 16 << 20, math.inf)
+
+
+class Counter:
+    def __init__(self, name: str, labels: dict[str, str]):
+        self.name = name
+        self.labels = labels
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, n: float = 1):
+        with self._lock:
+            self._value += n
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+    def snapshot(self) -> dict:
+        return {'labels': self.labels, 'value': self._value}
+
+
+class Histogram:
+    def __init__(self, name: str, labels: dict[str, str], buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.labels = labels
+        self.buckets = buckets if buckets[-1] == math.inf else (*buckets, math.inf)
+        self._counts = [0] * len(self.buckets)
+        self._count = 0
+        self._sum = 0.0
+        self._min = math.inf
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, v: float):
+        i = bisect.bisect_left(self.buckets, v)
+        with self._lock:
+            self._counts[i] += 1
+            self._count += 1
+            self._sum += v
+            if v < self._min:
+                self._min = v
+            if v > self._max:
+                self._max = v
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def sum(self) -> float:
+        return self._sum
+
+    def percentile(self, p: float) -> float | None:
+        """
+        根据分桶估算分位数，在命中的桶内线性插值
+        """
+        with self._lock:
+            if self._count == 0:
+                return None
+            rank = p * self._count
+            seen = 0
+            for i, c in enumerate(self._counts):
+                if seen + c >= rank and c > 0:
+                    lower = self.buckets[i - 1] if i > 0 else 0.0
+                    upper = self.buckets[i] if self.buckets[i] != math.inf else self._max
+                    return min(self._max, max(self._min, lower + (upper - lower) * (rank - seen) / c))
+                seen += c
+            return self._max
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                'labels': self.labels,
+                'count': self._count,
+                'sum': self._sum,
+                'min': self._min if self._count else None,
+                'max': self._max if self._count else None,
+                'buckets': list(zip(self.buckets, self._counts)),
+            }
+
+
+class _Timer:
+    def __init__(self, registry: 'Registry', name: str, labels: dict[str, str]):
+        self._registry = registry
+        self._name = name
+        self._labels = labels
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._registry.observe(self._name, perf_counter() - self._start, **self._labels)
+        return False
+
+
+class _NoopTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+_NOOP_TIMER = _NoopTimer()
+
+
+class Registry:
+    """
+    计数器与直方图的注册表
+
+    未启用时所有记录方法直接返回，调用方在热点路径上也可以先判断 enabled 以跳过计时本身。
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._counters: dict[tuple, Counter] = {}
+        self._histograms: dict[tuple, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, **labels) -> Counter:
+        key = (name, *sorted(labels.items()))
+        c = self._counters.get(key, None)
+        if c is None:
+            with self._lock:
+                c = self._counters.setdefault(key, Counter(name, labels))
+        return c
+
+    def histogram(self, name: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS, **labels) -> Histogram:
+        key = (name, *sorted(labels.items()))
+        h = self._histograms.get(key, None)
+        if h is None:
+            with self._lock:
+                h = self._histograms.setdefault(key, Histogram(name, labels, buckets))
+        return h
+
+    def inc(self, name: str, n: float = 1, **labels):
+        if self.enabled:
+            self.counter(name, **labels).inc(n)
+
+    def observe(self, name: str, value: float, **labels):
+        if self.enabled:
+            self.histogram(name, **labels).observe(value)
+
+    def timer(self, name: str, **labels):
+        if not self.enabled:
+            return _NOOP_TIMER
+        return _Timer(self, name, labels)
+
+    def counters(self) -> list[Counter]:
+        with self._lock:
+            return list(self._counters.values())
+
+    def histograms(self) -> list[Histogram]:
+        with self._lock:
+            return list(self._histograms.values())
+
+    def snapshot(self) -> dict[str, dict[str, list[dict]]]:
+        counters = {}
+        for c in self.counters():
+            counters.setdefault(c.name, []).append(c.snapshot())
+        histograms = {}
+        for h in self.histograms():
+            histograms.setdefault(h.name, []).append(h.snapshot())
+        return {'counters': counters, 'histograms': histograms}
+
+    def reset(self):
+        with self._lock:
+            self._counters = {}
+            self._histograms = {}
+
+
+_registry = Registry()
+
+# 全局注册表由手动开关和运行中的使用者（例如启用了指标的 Octopus）共同决定是否启用
+_switch_lock = threading.Lock()
+_manual = False
+_users = 0
+
+
+def get_registry() -> Registry:
+    return _registry
+
+
+def enable() -> Registry:
+    """
+    手动启用全局注册表，直到调用 disable
+    """
+    global _manual
+    with _switch_lock:
+        _manual = True
+        _registry.enabled = True
+    return _registry
+
+
+def disable():
+    """
+    关闭手动启用，仍有使用者时保持启用，最后一个使用者释放后关闭
+    """
+    global _manual
+    with _switch_lock:
+        _manual = False
+        _registry.enabled = _users > 0
+
+
+def acquire() -> Registry:
+    """
+    使用者开始记录指标，与 release 成对调用
+    """
+    global _users
+    with _switch_lock:
+        _users += 1
+        _registry.enabled = True
+    return _registry
+
+
+def release():
+    """
+    使用者停止记录指标，没有其他使用者且未手动启用时关闭全局注册表
+    """
+    global _users
+    with _switch_lock:
+        _users = max(0, _users - 1)
+        _registry.enabled = _manual or _users > 0
@@ -1,53 +1,108 @@
-import hashlib
 import logging
 import os
 import queue
 import re
+import sys
 import threading
+import time
+from time import perf_counter
 from concurrent.futures import ThreadPoolExecutor, wait, Future, ALL_COMPLETED
+from collections.abc import Mapping
 from enum import Enum
-from urllib.parse import urljoin, urlencode, parse_qs, urlparse
-
-import curl_cffi.requests as curl_cffi
-import requests
+from urllib.parse import urljoin, urlparse
 
+from .canonicalizer import Canonicalizer
+from .dedup import SeenFilter
 from .downloader import requests_downloader
 
-from .request import Request, State as RequestState
+from .request import Request, SharedDict, State as RequestState
+from .profiler import SamplingProfiler
 from .response import Response
+from .seeds import SeedFeeder, SeedSource
 from .site import Site
+from . import metrics
 from .store import Store, memory_store
+from .store.instrumented_store import InstrumentedStore
+from .stats_server import StatsServer
+from .throttle import HostThrottle, parse_retry_after
 from .types import Processor, Matcher, Downloader
 
 _HEADER_COOKIE = "Cookie"
 _HEADER_REFERER = "Referer"
 _HEADER_UA = "User-Agent"
+_HEADER_RETRY_AFTER = "Retry-After"
 _DEFAULT_HEADERS = {
     _HEADER_UA: "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
 }
 
 _REGEX_REFERER = re.compile(r"^(https?://([^/]+)).*$")
 
+_MAX_IDLE_WAIT = 1
+
+# 调度线程等待空闲工作名额时，每隔这么久消费一次入队队列
+_INTAKE_POLL_INTERVAL = 0.05
+
+# 检查待处理请求数量、决定是否继续读取种子的最小间隔
+_SEED_CHECK_INTERVAL = 0.2
+
+# 本地估算的待处理请求数量与存储重新同步的间隔
+_FRONTIER_SYNC_INTERVAL = 10
+
+# 默认的链接去重过滤器最多记住入队队列大小这么多倍的请求 ID
+_SEEN_FACTOR = 10
+
+_MSG_THROTTLED = "站点限流，延迟处理"
+
 _logger = logging.getLogger("pyoctopus")
 
 
-def _generate_request_id(r: Request) -> str:
-    parsed_url = urlparse(r.url)
-    existing_params = parse_qs(parsed_url.query)
-    if r.queries:
-        for k, v in r.queries.items():
-            q = []
-            q.extend(existing_params.get(k, []))
-            q.extend(v if v else [])
-            q = sorted(q)
-            existing_params[k] = q
-    url = parsed_url._replace(query=urlencode(sorted(existing_params.items()), doseq=True)).geturl()
-    if r.data:
-        url = f"{url}&{r.data}"
-    url = f"{r.method}{url}"
-    md5 = hashlib.md5()
-    md5.update(url.encode("utf-8"))
-    return md5.hexdigest()
+def _get_header(res: Response, name: str) -> str | None:
+    if not res.headers:
+        return None
+    return res.headers.get(name.lower(), None) or res.headers.get(name, None)
+
+
+def _get_name(o) -> str:
+    return getattr(o, "__name__", None) or type(o).__name__
+
+
+class _Lineage:
+    """
+    同一个父请求派生的子请求共用的请求头和属性
+
+    子请求没有自己的请求头时直接共享父请求的请求头（继承时）和 Referer，不再为每个子请求复制一份。
+    """
+
+    __slots__ = ("parent", "referer", "_headers", "_attrs")
+
+    def __init__(self, parent: Request):
+        self.parent = parent
+        m = _REGEX_REFERER.match(parent.url)
+        self.referer = sys.intern(m.group(1)) if m is not None else None
+        self._headers: dict[bool, SharedDict] = {}
+        self._attrs: SharedDict | None = None
+
+    def headers(self, inherit: bool) -> SharedDict:
+        h = self._headers.get(inherit, None)
+        if h is None:
+            h = _shared(self.parent.view()[0]) if inherit else _EMPTY_SHARED
+            if self.referer is not None and h.get(_HEADER_REFERER, None) is None:
+                h = h.merge({_HEADER_REFERER: self.referer})
+            self._headers[inherit] = h
+        return h
+
+    def attrs(self) -> SharedDict:
+        if self._attrs is None:
+            self._attrs = _shared(self.parent.view()[1])
+        return self._attrs
+
+
+_EMPTY_SHARED = SharedDict()
+
+
+def _shared(m: Mapping) -> SharedDict:
+    # 父请求自己的字典之后仍可能被修改，复制一份再共用
+    return m if isinstance(m, SharedDict) else SharedDict(m)
 
 
 class State(Enum):
@@ -69,17 +124,58 @@ class Octopus:
         sites: list[Site] = None,
         retries: int = 1,
         ignore_seed_when_has_waiting_requests: bool = False,
+        throttle_statuses: tuple[int, ...] = (429, 503),
+        default_retry_after: float = 60,
+        enable_metrics: bool = False,
+        stats_port: int = None,
+        stats_host: str = "127.0.0.1",
+        profiler: SamplingProfiler = None,
+        canonicalizer: Canonicalizer = None,
+        intake_size: int = 10000,
+        intake_batch_size: int = 500,
+        seen_filter: SeenFilter = None,
+        seed_batch_size: int = 1000,
+        seed_frontier_size: int = 10000,
+        seed_checkpoint: str = None,
     ):
         self.downloader = downloader or requests_downloader
         self._store = store or memory_store()
-        self._seeds = []
+        self._seeds: SeedFeeder | None = None
+        self._seed_batch_size = max(1, seed_batch_size)
+        self._seed_frontier_size = seed_frontier_size
+        self._seed_checkpoint = seed_checkpoint
+        self._next_seed_check = 0.0
+        # 调度线程按写入和取出的请求估算待处理数量，每隔 _FRONTIER_SYNC_INTERVAL 秒与存储同步一次
+        self._waiting = 0
+        self._next_frontier_sync = 0.0
         self._processors = processors if processors is not None else []
         self._threads = threads
         self._queue_factor = queue_factor
-        if sites:
-            self._sites = {s.host: s for s in sites}
+        self._sites = {s.host: s for s in sites} if sites else {}
+        for s in self._sites.values():
+            if s.hedge is not None:
+                s.hedge.reserve(threads)
         self.retries = retries
         self._ignore_seed_when_has_waiting_requests = ignore_seed_when_has_waiting_requests
+        self._throttle_statuses = set(throttle_statuses) if throttle_statuses else set()
+        self._throttle = HostThrottle(default_retry_after)
+        enable_metrics = enable_metrics or stats_port is not None
+        # 全局注册表只在运行期间（start 到 stop）启用，停止后不再影响同一进程中的其他代码
+        self._enable_metrics = enable_metrics
+        self._metrics = metrics.get_registry()
+        if enable_metrics:
+            self._store = InstrumentedStore(self._store, self._metrics)
+        self._stats_server = StatsServer(self, self._metrics, stats_host, stats_port) if stats_port is not None else None
+        self._profiler = profiler
+        self._canonicalizer = canonicalizer or Canonicalizer()
+        # 工作线程发现的新请求先放入有界的入队队列，队列满时阻塞工作线程，由调度线程按批写入存储
+        self._intake: queue.Queue[Request] = queue.Queue(maxsize=intake_size)
+        self._intake_batch_size = max(1, intake_batch_size)
+        # 默认容量按入队队列的大小确定，超出容量被淘汰的 ID 仍由 Store.exists_all 去重
+        self._seen = seen_filter or SeenFilter(capacity=_SEEN_FACTOR * intake_size)
+        self._in_flight: dict[str, int] = {}
+        self._busy_workers = 0
+        self._stats_lock = threading.Lock()
         self._lock = threading.Lock()
         self._semaphore = threading.Semaphore(self._queue_factor * self._threads)
         self._workers = None
@@ -88,23 +184,30 @@ class Octopus:
         self._boss_future = None
         self._queue = queue.Queue()
         self._state = State.INIT
+        # 多进程分片运行时由 cluster 设置，不属于本进程的主机的请求转给所属进程
+        self._router = None
 
-    def start_async(self, *seeds: Request | str) -> Future[None]:
+    def start_async(self, *seeds: SeedSource) -> Future[None]:
         if not self._set_state(State.STARTING, State.INIT):
             raise RuntimeError("Pyoctopus is not in INIT state")
         self._state = State.STARTING
+        if self._enable_metrics:
+            metrics.acquire()
         if not self._ignore_seed_when_has_waiting_requests or not self._store.has_waiting_requests():
-            self._seeds.extend([Request(s) if isinstance(s, str) else s for s in seeds])
-            for seed in self._seeds:
-                self._add(seed)
+            # 种子由调度线程分批读取，待处理的请求不足 seed_frontier_size 时才继续读取
+            self._seeds = SeedFeeder(seeds, self._seed_checkpoint)
         self._boss = ThreadPoolExecutor(max_workers=1, thread_name_prefix="boss")
         self._workers = ThreadPoolExecutor(max_workers=self._threads, thread_name_prefix="worker")
         self._boss_future = self._boss.submit(self._dispatch)
+        if self._profiler is not None:
+            self._profiler.start()
+        if self._stats_server is not None:
+            self._stats_server.start()
         _logger.info("Pyoctopus started")
         self._state = State.STARTED
         return self._boss_future
 
-    def start(self, *seeds: Request | str):
+    def start(self, *seeds: SeedSource):
         self.start_async(*seeds).result()
 
     def stop(self):
@@ -113,51 +216,178 @@ class Octopus:
         wait([self._boss_future, *self._workers_futures], return_when=ALL_COMPLETED)
         self._boss.shutdown()
         self._workers.shutdown()
+        self._close_processors()
+        if self._seeds is not None:
+            self._seeds.close()
+        if self._profiler is not None:
+            self._profiler.stop()
         self._state = State.STOPPED
         stat = self._store.get_statistics()
         _logger.info(
             f"Pyoctopus stats: all = {stat[0]}, waiting = {stat[1]}, executing = {stat[2]}, completed = {stat[3]}, failed = {stat[4]}"
         )
+        if self._stats_server is not None:
+            self._stats_server.stop()
+        if self._enable_metrics:
+            metrics.release()
         _logger.info("Pyoctopus stopped")
 
     def add(self, r: Request) -> None:
         with self._lock:
             if self._state.value > State.STARTED.value:
                 raise RuntimeError(f"Pyoctopus is in {self._state} state")
-        self._add(r)
+            started = self._state != State.INIT
+        if not started:
+            # 启动前没有调度线程消费入队队列，直接写入存储
+            if self._prepare(r) and not self._route(r):
+                self._persist([r])
+        else:
+            self._add(r)
+
+    def _add(self, r: Request, p: Request = None, lineage: "_Lineage" = None) -> None:
+        if self._prepare(r, p, lineage) and not self._route(r):
+            # 队列已满时阻塞，链接的发现速度不会超过存储的写入速度
+            self._intake.put(r)
+
+    def _route(self, r: Request) -> bool:
+        return self._router is not None and self._router.route(r)
 
-    def _add(self, r: Request, p: Request = None) -> None:
+    def _prepare(self, r: Request, p: Request = None, lineage: "_Lineage" = None) -> bool:
         if p is not None:
             r.parent = p.id
             r.depth = p.depth + 1
+            if lineage is None:
+                lineage = _Lineage(p)
+            headers, attrs = r.view()
+            if headers:
+                if r.inherit:
+                    headers = lineage.headers(True).merge(headers)
+                elif headers.get(_HEADER_REFERER, None) is None and lineage.referer is not None:
+                    # 传入的请求头可能被多个请求共用（例如同一个 Link 的请求头），不在原字典上修改
+                    headers = SharedDict({**headers, _HEADER_REFERER: lineage.referer})
+                r.headers = headers
+            else:
+                r.headers = lineage.headers(r.inherit)
             if r.inherit:
-                r.headers = {**p.headers, **r.headers}
-                r.attrs = {**p.attrs, **r.attrs}
-            if r.headers.get(_HEADER_REFERER, None) is None:
-                m = _REGEX_REFERER.match(p.url)
-                if m is not None:
-                    r.headers[_HEADER_REFERER] = m.group(1)
+                r.attrs = lineage.attrs().merge(attrs)
             if not r.url.startswith("http"):
                 r.url = urljoin(p.url, r.url)
-        r.id = _generate_request_id(r)
+        r.id = self._canonicalizer.request_id(r)
         r.state = RequestState.WAITING
         r.msg = "等待处理"
+        # 不可重复的请求先在工作线程中去重，确定重复的链接不再交给调度线程
+        if r.repeatable or self._seen.add(r.id):
+            return True
+        self._metrics.inc("links_deduplicated_total")
+        return False
+
+    def _persist(self, requests: list[Request]) -> None:
+        if not requests:
+            return
+        candidates = [r.id for r in requests if not r.repeatable]
+        existing = self._store.exists_all(candidates) if candidates else set()
+        fresh = []
+        for r in requests:
+            if not r.repeatable:
+                if r.id in existing:
+                    continue
+                existing.add(r.id)
+            fresh.append(r)
+        if fresh:
+            try:
+                count = self._store.put_all(fresh)
+            except Exception:
+                self._forget(fresh)
+                raise
+            self._waiting += count
+            if count < len(fresh):
+                _logger.warning(f"Can not put {len(fresh) - count} requests to store")
+                # 不知道具体哪些请求没有写入，全部移出过滤器，已写入的请求之后仍由 Store.exists_all 去重
+                self._forget(fresh)
 
-        def _r():
-            if r.repeatable or not self._store.exists(r.id):
-                if not self._store.put(r):
-                    _logger.warning(f"Can not put [{r}] to store")
+    def _forget(self, requests: list[Request]) -> None:
+        self._seen.discard([r.id for r in requests if not r.repeatable])
 
-        self._queue.put(_r)
+    def _ingest_seeds(self, force: bool = False) -> int:
+        seeds = self._seeds
+        if seeds is None or seeds.exhausted:
+            return 0
+        now = time.monotonic()
+        if not force and now < self._next_seed_check:
+            return 0
+        self._next_seed_check = now + _SEED_CHECK_INTERVAL
+        if force or now >= self._next_frontier_sync:
+            # 空闲时必须以存储为准，估算值偏大会导致剩余的种子不再读取
+            self._waiting = self._store.get_waiting_count()
+            self._next_frontier_sync = now + _FRONTIER_SYNC_INTERVAL
+        room = self._seed_frontier_size - self._waiting
+        if room <= 0:
+            return 0
+        batch = seeds.read(min(room, self._seed_batch_size))
+        if self._router is not None:
+            # 每个分片都读取全部种子，只保留自己负责的主机
+            batch = [seed for seed in batch if self._router.owns(seed)]
+        self._persist([seed for seed in batch if self._prepare(seed)])
+        seeds.commit()
+        if seeds.exhausted:
+            _logger.info(f"All {seeds.count} seeds ingested")
+        return len(batch)
+
+    def _drain_intake(self) -> int:
+        count = 0
+        while True:
+            batch = []
+            try:
+                while len(batch) < self._intake_batch_size:
+                    batch.append(self._intake.get_nowait())
+            except queue.Empty:
+                pass
+            if not batch:
+                return count
+            self._persist(batch)
+            count += len(batch)
 
     @property
     def state(self):
         with self._lock:
             return self._state
 
+    @property
+    def metrics(self) -> metrics.Registry:
+        return self._metrics
+
+    @property
+    def profiler(self) -> SamplingProfiler | None:
+        return self._profiler
+
+    @property
+    def stats_server(self) -> StatsServer | None:
+        return self._stats_server
+
+    def get_live_stats(self) -> dict:
+        with self._stats_lock:
+            in_flight = {h: n for h, n in self._in_flight.items() if n > 0}
+            busy = self._busy_workers
+        stat = self._store.get_statistics()
+        return {
+            "state": self.state.name,
+            "threads": self._threads,
+            "busy_workers": busy,
+            "in_flight": in_flight,
+            "intake": self._intake.qsize(),
+            "frontier": dict(zip(("all", "waiting", "executing", "completed", "failed"), stat)),
+            "paused_hosts": self._throttle.paused_hosts(),
+        }
+
     def _dispatch(self) -> None:
         while True:
             has_queued_tasks = False
+            # 先清理已完成的任务再取队列：任务完成前已把新链接放入队列，反过来会漏掉这些链接而提前停止
+            self._workers_futures = [f for f in self._workers_futures if not f.done()]
+            if self._drain_intake() > 0:
+                has_queued_tasks = True
+            if self._router is not None and self._exchange() > 0:
+                has_queued_tasks = True
             while True:
                 try:
                     r = self._queue.get(False)
@@ -168,63 +398,165 @@ class Octopus:
                         break
                 except queue.Empty:
                     break
-            self._workers_futures = [f for f in self._workers_futures if not f.done()]
 
+            delay = None
+            idle = False
             with self._lock:
                 if self._state.value >= State.STOPPING.value:
                     if not has_queued_tasks and len(self._workers_futures) == 0:
                         break
                 else:
+                    if self._ingest_seeds():
+                        has_queued_tasks = True
                     r = self._store.get()
                     if r is not None:
+                        self._waiting = max(0, self._waiting - 1)
+                    if r is not None and self._defer_if_throttled(r):
+                        r = None
+                        has_queued_tasks = True
+                    elif r is not None:
                         _logger.info(f"Take {r}")
-                        self._semaphore.acquire()
-                        self._workers_futures.append(self._workers.submit(self._process, r))
+                        while not self._semaphore.acquire(timeout=_INTAKE_POLL_INTERVAL):
+                            # 工作线程可能正阻塞在已满的入队队列上，等待名额时继续消费，避免相互等待
+                            self._drain_intake()
+                        self._workers_futures.append(self._workers.submit(self._process, r, perf_counter()))
                     if r is None and len(self._workers_futures) == 0 and not has_queued_tasks:
-                        if not self._retry_fails():
-                            _logger.info("No more tasks found, pyoctopus will stop")
-                            threading.Thread(target=self.stop, name="StopThread").start()
-                            break
+                        if self._ingest_seeds(force=True):
+                            continue
+                        delay = self._store.get_next_delay()
+                        if delay is None and not self._retry_fails():
+                            idle = True
+            if idle:
+                # 分片运行时其他分片随时可能转来新的请求，整个集群都没有任务时才停止
+                if self._router is None or self._router.idle():
+                    _logger.info("No more tasks found, pyoctopus will stop")
+                    threading.Thread(target=self.stop, name="StopThread").start()
+                    break
+                delay = self._router.poll_interval
+            if delay is not None:
+                # 只剩未到期的请求，等待最早的一个到期
+                if self._router is not None:
+                    # 等待期间收到其他分片转来的请求时立即返回
+                    self._router.wait(min(delay, _MAX_IDLE_WAIT))
+                else:
+                    time.sleep(min(delay, _MAX_IDLE_WAIT))
         if self._state.value > State.STARTED.value:
             self._log_undone_tasks()
 
+    def _exchange(self) -> int:
+        # 发出缓冲的转发请求，并把其他分片转来的请求写入存储
+        self._router.flush()
+        received = [r for r in self._router.receive() if self._prepare(r)]
+        self._persist(received)
+        return len(received)
+
     def _retry_fails(self) -> bool:
         has_fails = False
         if self.retries > 0:
             count = self._store.reply_failed()
+            self._waiting += count
             if count > 0:
                 has_fails = True
                 _logger.info(f"[{self.retries}] Retry {count} failed requests")
-            self.retries = self.retries - 1
+                # 分片运行时每次空闲都会检查，只在确实重试时消耗次数
+                self.retries = self.retries - 1
         return has_fails
 
-    def _process(self, r: Request):
+    def _process(self, r: Request, dispatched_at: float = None):
         res = None
+        m = self._metrics
+        timed = m.enabled
+        host = None
+        with self._stats_lock:
+            self._busy_workers += 1
         try:
-            site = self._get_site(urlparse(r.url).hostname)
-            if site.limiter is not None:
-                site.limiter.acquire()
-            res = self._download(r, site)
-            if res.status != 200:
-                raise ValueError(f"Bad http status [{res.status}] for [{r}]")
-            for [m, p] in self._processors:
-                if m and m(res):
-                    for req in p(res):
-                        self._add(req, r)
-            r.msg = "成功处理"
-            r.state = RequestState.COMPLETED
-            self._queue.put(lambda: self._store.update_state(r, RequestState.COMPLETED, "成功处理"))
+            if timed and dispatched_at is not None:
+                m.observe("queue_wait_seconds", perf_counter() - dispatched_at)
+            host = urlparse(r.url).hostname
+            with self._stats_lock:
+                self._in_flight[host] = self._in_flight.get(host, 0) + 1
+            resume_at = self._throttle.resume_at(host)
+            if resume_at is None:
+                site = self._get_site(host)
+                if site.limiter is not None:
+                    with m.timer("limiter_wait_seconds"):
+                        site.limiter.acquire()
+                with m.timer("download_seconds"):
+                    res = self._download(r, site)
+                if timed:
+                    self._observe_response(res)
+                if res.status in self._throttle_statuses:
+                    retry_after = parse_retry_after(_get_header(res, _HEADER_RETRY_AFTER))
+                    resume_at = self._throttle.throttle(host, retry_after)
+                    _logger.warning(
+                        f"Host [{host}] throttled with status [{res.status}], "
+                        f"paused for {resume_at - time.time():.1f}s"
+                    )
+            if resume_at is not None:
+                m.inc("requests_total", state="deferred")
+                self._defer(r, resume_at)
+            else:
+                self._throttle.reset(host)
+                if res.status != 200:
+                    raise ValueError(f"Bad http status [{res.status}] for [{r}]")
+                # 匹配的处理器共用响应上的抽取上下文（解析树、JSON 和选择结果），全部处理后释放
+                for [matcher, p] in self._processors:
+                    if matcher and matcher(res):
+                        with m.timer("processor_seconds", processor=_get_name(p)):
+                            links = p(res)
+                        if links:
+                            lineage = _Lineage(r)
+                            for req in links:
+                                self._add(req, r, lineage)
+                res.release()
+                m.inc("requests_total", state="completed")
+                r.msg = "成功处理"
+                r.state = RequestState.COMPLETED
+                self._queue.put(lambda: self._store.update_state(r, RequestState.COMPLETED, "成功处理"))
         except BaseException as e:
+            m.inc("requests_total", state="failed")
             r.msg = str(e)
             r.state = RequestState.FAILED
             self._queue.put(lambda: self._store.update_state(r, RequestState.FAILED, r.msg))
             _logger.error(f"Process [req = {r}, resp = {res}] error\n{r.msg}", exc_info=True)
         finally:
+            with self._stats_lock:
+                self._busy_workers -= 1
+                if host in self._in_flight:
+                    self._in_flight[host] -= 1
+                    if self._in_flight[host] <= 0:
+                        del self._in_flight[host]
             self._semaphore.release()
 
         if self._state.value > State.STARTED.value:
             self._log_undone_tasks()
 
+    def _observe_response(self, res: Response):
+        m = self._metrics
+        m.inc("responses_total", status=str(res.status))
+        if res.content:
+            m.inc("bytes_in_total", len(res.content))
+        for phase, seconds in res.timings.items():
+            m.observe(f"download_{phase}_seconds", seconds)
+
+    def _defer_if_throttled(self, r: Request) -> bool:
+        resume_at = self._throttle.resume_at(urlparse(r.url).hostname)
+        if resume_at is None:
+            return False
+        r.not_before = resume_at
+        r.state = RequestState.WAITING
+        r.msg = _MSG_THROTTLED
+        self._store.update_state(r, RequestState.WAITING, _MSG_THROTTLED)
+        self._waiting += 1
+        return True
+
+    def _defer(self, r: Request, not_before: float):
+        # 被限流的请求保持原优先级重新入队，到期后再调度
+        r.not_before = not_before
+        r.state = RequestState.WAITING
+        r.msg = _MSG_THROTTLED
+        self._queue.put(lambda: self._store.update_state(r, RequestState.WAITING, _MSG_THROTTLED))
+
     def _set_state(self, new_state: State, expected_state: State) -> bool:
         with self._lock:
             if self._state == expected_state:
@@ -236,6 +568,8 @@ class Octopus:
 
     def _download(self, request: Request, site: Site) -> Response:
         try:
+            if site.hedge is not None:
+                return site.hedge.download(self.downloader, request, site)
             return self.downloader(request, site)
         except BaseException as e:
             raise RuntimeError(str(e))
@@ -248,6 +582,16 @@ class Octopus:
                 return s
         return Site(host)
 
+    def _close_processors(self):
+        # 处理器（例如 extractor）可以提供 close 方法，在爬虫停止时释放资源、保存收集的数据
+        for _, p in self._processors:
+            close = getattr(p, "close", None)
+            if callable(close):
+                try:
+                    close()
+                except BaseException as e:
+                    _logger.error(f"Close processor [{p}] error\n{e}", exc_info=True)
+
     def _log_undone_tasks(self):
         undone_count = len([x for x in [self._boss_future, *self._workers_futures] if not x.done()])
         if undone_count > 0:
@@ -263,6 +607,19 @@ def new(
     sites: list[Site] = None,
     retries: int = 1,
     ignore_seed_when_has_waiting_requests: bool = False,
+    throttle_statuses: tuple[int, ...] = (429, 503),
+    default_retry_after: float = 60,
+    enable_metrics: bool = False,
+    stats_port: int = None,
+    stats_host: str = "127.0.0.1",
+    profiler: SamplingProfiler = None,
+    canonicalizer: Canonicalizer = None,
+    intake_size: int = 10000,
+    intake_batch_size: int = 500,
+    seen_filter: SeenFilter = None,
+    seed_batch_size: int = 1000,
+    seed_frontier_size: int = 10000,
+    seed_checkpoint: str = None,
 ) -> Octopus:
     return Octopus(
         downloader=downloader,
@@ -273,4 +630,17 @@ def new(
         sites=sites,
         retries=retries,
         ignore_seed_when_has_waiting_requests=ignore_seed_when_has_waiting_requests,
+        throttle_statuses=throttle_statuses,
+        default_retry_after=default_retry_after,
+        enable_metrics=enable_metrics,
+        stats_port=stats_port,
+        stats_host=stats_host,
+        profiler=profiler,
+        canonicalizer=canonicalizer,
+        intake_size=intake_size,
+        intake_batch_size=intake_batch_size,
+        seen_filter=seen_filter,
+        seed_batch_size=seed_batch_size,
+        seed_frontier_size=seed_frontier_size,
+        seed_checkpoint=seed_checkpoint,
     )
@@ -1,7 +1,25 @@
-from .downloader import new as downloader
-from .extractor import new as extractor
+from typing import TYPE_CHECKING
+
+from .._lazy import attach
+
+_EXPORTS = {
+    "downloader": ".downloader:new",
+    "extractor": ".extractor:new",
+    "stream_extractor": ".extractor:new_stream",
+    "link_extractor": ".link_extractor:new",
+}
 
 __all__ = [
     'downloader',
-    'extractor'
+    'extractor',
+    'stream_extractor',
+    'link_extractor'
 ]
+
+__getattr__, __dir__ = attach(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .downloader import new as downloader
+    from .extractor import new as extractor
+    from .extractor import new_stream as stream_extractor
+    from .link_extractor import new as link_extractor
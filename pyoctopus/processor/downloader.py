@@ -33,4 +33,5 @@ def new(base_dir: str = os.path.expanduser('~/Downloads'), *, sub_dir_attr: str
             f.write(res.content)
         return []
 
+    process.__name__ = "downloader"
     return process
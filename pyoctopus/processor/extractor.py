@@ -1,9 +1,11 @@
 import logging
 from typing import Type, List
 
+from ..metrics import get_registry
 from ..request import Request
 from ..response import Response
 from ..selector import select
+from ..selector.selector import Embedded, release
 from ..types import Collector, Processor, R
 
 _logger = logging.getLogger('pyoctopus.processor.extractor')
@@ -11,14 +13,56 @@ _logger = logging.getLogger('pyoctopus.processor.extractor')
 
 def new(result_class: Type[R], collector: Collector = None, *args, **kwargs) -> Processor:
     def process(res: Response) -> List[Request]:
-        r, links = select(res.text, res, result_class=result_class, *args, **kwargs)
+        # 不指定内容时选择响应正文，只在有选择器需要时才解码
+        r, links = select(None, res, result_class=result_class, *args, **kwargs)
         if r is not None:
             if collector:
-                collector(r)
+                with get_registry().timer('collector_seconds'):
+                    collector(r)
+            # lazy 结果类在收集后释放保留的内容
+            release(r)
         else:
             _logger.debug(f'No content found from {res}')
         if not links:
             _logger.debug(f'No links found from {res}')
         return links
 
+    def close():
+        if collector is not None and hasattr(collector, 'close'):
+            collector.close()
+
+    process.close = close
+    process.__name__ = f'extractor[{result_class.__name__}]'
+    return process
+
+
+def new_stream(embedded: Embedded, collector: Collector = None) -> Processor:
+    """
+    逐个抽取 embedded 选中的结果并交给收集器，不会把全部结果放入同一个对象；
+    embedded 的选择器为 json_stream 时适合很大的 JSON 数组，内存占用与响应大小无关
+    """
+
+    def process(res: Response) -> List[Request]:
+        links = []
+        count = 0
+        registry = get_registry()
+        # 流式选择器直接读取响应的字节
+        for r in embedded.iterate(None, res, links):
+            count += 1
+            if collector:
+                with registry.timer('collector_seconds'):
+                    collector(r)
+            release(r)
+        if count == 0:
+            _logger.debug(f'No content found from {res}')
+        if not links:
+            _logger.debug(f'No links found from {res}')
+        return links
+
+    def close():
+        if collector is not None and hasattr(collector, 'close'):
+            collector.close()
+
+    process.close = close
+    process.__name__ = f'stream_extractor[{embedded.target.__name__}]'
     return process
@@ -0,0 +1,146 @@
+import logging
+import re
+from typing import List
+from urllib.parse import urljoin, urlsplit
+
+from lxml import etree
+
+from ..request import Request
+from ..response import Response
+from ..selector.xpath import parse
+from ..types import Processor
+
+_logger = logging.getLogger('pyoctopus.processor.link_extractor')
+
+_SCHEMES = ('http://', 'https://')
+_REGEX_HOST = re.compile(r'^[A-Za-z][A-Za-z0-9+.-]*://(?:[^/?#@]*@)?([^/?#:]*)')
+
+# 标签 -> 链接所在的属性
+_DEFAULT_TAGS = {'a': 'href', 'area': 'href'}
+
+
+def _compile(patterns: str | list[str] | None) -> list[re.Pattern]:
+    if not patterns:
+        return []
+    return [re.compile(p) for p in ([patterns] if isinstance(patterns, str) else patterns)]
+
+
+def _hostname(url: str) -> str | None:
+    m = _REGEX_HOST.match(url)
+    return m.group(1).lower() if m else None
+
+
+class LinkExtractor:
+    """
+    从 HTML 中发现链接
+
+    在响应共用的 lxml 解析树上用一个 XPath 取出所有链接属性，再解析为绝对地址，去掉片段、去重并按规则过滤，
+    只产生 (url, tag) 元组，不经过选择器和结果类。页面中的 <base href> 会作为相对地址的基准。
+
+    allow 与 deny 为正则表达式（或列表），在绝对地址上搜索：设置了 allow 时至少匹配一个，且不能匹配任何 deny；
+    same_host 为 True 时只保留与页面主机名相同的链接；max_per_page 限制每个页面最多产生的链接数。
+    """
+
+    def __init__(self,
+                 *,
+                 allow: str | list[str] = None,
+                 deny: str | list[str] = None,
+                 same_host: bool = True,
+                 max_per_page: int = None,
+                 tags: dict[str, str] = None):
+        self.allow = _compile(allow)
+        self.deny = _compile(deny)
+        self.same_host = same_host
+        self.max_per_page = max_per_page
+        self.tags = dict(tags) if tags else dict(_DEFAULT_TAGS)
+        self._path = etree.XPath(' | '.join(f'//{t}/@{a}' for t, a in self.tags.items()))
+
+    def extract(self, res: Response) -> list[tuple[str, str]]:
+        """
+        返回页面中的链接 (url, tag)，按出现顺序排列
+        """
+        text = res.text
+        if not text:
+            return []
+        tree = parse(text, res)
+        base = res.request.url
+        for b in tree.iter('base'):
+            href = b.get('href')
+            if href:
+                base = urljoin(base, href.strip())
+            break
+        parts = urlsplit(base)
+        scheme = parts.scheme
+        origin = f'{parts.scheme}://{parts.netloc}'
+        # 相对路径（例如 detail/1.html）的基准目录
+        directory = origin + parts.path[:parts.path.rfind('/') + 1] if parts.path else origin + '/'
+        host = parts.hostname
+        same_origin = origin + '/'
+        limit = self.max_per_page
+        allow = self.allow
+        deny = self.deny
+        seen = set()
+        links = []
+        for value in self._path(tree):
+            link = value.strip()
+            if not link or link[0] == '#':
+                continue
+            if link.startswith(_SCHEMES):
+                url = link
+                same = None
+            elif link.startswith('//'):
+                url = f'{scheme}:{link}'
+                same = None
+            elif '/.' in link or link[0] in '.?' or ':' in link:
+                url = urljoin(base, link)
+                if not url.startswith(_SCHEMES):
+                    # javascript:、mailto: 等
+                    continue
+                same = None
+            elif link[0] == '/':
+                # 不含 . 或 .. 段的地址直接拼接，结果与 urljoin 相同
+                url = origin + link
+                same = True
+            else:
+                url = directory + link
+                same = True
+            i = url.find('#')
+            if i >= 0:
+                url = url[:i]
+            if url in seen:
+                continue
+            seen.add(url)
+            if self.same_host and not same and not url.startswith(same_origin) and _hostname(url) != host:
+                continue
+            if allow and not any(p.search(url) for p in allow):
+                continue
+            if deny and any(p.search(url) for p in deny):
+                continue
+            links.append((url, value.getparent().tag))
+            if limit is not None and len(links) >= limit:
+                break
+        return links
+
+
+def new(*,
+        allow: str | list[str] = None,
+        deny: str | list[str] = None,
+        same_host: bool = True,
+        max_per_page: int = None,
+        tags: dict[str, str] = None,
+        priority: int = 0,
+        repeatable: bool = False) -> Processor:
+    """
+    只发现链接的处理器，适合抓取整个站点；发现的链接使用指定的 priority 和 repeatable 创建请求
+    """
+    extractor = LinkExtractor(allow=allow, deny=deny, same_host=same_host, max_per_page=max_per_page, tags=tags)
+
+    def process(res: Response) -> List[Request]:
+        links = [Request(url, priority=priority, repeatable=repeatable) for url, _ in extractor.extract(res)]
+        if not links:
+            _logger.debug(f'No links found from {res}')
+        return links
+
+    process.extract = extractor.extract
+    process.__name__ = 'link_extractor'
+    return process
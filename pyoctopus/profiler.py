@@ -0,0 +1,180 @@
+import logging
+import os
+import sys
+import threading
+from collections import Counter
+from time import perf_counter
+
+_logger = logging.getLogger("pyoctopus.profiler")
+
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 按子包划分阶段，最内层命中子包的栈帧决定样本所属阶段
+_PHASES = {
+    "downloader": "download",
+    "selector": "select",
+    "store": "store",
+    "collector": "collect",
+    "processor": "process",
+}
+
+_PHASE_IDLE = "idle"
+_PHASE_OTHER = "octopus"
+
+
+class SamplingProfiler:
+    """
+    采样分析器
+
+    后台线程每 interval 秒通过 sys._current_frames 采集一次名称以 thread_prefixes 开头的线程的调用栈，
+    按调用栈聚合计数，可随时导出 collapsed stack 格式（可直接交给 flamegraph.pl / speedscope 生成火焰图）。
+    每个样本根据栈上最内层的 pyoctopus 模块归入 download / select / store / collect / process 等阶段，
+    不在 pyoctopus 代码中的样本（例如线程池等待任务）归入 idle。
+    """
+
+    def __init__(self,
+                 interval: float = 0.01,
+                 output: str = None,
+                 thread_prefixes: tuple[str, ...] = ("boss", "worker")):
+        if interval <= 0:
+            raise ValueError("interval must be greater than 0")
+        self._interval = interval
+        self._output = output
+        self._thread_prefixes = thread_prefixes
+        self._stacks: Counter[tuple[str, ...]] = Counter()
+        self._phases: Counter[str] = Counter()
+        self._samples = 0
+        self._elapsed = 0.0
+        self._labels: dict = {}
+        self._phase_of_file: dict[str, str | None] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    @property
+    def interval(self) -> float:
+        return self._interval
+
+    @property
+    def samples(self) -> int:
+        return self._samples
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="SamplingProfiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if not self.running:
+            return
+        self._stopped.set()
+        self._thread.join()
+        _logger.info(f"Profiler collected {self._samples} samples, {self._elapsed * 1000:.1f}ms spent on sampling")
+        if self._output:
+            self.write(self._output)
+
+    def reset(self):
+        with self._lock:
+            self._stacks = Counter()
+            self._phases = Counter()
+            self._samples = 0
+            self._elapsed = 0.0
+
+    def get_phases(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._phases)
+
+    def get_hot_frames(self, n: int = 20, phase: str = None) -> list[tuple[str, int]]:
+        """
+        按自身耗时（位于栈顶的样本数）排序的栈帧
+        """
+        counter = Counter()
+        with self._lock:
+            for stack, count in self._stacks.items():
+                if phase is None or stack[0] == phase:
+                    counter[stack[-1]] += count
+        return counter.most_common(n)
+
+    def collapsed(self) -> str:
+        with self._lock:
+            items = sorted(self._stacks.items())
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in items)
+
+    def write(self, file: str):
+        with open(file, "w", encoding="utf-8") as f:
+            f.write(self.collapsed())
+        _logger.info(f"Profiler wrote collapsed stacks to [{file}]")
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stopped.wait(self._interval):
+            start = perf_counter()
+            names = {t.ident: t.name for t in threading.enumerate()}
+            frames = sys._current_frames()
+            stacks = []
+            for ident, frame in frames.items():
+                if ident == me:
+                    continue
+                name = names.get(ident, "")
+                if name.startswith(self._thread_prefixes):
+                    stacks.append(self._walk(frame))
+            del frames
+            with self._lock:
+                for stack in stacks:
+                    self._stacks[stack] += 1
+                    self._phases[stack[0]] += 1
+                self._samples += 1
+                self._elapsed += perf_counter() - start
+
+    def _walk(self, frame) -> tuple[str, ...]:
+        stack = []
+        phase = None
+        in_package = False
+        while frame is not None:
+            code = frame.f_code
+            label = self._labels.get(code, None)
+            if label is None:
+                label = f"{os.path.basename(code.co_filename)}:{code.co_qualname}"
+                self._labels[code] = label
+            if phase is None:
+                p = self._phase(code.co_filename)
+                if p is not None:
+                    in_package = True
+                    if p != _PHASE_OTHER:
+                        phase = p
+            if phase == "select" and code.co_name == "select" and "result_class" in code.co_varnames:
+                # 选择器阶段记录具体字段，便于定位最慢的选择器
+                key = frame.f_locals.get("key", None)
+                cls = frame.f_locals.get("result_class", None)
+                if key is not None and cls is not None:
+                    label = f"{label}[{cls.__name__}.{key}]"
+            stack.append(label)
+            frame = frame.f_back
+        stack.append(phase or (_PHASE_OTHER if in_package else _PHASE_IDLE))
+        stack.reverse()
+        return tuple(stack)
+
+    def _phase(self, filename: str) -> str | None:
+        try:
+            return self._phase_of_file[filename]
+        except KeyError:
+            pass
+        phase = None
+        path = os.path.abspath(filename)
+        if path.startswith(_PACKAGE_DIR + os.sep):
+            parts = os.path.relpath(path, _PACKAGE_DIR).split(os.sep)
+            phase = _PHASES.get(parts[0], _PHASE_OTHER) if len(parts) > 1 else _PHASE_OTHER
+        self._phase_of_file[filename] = phase
+        return phase
+
+
+def new(interval: float = 0.01,
+        output: str = None,
+        thread_prefixes: tuple[str, ...] = ("boss", "worker")) -> SamplingProfiler:
+    return SamplingProfiler(interval, output, thread_prefixes)
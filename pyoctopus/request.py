@@ -1,4 +1,7 @@
 import json
+import sys
+import time
+from collections.abc import Mapping
 from enum import Enum
 from typing import Any, Literal
 
@@ -11,7 +14,56 @@ class State(Enum):
     COMPLETED = 'COMPLETED'
 
 
+class SharedDict(dict):
+    """
+    多个请求共用的只读字典
+
+    继承的请求头、解码得到的请求头和属性等在大量请求之间共用同一个 SharedDict。它本身就是 dict，
+    可以直接序列化，但不能修改；Request 的 headers、attrs 读到共用的字典时会先复制出自己的一份。
+    """
+
+    __slots__ = ()
+
+    def merge(self, other: Mapping) -> 'SharedDict':
+        """
+        返回以自己为基础、other 覆盖后的字典，other 为空时直接返回自己
+        """
+        if not other:
+            return self
+        if not self:
+            return other if isinstance(other, SharedDict) else SharedDict(other)
+        return SharedDict({**self, **other})
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError('SharedDict is shared by requests and can not be modified')
+
+    __setitem__ = __delitem__ = __ior__ = clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return SharedDict, (dict(self),)
+
+
+_EMPTY = SharedDict()
+
+
+def intern_map(m: dict | None) -> dict | None:
+    """
+    驻留字典中的字符串键和值，反序列化得到的请求头和属性名在请求之间高度重复
+    """
+    if not m:
+        return m
+    return {_intern(k): _intern(v) for k, v in m.items()}
+
+
+def _intern(v: Any) -> Any:
+    # 只驻留较短的字符串，长字符串很少重复
+    return sys.intern(v) if isinstance(v, str) and len(v) <= 256 else v
+
+
 class Request:
+    __slots__ = ('url', 'method', 'queries', 'data', '_headers', 'priority', 'repeatable', '_attrs', 'inherit',
+                 'not_before', 'parent', 'id', 'state', 'msg', 'depth')
+
     def __init__(self, url: str, method: Literal['GET', 'POST'] = 'GET',
                  *,
                  queries: dict[str, list[Any] | Any] = None,
@@ -20,7 +72,8 @@ class Request:
                  priority: int = 0,
                  repeatable: bool = True,
                  attrs: dict[str, Any] = None,
-                 inherit: bool = False):
+                 inherit: bool = False,
+                 not_before: float = None):
         if not url:
             raise ValueError('url is empty')
         if not method:
@@ -37,23 +90,55 @@ class Request:
                 else:
                     self.queries[k] = v
         self.data = data
-        self.headers = {} if headers is None else headers
+        self._headers = _EMPTY if headers is None else headers
         self.priority = priority
         self.repeatable = repeatable
-        self.attrs = {} if attrs is None else attrs
+        self._attrs = _EMPTY if attrs is None else attrs
         self.inherit = inherit
+        # 最早可执行时间（Unix 时间戳，秒），为空表示立即可执行
+        self.not_before = not_before
         self.parent = None
         self.id = None
         self.state = State.NEW
         self.msg = None
         self.depth = 1
 
+    @property
+    def headers(self) -> dict[str, str]:
+        if type(self._headers) is SharedDict:
+            # 共用的请求头先复制出自己的一份，修改不会影响其他请求
+            self._headers = dict(self._headers)
+        return self._headers
+
+    @headers.setter
+    def headers(self, headers: dict[str, str] | None):
+        self._headers = _EMPTY if headers is None else headers
+
+    @property
+    def attrs(self) -> dict[str, Any]:
+        if type(self._attrs) is SharedDict:
+            self._attrs = dict(self._attrs)
+        return self._attrs
+
+    @attrs.setter
+    def attrs(self, attrs: dict[str, Any] | None):
+        self._attrs = _EMPTY if attrs is None else attrs
+
+    def view(self) -> tuple[Mapping[str, str], Mapping[str, Any]]:
+        """
+        请求头和属性本身，不会复制共用的 SharedDict，只能读取（例如序列化、派生子请求）
+        """
+        return self._headers, self._attrs
+
     def get_attr(self, name):
-        return self.attrs.get(name, None)
+        return self._attrs.get(name, None)
 
     def set_attr(self, name, value):
         self.attrs[name] = value
 
+    def is_delayed(self, now: float = None) -> bool:
+        return self.not_before is not None and self.not_before > (time.time() if now is None else now)
+
     def __lt__(self, other):
         return self.priority < other.priority
 
@@ -67,15 +152,16 @@ class Request:
             'method': self.method,
             'queries': self.queries,
             'data': self.data,
-            'headers': self.headers,
+            'headers': self._headers,
             'priority': self.priority,
             'repeatable': self.repeatable,
-            'attrs': self.attrs,
+            'attrs': self._attrs,
             'inherit': self.inherit,
             'parent': self.parent,
             'state': self.state.value,
             'msg': self.msg,
-            'depth': self.depth
+            'depth': self.depth,
+            'not_before': self.not_before
         })
 
     @staticmethod
@@ -86,15 +172,16 @@ class Request:
         req.method = json_object['method']
         req.queries = json_object['queries']
         req.data = json_object['data']
-        req.headers = json_object['headers']
+        req.headers = intern_map(json_object['headers'])
         req.priority = json_object['priority']
         req.repeatable = json_object['repeatable']
-        req.attrs = json_object['attrs']
+        req.attrs = intern_map(json_object['attrs'])
         req.inherit = json_object['inherit']
         req.parent = json_object['parent']
         req.state = State(json_object['state'])
         req.msg = json_object['msg']
         req.depth = json_object['depth']
+        req.not_before = json_object.get('not_before', None)
         return req
 
     __repr__ = __str__
@@ -108,6 +195,7 @@ def new(url: str, method: Literal['GET', 'POST'] = 'GET',
         priority: int = 0,
         repeatable: bool = True,
         attrs: dict[str, Any] = None,
-        inherit: bool = False) -> Request:
+        inherit: bool = False,
+        not_before: float = None) -> Request:
     return Request(url, method, queries=queries, data=data, headers=headers, priority=priority, repeatable=repeatable,
-                   attrs=attrs, inherit=inherit)
+                   attrs=attrs, inherit=inherit, not_before=not_before)
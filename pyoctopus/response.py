@@ -1,3 +1,6 @@
+import json
+from typing import Any, Callable
+
 from .request import Request
 
 
@@ -18,6 +21,16 @@ class Response:
         self.encoding = encoding
         self._text = None
         self._parsed = False
+        # 以下为同一响应上的多个处理器、结果类和选择器共用的抽取上下文
+        # 内容 -> 解码后的 JSON
+        self._json: dict[str, object] = {}
+        # 解析器名称 -> 正文的解析树；其他内容（例如 embedded 选出的片段）每种解析器只保留最近一个
+        self._trees: dict[str, Any] = {}
+        self._fragments: dict[str, tuple[str, Any]] = {}
+        # (选择器结构, 内容) -> 选择器选出的原始值
+        self._selected: dict[tuple, list] = {}
+        # 下载各阶段耗时（秒），例如 dns、connect、tls、ttfb、body，取决于下载器能提供哪些信息
+        self.timings: dict[str, float] = {}
 
     @property
     def text(self):
@@ -27,6 +40,59 @@ class Response:
         self._parsed = True
         return self._text
 
+    def is_text(self, content: Any) -> bool:
+        """
+        content 是否为已解码的响应正文，不会为此解码正文
+        """
+        return self._parsed and content is self._text
+
+    def json(self, content: str = None):
+        """
+        解码 JSON，同一内容只解码一次；不指定 content 时解码响应正文
+        """
+        if content is None:
+            content = self.text
+        try:
+            return self._json[content]
+        except KeyError:
+            value = self._json[content] = json.loads(content)
+            return value
+
+    def tree(self, parser: str, content: str, parse: Callable[[str], Any]) -> Any:
+        """
+        解析 content，同一内容使用同一解析器只解析一次；解析树被多个选择器共用，调用方不能修改
+        """
+        if content is self._text:
+            tree = self._trees.get(parser, None)
+            if tree is None:
+                tree = self._trees[parser] = parse(content)
+            return tree
+        fragment = self._fragments.get(parser, None)
+        if fragment is not None and fragment[0] == content:
+            return fragment[1]
+        tree = parse(content)
+        self._fragments[parser] = (content, tree)
+        return tree
+
+    def selected(self, key: tuple, content: str, select: Callable[[], list]) -> list:
+        """
+        结构相同的选择器在同一内容上只选择一次，key 描述选择器的结构
+        """
+        k = (key, content)
+        found = self._selected.get(k, None)
+        if found is None:
+            found = self._selected[k] = [*select()]
+        return list(found)
+
+    def release(self):
+        """
+        释放抽取上下文中的解析树和选择结果，之后的选择会重新解析
+        """
+        self._json = {}
+        self._trees = {}
+        self._fragments = {}
+        self._selected = {}
+
     def __str__(self):
         return f'{{request={self.request}, status={self.status}, length={len(self.content)}, encoding={self.encoding}}}'
 
@@ -0,0 +1,154 @@
+import json
+import logging
+import os
+from itertools import islice
+from typing import Iterable, Iterator
+
+from .request import Request
+
+_logger = logging.getLogger("pyoctopus.seeds")
+
+Seed = Request | str
+SeedSource = Seed | Iterable[Seed] | os.PathLike
+
+
+def _is_file(s) -> bool:
+    return isinstance(s, os.PathLike) or (isinstance(s, str) and "://" not in s and os.path.isfile(s))
+
+
+def _to_request(s: Seed) -> Request:
+    return Request(s) if isinstance(s, str) else s
+
+
+class _FileSeeds:
+    """
+    文件中的种子，每行一个 URL，忽略空行和以 # 开头的行；偏移量为文件的字节偏移
+    """
+
+    def __init__(self, path: str | os.PathLike):
+        self.key = f"file:{os.path.abspath(os.fspath(path))}"
+        self._path = path
+        self._file = None
+        self.offset = 0
+
+    def seek(self, offset: int):
+        self.offset = offset
+
+    def read(self, n: int) -> list[Request]:
+        if self._file is None:
+            self._file = open(self._path, "rb")
+            self._file.seek(self.offset)
+        seeds = []
+        while len(seeds) < n:
+            line = self._file.readline()
+            if not line:
+                break
+            self.offset += len(line)
+            url = line.decode("utf-8").strip()
+            if url and not url.startswith("#"):
+                seeds.append(Request(url))
+        return seeds
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class _IterableSeeds:
+    """
+    可迭代对象中的种子；偏移量为已读取的个数，恢复时跳过这么多个，因此只适用于每次产出顺序相同的迭代器
+    """
+
+    def __init__(self, key: str, seeds: Iterable[Seed]):
+        self.key = key
+        self._seeds = seeds
+        self._iterator: Iterator[Seed] | None = None
+        self.offset = 0
+
+    def seek(self, offset: int):
+        self.offset = offset
+
+    def read(self, n: int) -> list[Request]:
+        if self._iterator is None:
+            self._iterator = islice(iter(self._seeds), self.offset, None)
+        seeds = [_to_request(s) for s in islice(self._iterator, n)]
+        self.offset += len(seeds)
+        return seeds
+
+    def close(self):
+        close = getattr(self._iterator, "close", None)
+        self._iterator = None
+        if callable(close):
+            close()
+
+
+class SeedFeeder:
+    """
+    惰性读取种子
+
+    种子可以是 URL、Request、它们的可迭代对象（包括生成器），或者每行一个 URL 的文件路径。
+    种子按来源的顺序分批读取，不会一次性全部载入内存。
+
+    指定 checkpoint 文件时，每批种子写入存储后调用 commit 记录各来源已读取的偏移量，
+    重启后从记录的偏移量继续读取。最后一批未提交的种子会被重新读取一次。
+    """
+
+    def __init__(self, sources: Iterable[SeedSource], checkpoint: str = None):
+        self._checkpoint = checkpoint
+        self._sources = []
+        singles = []
+        for i, s in enumerate(sources):
+            if isinstance(s, (Request, str)) and not _is_file(s):
+                singles.append(s)
+            elif _is_file(s):
+                self._sources.append(_FileSeeds(s))
+            else:
+                self._sources.append(_IterableSeeds(f"iter:{i}", s))
+        if singles:
+            self._sources.insert(0, _IterableSeeds("seeds", singles))
+        offsets = self._load_checkpoint()
+        for s in self._sources:
+            s.seek(offsets.get(s.key, 0))
+        self._index = 0
+        self.count = 0
+
+    @property
+    def exhausted(self) -> bool:
+        return self._index >= len(self._sources)
+
+    def read(self, n: int) -> list[Request]:
+        """
+        读取最多 n 个种子，返回空列表时表示所有来源都已读完
+        """
+        seeds = []
+        while len(seeds) < n and not self.exhausted:
+            source = self._sources[self._index]
+            batch = source.read(n - len(seeds))
+            if len(batch) < n - len(seeds):
+                source.close()
+                self._index += 1
+            seeds.extend(batch)
+        self.count += len(seeds)
+        return seeds
+
+    def commit(self):
+        if self._checkpoint is None:
+            return
+        offsets = {s.key: s.offset for s in self._sources}
+        tmp = f"{self._checkpoint}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(offsets, f, ensure_ascii=False)
+        os.replace(tmp, self._checkpoint)
+
+    def close(self):
+        for s in self._sources:
+            s.close()
+
+    def _load_checkpoint(self) -> dict[str, int]:
+        if self._checkpoint is None or not os.path.exists(self._checkpoint):
+            return {}
+        with open(self._checkpoint, "r", encoding="utf-8") as f:
+            offsets = json.load(f)
+        _logger.info(f"Resume seeds from checkpoint [{self._checkpoint}]: {offsets}")
+        return offsets
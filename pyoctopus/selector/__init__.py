@@ -1,26 +1,59 @@
-from .attr import new as attr
-from .css import new as css
-from .header import new as header
-from .id import new as id
-from .json import new as json
-from .query import new as query
-from .regex import new as regex
-from .selector import embedded, select, link, hyperlink
-from .url import new as url
-from .xpath import new as xpath
+from typing import TYPE_CHECKING
+
+from .._lazy import attach
+
+_EXPORTS = {
+    "embedded": ".selector:embedded",
+    "rows": ".rows:new",
+    "select": ".selector:select",
+    "css": ".css:new",
+    "xpath": ".xpath:new",
+    "regex": ".regex:new",
+    "json": ".json:new",
+    "json_stream": ".json_stream:new",
+    "attr": ".attr:new",
+    "url": ".url:new",
+    "link": ".selector:link",
+    "hyperlink": ".selector:hyperlink",
+    "lazy": ".selector:lazy",
+    "fields": ".selector:fields",
+    "query": ".query:new",
+    "header": ".header:new",
+    "id": ".id:new",
+}
 
 __all__ = [
     'embedded',
+    'rows',
     'select',
     'css',
     'xpath',
     'regex',
     'json',
+    'json_stream',
     'attr',
     'url',
     'link',
     'hyperlink',
+    'lazy',
+    'fields',
     'query',
     'header',
     'id'
 ]
+
+__getattr__, __dir__ = attach(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .attr import new as attr
+    from .css import new as css
+    from .header import new as header
+    from .id import new as id
+    from .json import new as json
+    from .json_stream import new as json_stream
+    from .query import new as query
+    from .regex import new as regex
+    from .rows import new as rows
+    from .selector import embedded, select, link, hyperlink, lazy, fields
+    from .url import new as url
+    from .xpath import new as xpath
@@ -4,6 +4,17 @@ from ..types import Converter
 from bs4 import BeautifulSoup
 
 
+def _parse(content: str) -> BeautifulSoup:
+    return BeautifulSoup(content, 'lxml')
+
+
+def parse(content: str, resp: Response) -> BeautifulSoup:
+    """
+    解析为 BeautifulSoup 文档，同一响应上的同一内容只解析一次
+    """
+    return resp.tree('bs4', content, _parse) if resp is not None else _parse(content)
+
+
 class Css(Selector):
     def __init__(self,
                  expr: str,
@@ -27,8 +38,12 @@ class Css(Selector):
         self.attr = attr
         self.text = text
 
+    @property
+    def memo_key(self) -> tuple:
+        return Css, self.expr, self.attr, self.text
+
     def do_select(self, content: str, resp: Response) -> list[str]:
-        html = BeautifulSoup(content, 'lxml')
+        html = parse(content, resp)
         return [(x.attrs[self.attr] if self.attr else (x.text if self.text else x.decode())) for x in
                 html.select(self.expr)]
 
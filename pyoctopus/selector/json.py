@@ -1,11 +1,101 @@
 import json as j
-
-from jsonpath_ng import parse
+import re
+from typing import Any, Iterable
 
 from .selector import Selector
 from .. import Response
 from ..types import Converter
 
+_KEY = 0
+_INDEX = 1
+_ITEMS = 2
+_VALUES = 3
+
+_REGEX_STEP = re.compile(r"""\.([A-Za-z_@][\w@\-]*)|\.(\*)|\[(-?\d+)]|\[(\*)]|\['([^'\\]*)']|\["([^"\\]*)"]""")
+
+
+def _compile(expr: str) -> list[tuple[int, Any]] | None:
+    """
+    把只包含字段、下标和通配符的简单路径编译为遍历步骤，例如 $.data.items[*].id；
+    其他表达式（过滤、递归、切片等）返回 None，交给 jsonpath_ng 处理
+    """
+    expr = expr.strip()
+    if expr.startswith("$"):
+        expr = expr[1:]
+    elif expr and not expr.startswith((".", "[")):
+        expr = "." + expr
+    steps = []
+    pos = 0
+    while pos < len(expr):
+        m = _REGEX_STEP.match(expr, pos)
+        if m is None:
+            return None
+        key, values, index, items, quoted, double_quoted = m.groups()
+        if key is not None:
+            steps.append((_KEY, key))
+        elif values is not None:
+            steps.append((_VALUES, None))
+        elif index is not None:
+            steps.append((_INDEX, int(index)))
+        elif items is not None:
+            steps.append((_ITEMS, None))
+        else:
+            steps.append((_KEY, quoted if quoted is not None else double_quoted))
+        pos = m.end()
+    return steps
+
+
+def _find(steps: list[tuple[int, Any]], value: Any) -> list[Any]:
+    # 与 jsonpath_ng 的语义保持一致：[*] 作用于非列表时得到其本身，.* 只作用于对象
+    found = [value]
+    for kind, arg in steps:
+        matched = []
+        for v in found:
+            if kind == _KEY:
+                if isinstance(v, dict) and arg in v:
+                    matched.append(v[arg])
+            elif kind == _INDEX:
+                if isinstance(v, (list, str)) and -len(v) <= arg < len(v):
+                    matched.append(v[arg])
+            elif kind == _ITEMS:
+                if isinstance(v, list):
+                    matched.extend(v)
+                elif v is not None:
+                    matched.append(v)
+            elif isinstance(v, dict):
+                matched.extend(v.values())
+        if not matched:
+            return matched
+        found = matched
+    return found
+
+
+class JsonText(str):
+    """
+    选中的 JSON 对象或数组序列化后的文本，同时保留解码后的值，嵌套的 Json 选择器直接使用而不再解码
+    """
+
+    __slots__ = ("value",)
+
+    def __new__(cls, value: Any):
+        s = super().__new__(cls, j.dumps(value))
+        s.value = value
+        return s
+
+    def strip(self, chars=None):
+        # 序列化的文本首尾没有空白，trim 时保留解码后的值
+        return self if chars is None else super().strip(chars)
+
+
+def _to_str(value: Any) -> str:
+    if value is None:
+        return ''
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (dict, list)):
+        return JsonText(value)
+    return j.dumps(value)
+
 
 class Json(Selector):
     def __init__(self,
@@ -24,12 +114,33 @@ class Json(Selector):
                                    filter_empty=filter_empty,
                                    format_str=format_str,
                                    converter=converter)
-        self._parser = parse(self.expr)
+        self._steps = _compile(self.expr)
+        self._parser = None
+        if self._steps is None:
+            # 只有复杂表达式才需要 jsonpath_ng，简单路径不加载它；扩展语法支持过滤等表达式
+            from jsonpath_ng.ext import parse
+            self._parser = parse(self.expr)
+        # 转换函数可以直接接收的原生类型，这些值不再转为字符串
+        self._native_types = () if format_str else getattr(converter, "native_types", ())
+
+    def _find(self, content: str, resp: Response) -> list[Any]:
+        if isinstance(content, JsonText):
+            value = content.value
+        elif resp is not None:
+            value = resp.json(content)
+        else:
+            value = j.loads(content)
+        if self._steps is not None:
+            return _find(self._steps, value)
+        return [x.value for x in self._parser.find(value)]
+
+    def do_select(self, content: str, resp: Response) -> list[Any]:
+        return self._selected(self._find(content, resp))
 
-    def do_select(self, content: str, resp: Response) -> list[str]:
-        matches = self._parser.find(j.loads(content))
-        return [(x.value if isinstance(x.value, str) else j.dumps(x.value)) if x.value is not None else '' for x in
-                matches]
+    def _selected(self, values: Iterable[Any]) -> list[Any]:
+        # 转换函数可以直接接收的原生类型保持原样，其他值转为字符串
+        native = self._native_types
+        return [v if native and type(v) in native else _to_str(v) for v in values]
 
 
 def new(expr: str,
@@ -0,0 +1,146 @@
+import io
+from itertools import islice
+from typing import Any, Iterator
+
+from .json import Json, JsonText, _compile, _find, _ITEMS, _KEY
+from .selector import Selector
+from .. import Response
+from ..types import Converter
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+_UTF8 = ("utf-8", "utf8", "ascii", "us-ascii")
+
+
+def _split(expr: str, steps: list[tuple[int, Any]]) -> tuple[str, list[tuple[int, Any]]]:
+    """
+    把路径拆为 ijson 前缀和剩余步骤：最后一个 [*] 及之前的部分用 ijson 流式读取，每个元素再按剩余步骤查找，
+    例如 $.data[*].tags[*].name 拆为前缀 data.item.tags.item 和剩余步骤 .name
+    """
+    last = max([i for i, (kind, _) in enumerate(steps) if kind == _ITEMS], default=-1)
+    if last >= 0:
+        head = steps[:last + 1]
+    else:
+        # 没有 [*] 时前缀取开头连续的字段
+        head = []
+        for s in steps:
+            if s[0] != _KEY or "." in s[1]:
+                break
+            head.append(s)
+    prefix = []
+    for kind, arg in head:
+        if kind == _KEY and "." not in arg:
+            prefix.append(arg)
+        elif kind == _ITEMS:
+            prefix.append("item")
+        else:
+            raise ValueError(f"Json path [{expr}] can not be streamed, only fields and [*] are supported before the last [*]")
+    return ".".join(prefix), steps[len(head):]
+
+
+def _is_utf8(resp: Response) -> bool:
+    # ijson 只能读取 UTF-8 编码的字节
+    return (resp.encoding or "utf-8").lower().replace("_", "-") in _UTF8
+
+
+class JsonStream(Json):
+    """
+    流式读取的 Json 选择器
+
+    使用 ijson 在响应的字节上逐个解析路径选中的元素，不构建整个文档的对象，适合很大的 JSON 数组。
+    路径中最后一个 [*] 之前只能是字段和 [*]，之后可以是任意简单路径；与 Json 不同，流式读取的 [*] 只匹配数组元素。
+    安装了 yajl2 时 ijson 会自动使用 C 后端，也可以通过 backend 指定。
+
+    multi 时 iterate 逐个产出选中的值，配合 Embedded.iterate 或 stream_extractor 使用时内存占用与文档大小无关；
+    select 与 Json 选择器的结果相同。
+    """
+
+    def __init__(self,
+                 expr: str,
+                 selector: Selector = None,
+                 *,
+                 multi=False,
+                 trim=True,
+                 filter_empty=True,
+                 format_str: str = None,
+                 converter: Converter = None,
+                 backend: str = None):
+        if ijson is None:
+            raise ValueError("ijson is not installed, install it with `pip install ijson`")
+        steps = _compile(expr)
+        if steps is None:
+            raise ValueError(f"Json path [{expr}] can not be streamed, filters and recursive descent are not supported")
+        self._prefix, self._rest = _split(expr, steps)
+        self._ijson = ijson.get_backend(backend) if backend else ijson
+        super(JsonStream, self).__init__(expr,
+                                         selector=selector,
+                                         multi=multi,
+                                         trim=trim,
+                                         filter_empty=filter_empty,
+                                         format_str=format_str,
+                                         converter=converter)
+
+    @property
+    def backend(self) -> str:
+        return self._ijson.backend
+
+    def read_bytes(self, resp: Response) -> bool:
+        return _is_utf8(resp)
+
+    def iterate(self, content: str, resp: Response) -> Iterator[Any]:
+        """
+        逐个产出 select 选中的值，每个值同样经过 trim、filter_empty、format_str 和 converter；
+        只支持 multi 且没有嵌套选择器的 JsonStream。content 为 None 或为响应正文时直接读取响应的字节，不解码为字符串
+        """
+        if not self.multi or self.selector is not None:
+            raise ValueError(f"{self} can not be iterated, only multi selectors without a nested selector are supported")
+        for v in self._values(content, resp):
+            yield from self.finish(self._selected((v,)))
+
+    def _values(self, content: str, resp: Response) -> Iterator[Any]:
+        if isinstance(content, JsonText):
+            yield from _find(self._steps, content.value)
+            return
+        if content is None or isinstance(content, bytes) or (resp is not None and resp.is_text(content)):
+            if resp is None or not resp.content:
+                return
+            if _is_utf8(resp):
+                stream = io.BytesIO(resp.content)
+            else:
+                stream = io.BytesIO(resp.text.encode("utf-8"))
+        elif not content:
+            return
+        else:
+            stream = io.BytesIO(content.encode("utf-8"))
+        for item in self._ijson.items(stream, self._prefix, use_float=True):
+            if self._rest:
+                yield from _find(self._rest, item)
+            else:
+                yield item
+
+    def _find(self, content: str, resp: Response) -> list[Any]:
+        # 只取一个值时读到第一个匹配就停止解析
+        values = self._values(content, resp)
+        return list(values) if self.multi else list(islice(values, 1))
+
+
+def new(expr: str,
+        selector: Selector = None,
+        *,
+        multi=False,
+        trim=True,
+        filter_empty=True,
+        format_str: str = None,
+        converter: Converter = None,
+        backend: str = None) -> JsonStream:
+    return JsonStream(expr,
+                      selector,
+                      multi=multi,
+                      trim=trim,
+                      filter_empty=filter_empty,
+                      format_str=format_str,
+                      converter=converter,
+                      backend=backend)
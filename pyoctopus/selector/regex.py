@@ -1,11 +1,83 @@
+import codecs
+import os
 import re
 
 from .selector import Selector
 from .. import Response
 from ..types import Converter
 
+# 包含反向引用的表达式合并后组号会变化，不能合并
+_REGEX_BACKREF = re.compile(r"\\[1-9]|\(\?P=")
+# 表达式开头不含元字符的字面前缀
+_REGEX_LITERAL = re.compile(r"[^\\.^$*+?{}\[\]|()]*")
+# 共同字面前缀至少这么长的表达式才合并：re 只能对整个表达式的字面前缀做快速查找，
+# 没有共同前缀的分支表达式要在每个位置逐个尝试所有分支，反而比分别匹配慢得多
+_FUSE_MIN_PREFIX = 8
+# 可以直接在字节上匹配的编码：UTF-8 和兼容 ASCII 的单字节编码，表达式的字节不会匹配到多字节字符的中间
+_BINARY_ENCODING = re.compile(r"utf-8(-sig)?|ascii|iso8859-\d+|cp125\d|koi8-\w+")
+
+
+def _literal_prefix(expr: str) -> str:
+    if "|" in expr:
+        # 顶层的分支会使前缀不再是整个表达式共有的
+        return ""
+    prefix = _REGEX_LITERAL.match(expr).group(0)
+    if prefix and expr[len(prefix):len(prefix) + 1] in ("*", "+", "?", "{"):
+        # 量词作用于前缀的最后一个字符
+        prefix = prefix[:-1]
+    return prefix
+
+
+def _join(m: re.Match, groups: list[int]) -> str | bytes:
+    # 没有参与匹配的分组按空串处理
+    empty = m.string[:0]
+    if len(groups) == 1:
+        return m.group(groups[0]) or empty
+    return empty.join([m.group(g) or empty for g in groups])
+
+
+def _binary_pattern(cache: dict[str, tuple[re.Pattern, str] | None], expr: str,
+                    encoding: str) -> tuple[re.Pattern, str] | None:
+    """
+    按响应编码转为字节的表达式及解码分组使用的编码；UTF-16、GBK 等编码返回 None，改为在文本上匹配：
+    前者转换表达式时会带上 BOM，后者的字节表达式可能匹配到多字节字符的中间
+    """
+    if encoding in cache:
+        return cache[encoding]
+    try:
+        name = codecs.lookup(encoding).name
+    except LookupError:
+        name = None
+    if name is None or not _BINARY_ENCODING.fullmatch(name):
+        cache[encoding] = None
+        return None
+    # utf-8-sig 转换时同样会带上 BOM
+    name = 'utf-8' if name == 'utf-8-sig' else name
+    try:
+        compiled = (re.compile(expr.encode(name)), name)
+    except UnicodeEncodeError:
+        # 表达式中有该编码无法表示的字符
+        compiled = None
+    cache[encoding] = compiled
+    return compiled
+
 
 class Regex(Selector):
+    """
+    正则表达式选择器，表达式在创建时编译
+
+    binary=True 时选择响应正文（content 为 None 或为已解码的正文）直接在响应的字节上匹配，只解码匹配到的分组；
+    表达式按响应编码转为字节，\\d、\\w 等只匹配 ASCII 字符，字符集中不能包含非 ASCII 字符。
+    只有 UTF-8 和兼容 ASCII 的单字节编码在字节上匹配，其他编码（UTF-16、GBK 等）的响应仍在文本上匹配。
+    字节上的 .、.{n}、[^x] 只匹配一个字节，分组可能在多字节字符的中间结束，此时整个选择改为在解码后的文本上重新匹配，
+    结果与 binary=False 相同但没有节省解码；这类表达式应在分组边界使用 ASCII 字面字符，例如 <title>([^<]*)</title>。
+
+    combine=True 的字段在同一个结果类中按共同的字面前缀（至少 8 个字符，例如 <meta property="og:）合并为一个分支表达式，
+    只扫描一遍内容再把匹配分发给各个字段。合并后各字段的匹配互不重叠：同一位置多个字段都能匹配时只计入先声明的字段，
+    已匹配的文本不会再被其他字段匹配，因此只适合匹配内容互不相交的字段。
+    包含反向引用、顶层分支、全局内联标志或嵌套在其他选择器中的字段不会合并。
+    """
+
     def __init__(self,
                  expr: str,
                  group: int | list[int] = 0,
@@ -15,7 +87,9 @@ class Regex(Selector):
                  trim=True,
                  filter_empty=True,
                  format_str: str = None,
-                 converter: Converter = None):
+                 converter: Converter = None,
+                 binary: bool = False,
+                 combine: bool = False):
         super(Regex, self).__init__(expr,
                                     selector=selector,
                                     multi=multi,
@@ -24,10 +98,123 @@ class Regex(Selector):
                                     format_str=format_str,
                                     converter=converter)
         self.group = group if isinstance(group, list) else [group]
+        self.binary = binary
+        self.combine = combine
+        self._pattern = re.compile(expr)
+        # 编码 -> 字节表达式
+        self._binary_patterns: dict[str, tuple[re.Pattern, str] | None] = {}
+
+    @property
+    def memo_key(self) -> tuple:
+        return Regex, self.expr, tuple(self.group), self.binary
+
+    def binary_pattern(self, encoding: str) -> tuple[re.Pattern, str] | None:
+        return _binary_pattern(self._binary_patterns, self.expr, encoding)
+
+    def read_bytes(self, resp: Response) -> bool:
+        return self.binary and self.binary_pattern(resp.encoding or 'utf-8') is not None
+
+    def do_select(self, content: str | bytes, resp: Response) -> list[str]:
+        if self.binary and resp is not None and (isinstance(content, bytes) or resp.is_text(content)):
+            binary = self.binary_pattern(resp.encoding or 'utf-8')
+            if binary is not None:
+                pattern, encoding = binary
+                try:
+                    return [_join(m, self.group).decode(encoding) for m in pattern.finditer(resp.content)]
+                except UnicodeDecodeError:
+                    # 分组在多字节字符的中间结束，改为在文本上匹配
+                    pass
+            content = resp.text
+        return [_join(m, self.group) for m in self._pattern.finditer(content)]
+
+    @classmethod
+    def fuse(cls, selectors: dict[str, 'Regex']) -> list['_Fused']:
+        """
+        把共同字面前缀足够长的表达式合并为 前缀(?:(表达式1剩余部分)|(表达式2剩余部分)...)，分支按声明顺序排列
+        """
+        fused = []
+        for binary in (False, True):
+            prefixes = {k: _literal_prefix(s.expr) for k, s in selectors.items()
+                        if s.binary == binary and not _REGEX_BACKREF.search(s.expr)}
+            groups: list[tuple[str, list[str]]] = []
+            for k in sorted(prefixes, key=lambda x: prefixes[x]):
+                p = prefixes[k]
+                common = os.path.commonprefix([groups[-1][0], p]) if groups else ""
+                if len(common) >= _FUSE_MIN_PREFIX:
+                    groups[-1] = (common, groups[-1][1] + [k])
+                elif len(p) >= _FUSE_MIN_PREFIX:
+                    groups.append((p, [k]))
+            for prefix, keys in groups:
+                if len(keys) > 1:
+                    f = _Fused.create(prefix, {k: s for k, s in selectors.items() if k in keys}, binary)
+                    if f is not None:
+                        fused.append(f)
+        return fused
+
+
+class _Fused:
+    """
+    多个正则字段合并后的分支表达式，每个字段的剩余部分包在一个分组中，按匹配的 lastindex 分发
+    """
+
+    def __init__(self, pattern: re.Pattern, slots: dict[int, tuple[str, list[int]]], binary: bool):
+        self.pattern = pattern
+        self.slots = slots
+        self.binary = binary
+        self._binary_patterns: dict[str, tuple[re.Pattern, str] | None] = {}
+
+    @staticmethod
+    def create(prefix: str, selectors: dict[str, Regex], binary: bool) -> '_Fused | None':
+        parts = []
+        slots = {}
+        index = 1
+        for key, s in selectors.items():
+            parts.append(f'({s.expr[len(prefix):]})')
+            # 原表达式的第 g 组在合并后是第 index + g 组；第 0 组包含前缀，仍是整个匹配
+            slots[index] = (key, [index + g if g else 0 for g in s.group])
+            index += 1 + s._pattern.groups
+        try:
+            pattern = re.compile(prefix + '(?:' + '|'.join(parts) + ')')
+        except re.error:
+            # 例如全局内联标志只能出现在表达式开头、命名分组重名
+            return None
+        return _Fused(pattern, slots, binary)
+
+    @property
+    def keys(self) -> list[str]:
+        return [key for key, _ in self.slots.values()]
+
+    def select(self, content: str | None, resp: Response) -> dict[str, list[str]]:
+        """
+        content 为 None 时选择响应正文
+        """
+        if resp is not None and resp.content is not None and (content is None or resp.is_text(content)):
+            if self.binary:
+                found = self._select_bytes(resp)
+                if found is not None:
+                    return found
+            content = resp.text
+        found = {key: [] for key, _ in self.slots.values()}
+        if content:
+            for m in self.pattern.finditer(content):
+                key, groups = self.slots[m.lastindex]
+                found[key].append(_join(m, groups))
+        return found
 
-    def do_select(self, content: str, resp: Response) -> list[str]:
-        matches = re.finditer(self.expr, content)
-        return [(''.join([x.group(g) for g in self.group])) for x in matches]
+    def _select_bytes(self, resp: Response) -> dict[str, list[str]] | None:
+        binary = _binary_pattern(self._binary_patterns, self.pattern.pattern, resp.encoding or 'utf-8')
+        if binary is None:
+            return None
+        pattern, encoding = binary
+        found = {key: [] for key, _ in self.slots.values()}
+        try:
+            for m in pattern.finditer(resp.content):
+                key, groups = self.slots[m.lastindex]
+                found[key].append(_join(m, groups).decode(encoding))
+        except UnicodeDecodeError:
+            # 分组在多字节字符的中间结束，改为在文本上匹配
+            return None
+        return found
 
 
 def new(expr: str,
@@ -38,7 +225,9 @@ def new(expr: str,
         trim=True,
         filter_empty=True,
         format_str: str = None,
-        converter: Converter = None) -> Regex:
+        converter: Converter = None,
+        binary: bool = False,
+        combine: bool = False) -> Regex:
     return Regex(expr,
                  group,
                  selector,
@@ -46,4 +235,6 @@ def new(expr: str,
                  trim=trim,
                  filter_empty=filter_empty,
                  format_str=format_str,
-                 converter=converter)
+                 converter=converter,
+                 binary=binary,
+                 combine=combine)
@@ -0,0 +1,164 @@
+import copy
+from time import perf_counter
+from typing import Any, Callable
+
+import soupsieve
+from lxml import etree, html
+
+from .css import Css, parse as parse_soup
+from .selector import Embedded, Selector, _get_type_selectors_links, _follow, field
+from .xpath import Xpath, parse as parse_html
+from .. import Request, Response
+from ..metrics import get_registry
+from ..types import R
+
+# 行节点 -> 该列选出的原始值
+_Column = Callable[[Any, Response], list[str]]
+
+
+def _css_column(s: Css) -> _Column:
+    pattern = soupsieve.compile(s.expr)
+
+    def evaluate(row, resp: Response) -> list[str]:
+        nodes = pattern.select(row)
+        if pattern.match(row):
+            # 单独解析行文本时行节点本身也能被选中
+            nodes.insert(0, row)
+        return [(x.attrs[s.attr] if s.attr else (x.text if s.text else x.decode())) for x in nodes]
+
+    return evaluate
+
+
+def _xpath_column(s: Xpath) -> _Column:
+    path = etree.XPath(s.expr)
+
+    def evaluate(row, resp: Response) -> list[str]:
+        return [html.tostring(x, encoding=resp.encoding).decode() if isinstance(x, html.HtmlElement) else str(x)
+                for x in path(row)]
+
+    return evaluate
+
+
+def _detach(row: html.HtmlElement) -> html.HtmlElement:
+    # 复制出独立的行节点，//a 之类的绝对路径只在行内查找，与单独解析行文本一致
+    row = copy.deepcopy(row)
+    row.tail = None
+    return row
+
+
+class Rows(Embedded):
+    """
+    面向列表页的按行抽取
+
+    与 embedded 相同，行选择器选出的每一行抽取为一个结果对象，但整个页面只解析一次：
+    行选择器为 css（或 xpath）时，结果类中同类且没有嵌套选择器的字段直接在行节点上求值，按列得到所有行的值，
+    不再把每一行序列化为文本后由每个字段各自重新解析。其他字段、嵌套的 embedded 和结果类的链接仍在行文本上求值，
+    只有存在这样的字段时才会序列化行节点。
+
+    css 字段在行节点及其后代中查找，祖先选择器可以匹配行以外的节点；xpath 字段在行节点的副本上求值，
+    绝对路径只在行内查找。行选择器带有 attr、text、format_str、converter、嵌套选择器或不是 multi 时，
+    行为与 embedded 完全相同。
+    """
+
+    def __init__(self, selector: Selector, embedded_class: type[R], *args, **kwargs):
+        super(Rows, self).__init__(selector, embedded_class, *args, **kwargs)
+        s = selector
+        plain = s.selector is None and s.multi and not s.format_str and not s.converter
+        if plain and type(s) is Css and not s.attr and not s.text:
+            self._family = Css
+        elif plain and type(s) is Xpath:
+            self._family = Xpath
+        else:
+            self._family = None
+        self._selectors, self._links = _get_type_selectors_links(embedded_class)
+        # 字段名 -> 在行节点上求值的函数，其余字段在行文本上求值
+        self._columns: dict[str, _Column] = {}
+        for k, v in self._selectors.items():
+            if isinstance(v, Selector) and v.selector is None and type(v) is self._family:
+                self._columns[k] = _css_column(v) if self._family is Css else _xpath_column(v)
+
+    def _rows(self, content: str, resp: Response) -> list | None:
+        if self._family is Css:
+            return parse_soup(content, resp).select(self.selector.expr)
+        nodes = parse_html(content, resp).xpath(self.selector.expr)
+        if not all(isinstance(x, html.HtmlElement) for x in nodes):
+            return None
+        return nodes
+
+    def _text(self, row, resp: Response) -> str:
+        # 与行选择器单独选出的文本相同
+        text = row.decode() if self._family is Css else html.tostring(row, encoding=resp.encoding).decode()
+        return text.strip() if self.selector.trim else text
+
+    def columns(self, content: str, resp: Response, links: list[Request] = None) -> dict[str, list[Any]]:
+        """
+        按列返回所有行的字段值，字段名 -> 每一行的值
+        """
+        if links is None:
+            links = []
+        if content is None and resp is not None:
+            content = resp.text
+        nodes = self._rows(content, resp) if content and self._family is not None else None
+        if nodes is None:
+            results = super(Rows, self).select(content, resp, links)
+            return {k: [field(r, k) for r in results] for k in self._selectors}
+        row_links = [[] for _ in nodes]
+        columns = self._evaluate(nodes, resp, row_links)[0]
+        for x in row_links:
+            links.extend(x)
+        return columns
+
+    def _evaluate(self, nodes: list, resp: Response,
+                  row_links: list[list[Request]]) -> (dict[str, list[Any]], list[str]):
+        registry = get_registry()
+        timed = registry.enabled
+        name = self.target.__name__
+        columns: dict[str, list[Any]] = {k: [] for k in self._selectors}
+        if self._columns:
+            rows = nodes if self._family is Css else [_detach(x) for x in nodes]
+            for key, evaluate in self._columns.items():
+                start = perf_counter() if timed else 0
+                finish = self._selectors[key].finish
+                columns[key] = [finish(evaluate(row, resp)) for row in rows]
+                if timed:
+                    registry.observe('selector_seconds', perf_counter() - start, field=f'{name}.{key}')
+        texts = []
+        rest = [k for k in self._selectors if k not in self._columns]
+        if rest or self._links:
+            texts = [self._text(x, resp) for x in nodes]
+            for key in rest:
+                start = perf_counter() if timed else 0
+                value = self._selectors[key]
+                if isinstance(value, Embedded):
+                    columns[key] = [value.select(x, resp, row_links[i]) for i, x in enumerate(texts)]
+                else:
+                    columns[key] = [value.select(x, resp) for x in texts]
+                if timed:
+                    registry.observe('selector_seconds', perf_counter() - start, field=f'{name}.{key}')
+        return columns, texts
+
+    def select(self, content: str, resp: Response, links: list[Request] = None) -> R | list[R]:
+        if links is None:
+            links = []
+        if content is None and resp is not None:
+            content = resp.text
+        nodes = self._rows(content, resp) if content and self._family is not None else None
+        if nodes is None:
+            return super(Rows, self).select(content, resp, links)
+        # 链接按行收集，与逐行抽取时的顺序保持一致
+        row_links = [[] for _ in nodes]
+        columns, texts = self._evaluate(nodes, resp, row_links)
+        results = []
+        for i in range(len(nodes)):
+            r = self.target(*self.args, **self.kwargs)
+            for key, values in columns.items():
+                r.__dict__[key] = values[i]
+            if self._links:
+                _follow(r, texts[i], resp, self._links, row_links[i])
+            links.extend(row_links[i])
+            results.append(r)
+        return results
+
+
+def new(selector: Selector, row_class: type[R], *args, **kwargs) -> Rows:
+    return Rows(selector, row_class, *args, **kwargs)
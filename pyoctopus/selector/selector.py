@@ -1,12 +1,16 @@
 import logging
+import weakref
 from abc import abstractmethod
-from typing import List, Any
+from time import perf_counter
+from typing import List, Any, Iterator
 
 from .. import Request, Response
+from ..metrics import get_registry
 from ..types import Converter, Terminable
 from ..types import R
 
 PROP_LINKS = '__result_links__'
+_MISSING = object()
 _logger = logging.getLogger('pyoctopus.selector')
 
 
@@ -55,43 +59,82 @@ class Selector:
         self.format_str = format_str
         self.converter = converter
 
-    def select(self, content: str, resp: Response) -> str | list[str]:
+    def select(self, content: str | None, resp: Response) -> str | list[str]:
+        """
+        从 content 中选择；content 为 None 时选择响应正文，read_bytes 的选择器直接读取响应的字节，不解码正文
+        """
         try:
             selected = []
+            if content is None and resp is not None and resp.content is not None:
+                content = resp.content if self.selector is None and self.read_bytes(resp) else resp.text
             if content and self.selector:
                 content = self.selector.select(content, resp)
             if content and self.expr is not None:
                 if isinstance(content, list):
                     for c in content:
-                        selected.append(*self.do_select(c, resp))
+                        selected.append(*self._do_select(c, resp))
                 else:
-                    selected = [*self.do_select(content, resp)]
+                    selected = self._do_select(content, resp)
 
-            selected = selected if self.multi else ([selected[0]] if len(selected) > 0 else [])
-
-            if selected and self.trim:
-                selected = [x.strip() for x in selected]
-
-            if self.filter_empty:
-                selected = [x for x in selected if x]
-
-            if self.format_str:
-                selected = [self.format_str.format(x) for x in selected]
-
-            if self.converter:
-                if self.multi:
-                    selected = [self.converter(x) for x in selected]
-                else:
-                    selected = [self.converter(selected[0]) if len(selected) > 0 else self.converter(None)]
-            return selected if self.multi else (selected[0] if len(selected) > 0 else None)
+            return self.finish(selected)
         except BaseException as e:
             _logger.error(f"failed to select value from [{content} with selector [{self}]")
             raise e
 
+    def finish(self, selected: list[str]) -> str | list[str]:
+        """
+        对 do_select 选出的原始值依次应用 multi、trim、filter_empty、format_str 和 converter；
+        不是字符串的值（转换函数可以直接接收的原生类型）不做 trim 和 filter_empty
+        """
+        selected = selected if self.multi else selected[:1]
+
+        if selected and (self.trim or self.filter_empty or self.format_str):
+            values = []
+            for x in selected:
+                if isinstance(x, str):
+                    if self.trim:
+                        x = x.strip()
+                    if self.filter_empty and not x:
+                        continue
+                if self.format_str:
+                    x = self.format_str.format(x)
+                values.append(x)
+            selected = values
+
+        if self.converter:
+            if self.multi:
+                selected = [self.converter(x) for x in selected]
+            else:
+                selected = [self.converter(selected[0]) if len(selected) > 0 else self.converter(None)]
+        return selected if self.multi else (selected[0] if len(selected) > 0 else None)
+
     @abstractmethod
     def do_select(self, content: str, resp: Response) -> List[str]:
         pass
 
+    def read_bytes(self, resp: Response) -> bool:
+        """
+        是否在响应的字节上选择；为 True 时选择响应正文的 do_select 收到的 content 是 resp.content
+        """
+        return False
+
+    @property
+    def memo_key(self) -> tuple | None:
+        """
+        描述 do_select 结果的选择器结构，结构相同的选择器在同一响应的同一内容上只选择一次；
+        为 None 时不缓存，适合本身开销很小的选择器
+        """
+        return None
+
+    def _do_select(self, content: str, resp: Response) -> List[str]:
+        key = self.memo_key
+        if key is None or resp is None:
+            return [*self.do_select(content, resp)]
+        return resp.selected(key, content, lambda: self.do_select(content, resp))
+
+    def __get__(self, instance, owner):
+        return _lazy_get(self, instance)
+
     def __str__(self):
         return f'{self.__class__.__name__}{{expr={self.expr}}}'
 
@@ -120,6 +163,27 @@ class Embedded:
         links.extend(s[1])
         return s[0]
 
+    def __get__(self, instance, owner):
+        return _lazy_get(self, instance)
+
+    def iterate(self, content: str, resp: Response, links: list[Request] = None) -> Iterator[R]:
+        """
+        逐个产出结果；选择器提供 iterate（例如 JsonStream）、是 multi 且没有嵌套选择器时边读取边产出，
+        不会一次性选出全部内容，其他情况与 select 的结果相同。content 为 None 时使用响应正文
+        """
+        if links is None:
+            links = []
+        selector = self.selector
+        if selector.multi and selector.selector is None and hasattr(selector, 'iterate'):
+            values = selector.iterate(content, resp)
+        else:
+            selected = selector.select(content, resp)
+            values = selected if isinstance(selected, list) else [selected]
+        for x in values:
+            s = select(x, resp, self.target, *self.args, **self.kwargs)
+            links.extend(s[1])
+            yield s[0]
+
 
 def embedded(selector: Selector, embedded_class: type[R], *args, **kwargs) -> Embedded:
     return Embedded(selector, embedded_class, *args, **kwargs)
@@ -136,23 +200,245 @@ def _get_type_selectors_links(cls: type) -> (dict[str, Selector | Embedded], Lis
     return selectors, links
 
 
+_FUSED: dict[type, list] = {}
+
+
+def _get_fused(cls: type, selectors: dict[str, Selector | Embedded]) -> list:
+    """
+    结果类中声明了 combine 的同类选择器交给选择器类的 fuse 合并，只需扫描一遍内容；结果按类缓存
+    """
+    fused = _FUSED.get(cls, None)
+    if fused is None:
+        candidates: dict[type, dict[str, Selector]] = {}
+        for k, v in selectors.items():
+            if isinstance(v, Selector) and getattr(v, 'combine', False) and v.selector is None:
+                candidates.setdefault(type(v), {})[k] = v
+        fused = []
+        for t, items in candidates.items():
+            fused.extend(t.fuse(items))
+        _FUSED[cls] = fused
+    return fused
+
+
 def select(content: str, resp: Response, result_class: type, links: list[Request] = None, *args, **kwargs) -> (
         R, list[Request]):
     r = result_class(*args, **kwargs)
     _selectors, _links = _get_type_selectors_links(type(r))
     if links is None:
         links = []
+    if _is_lazy(type(r)):
+        _defer(r, content, resp, _selectors, links)
+        _follow(r, content, resp, _links, links)
+        return r, links
+    registry = get_registry()
+    timed = registry.enabled
+    fused = {}
+    for f in _get_fused(type(r), _selectors):
+        start = perf_counter() if timed else 0
+        fused.update(f.select(content, resp))
+        if timed:
+            registry.observe('selector_seconds', perf_counter() - start,
+                             field=f'{result_class.__name__}.<{"+".join(f.keys)}>')
     for key, value in _selectors.items():
-        if isinstance(value, Selector):
+        start = perf_counter() if timed else 0
+        if key in fused:
+            r.__dict__[key] = value.finish(fused[key])
+        elif isinstance(value, Selector):
             r.__dict__[key] = value.select(content, resp)
         elif isinstance(value, Embedded):
             r.__dict__[key] = value.select(content, resp, links)
+        if timed:
+            registry.observe('selector_seconds', perf_counter() - start, field=f'{result_class.__name__}.{key}')
 
+    _follow(r, content, resp, _links, links)
+    return r, links
+
+
+_LAZY: set[type] = set()
+
+
+def lazy(cls):
+    """
+    结果类的字段改为首次读取时才求值
+
+    select 只保留内容和响应，字段在第一次读取时从保留的内容中选择并缓存在结果对象上，从未读取的字段不产生任何开销。
+    结果类的链接（terminable、attr_props）只读取用到的字段；会产生链接的 embedded 字段仍在 select 时求值。
+    extractor 在收集器执行后释放保留的内容，此后未读取过的字段为 None；
+    收集器应通过属性或 fields(r) 读取字段，直接读取 r.__dict__ 只能得到已求值的字段。
+    """
+    _LAZY.add(cls)
+    return cls
+
+
+def _is_lazy(cls: type) -> bool:
+    return cls in _LAZY or any(t in _LAZY for t in cls.__bases__)
+
+
+class _Pending:
+    """
+    lazy 结果对象尚未求值的字段及求值所需的内容
+    """
+
+    __slots__ = ('content', 'resp', 'selectors', 'fused', 'ref')
+
+    def __init__(self, content: str, resp: Response, selectors: dict[str, Selector | Embedded], fused: list):
+        self.content = content
+        self.resp = resp
+        self.selectors = selectors
+        self.fused = fused
+        self.ref = None
+
+    def evaluate(self, r: R, key: str):
+        value = self.selectors.pop(key)
+        registry = get_registry()
+        timed = registry.enabled
+        start = perf_counter() if timed else 0
+        name = f'{type(r).__name__}.{key}'
+        for f in self.fused:
+            if key in f.keys:
+                # 合并的正则字段一次扫描，同组的其他字段一起求值
+                for k, selected in f.select(self.content, self.resp).items():
+                    if k == key:
+                        r.__dict__[k] = value.finish(selected)
+                    elif k in self.selectors:
+                        r.__dict__[k] = self.selectors.pop(k).finish(selected)
+                self.fused.remove(f)
+                name = f'{type(r).__name__}.<{"+".join(f.keys)}>'
+                break
+        else:
+            r.__dict__[key] = value.select(self.content, self.resp)
+        if timed:
+            registry.observe('selector_seconds', perf_counter() - start, field=name)
+        if not self.selectors:
+            _PENDING.pop(id(r), None)
+
+
+# id(结果对象) -> 尚未求值的字段，结果对象被回收或释放时移除
+_PENDING: dict[int, _Pending] = {}
+
+
+def _lazy_get(selector: Selector | Embedded, instance):
+    if instance is None:
+        return selector
+    pending = _PENDING.get(id(instance), None)
+    if pending is None:
+        return selector
+    for key, value in pending.selectors.items():
+        if value is selector:
+            break
+    else:
+        return selector
+    pending.evaluate(instance, key)
+    return instance.__dict__[key]
+
+
+_LINKING: dict[type, bool] = {}
+
+
+def _produces_links(cls: type) -> bool:
+    """
+    结果类或其嵌套的 embedded 结果类是否声明了链接
+    """
+    linking = _LINKING.get(cls, None)
+    if linking is None:
+        # 先按不产生链接记录，避免自引用的结果类无限递归
+        _LINKING[cls] = False
+        selectors, links = _get_type_selectors_links(cls)
+        linking = bool(links) or any(isinstance(v, Embedded) and _produces_links(v.target) for v in selectors.values())
+        _LINKING[cls] = linking
+    return linking
+
+
+def _defer(r: R, content: str, resp: Response, _selectors: dict[str, Selector | Embedded], links: list[Request]):
+    deferred = {}
+    for key, value in _selectors.items():
+        if r.__dict__.get(key, None) is value:
+            # dataclass 把选择器作为默认值写入了实例
+            del r.__dict__[key]
+        if isinstance(value, Embedded) and _produces_links(value.target):
+            r.__dict__[key] = value.select(content, resp, links)
+        else:
+            deferred[key] = value
+    if not deferred:
+        return
+    pending = _Pending(content, resp, deferred, list(_get_fused(type(r), _selectors)))
+    key = id(r)
+    # 结果对象被回收时移除，未经 release 的结果对象不会一直占用内容
+    pending.ref = weakref.ref(r, lambda _: _PENDING.pop(key, None))
+    _PENDING[key] = pending
+
+
+def _materialize(v: Any):
+    if isinstance(v, list):
+        for x in v:
+            _materialize(x)
+    elif id(v) in _PENDING:
+        fields(v)
+
+
+def fields(r: R) -> dict[str, Any]:
+    """
+    结果对象的全部字段；lazy 结果对象（包括嵌套的 embedded 结果）尚未求值的字段在此时求值
+    """
+    if not _is_lazy(type(r)):
+        return dict(r.__dict__)
+    pending = _PENDING.get(id(r), None)
+    if pending is not None:
+        for key in list(pending.selectors):
+            if key in pending.selectors:
+                pending.evaluate(r, key)
+    for v in r.__dict__.values():
+        _materialize(v)
+    # 按字段声明的顺序返回，与立即求值时相同
+    selectors, _ = _get_type_selectors_links(type(r))
+    values = {k: r.__dict__[k] for k in selectors if k in r.__dict__}
+    values.update(r.__dict__)
+    return values
+
+
+def field(r: R, name: str, default: Any = None) -> Any:
+    """
+    结果对象的一个字段，lazy 结果对象尚未求值时此时求值
+    """
+    if name not in r.__dict__:
+        pending = _PENDING.get(id(r), None)
+        if pending is not None and name in pending.selectors:
+            pending.evaluate(r, name)
+    return r.__dict__.get(name, default)
+
+
+def release(r: R):
+    """
+    释放 lazy 结果对象保留的内容，未读取过的字段置为 None；嵌套的 lazy 结果一并释放
+    """
+    if not _PENDING:
+        return
+    pending = _PENDING.pop(id(r), None)
+    if pending is not None:
+        for key in pending.selectors:
+            r.__dict__[key] = None
+    for v in r.__dict__.values():
+        for x in (v if isinstance(v, list) else [v]):
+            if id(x) in _PENDING:
+                release(x)
+
+
+def _follow(r: R, content: str, resp: Response, _links: list[Link], links: list[Request]):
+    """
+    按结果类声明的链接从内容中选出新的请求，追加到 links
+    """
+    if not _links:
+        return
+    registry = get_registry()
+    timed = registry.enabled
     for link in _links:
-        if link.terminable and link.terminable(r, content, resp):
+        if link.terminable and link.terminable(r, resp.text if content is None else content, resp):
             continue
         requests = []
+        start = perf_counter() if timed else 0
         l = link.selector.select(content, resp)
+        if timed:
+            registry.observe('selector_seconds', perf_counter() - start, field=f'{type(r).__name__}.<link>')
         if l:
             if isinstance(l, list):
                 requests.extend(l)
@@ -168,12 +454,12 @@ def select(content: str, resp: Response, result_class: type, links: list[Request
                                     inherit=link.inherit) for x in requests]
             if link.attr_props:
                 for attr_prop in link.attr_props:
-                    if attr_prop in r.__dict__:
+                    value = field(r, attr_prop, _MISSING)
+                    if value is not _MISSING:
                         for new_request in new_requests:
-                            new_request.set_attr(attr_prop, r.__dict__[attr_prop])
+                            new_request.set_attr(attr_prop, value)
 
             links.extend(new_requests)
-    return r, links
 
 
 def link(selector: Selector, method: str = 'GET',
@@ -5,6 +5,13 @@ from .. import Response
 from ..types import Converter
 
 
+def parse(content: str, resp: Response) -> html.HtmlElement:
+    """
+    解析为 lxml 文档，同一响应上的同一内容只解析一次
+    """
+    return resp.tree('lxml', content, html.fromstring) if resp is not None else html.fromstring(content)
+
+
 class Xpath(Selector):
     def __init__(self, expr: str,
                  selector: Selector = None,
@@ -22,10 +29,14 @@ class Xpath(Selector):
                                     format_str=format_str,
                                     converter=converter)
 
+    @property
+    def memo_key(self) -> tuple:
+        return Xpath, self.expr
+
     def do_select(self, content: str, resp: Response) -> list[str]:
         return [html.tostring(x, encoding=resp.encoding).decode() if isinstance(x, html.HtmlElement) else str(x) for x
                 in
-                html.fromstring(content).xpath(self.expr)]
+                parse(content, resp).xpath(self.expr)]
 
 
 def new(expr: str,
@@ -1,3 +1,4 @@
+from .hedge import HedgePolicy
 from .limiter import Limiter
 
 
@@ -9,13 +10,15 @@ class Site:
                  headers: dict[str, str] = None,
                  proxy: str = None,
                  encoding: str = 'utf-8',
-                 timeout: float = 30):
+                 timeout: float = 30,
+                 hedge: HedgePolicy = None):
         self._host = host
         self._limiter = limiter
         self._headers = headers if headers is not None else {}
         self._proxy = proxy
         self._encoding = encoding
         self._timeout = timeout
+        self._hedge = hedge
 
     @property
     def host(self):
@@ -41,6 +44,14 @@ class Site:
     def timeout(self):
         return self._timeout
 
+    @property
+    def hedge(self):
+        return self._hedge
+
+    def with_proxy(self, proxy: str) -> 'Site':
+        return Site(self._host, limiter=self._limiter, headers=self._headers, proxy=proxy, encoding=self._encoding,
+                    timeout=self._timeout, hedge=self._hedge)
+
     def __str__(self):
         return f'{{host={self.host}}}'
 
@@ -51,5 +62,6 @@ def new(host: str,
         headers: dict[str, str] = None,
         proxy: str = None,
         encoding: str = 'utf-8',
-        timeout: float = 30) -> Site:
-    return Site(host, limiter=limiter, headers=headers, proxy=proxy, encoding=encoding, timeout=timeout)
+        timeout: float = 30,
+        hedge: HedgePolicy = None) -> Site:
+    return Site(host, limiter=limiter, headers=headers, proxy=proxy, encoding=encoding, timeout=timeout, hedge=hedge)
@@ -0,0 +1,172 @@
+import json
+import logging
+import math
+import threading
+from collections import deque
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from time import monotonic
+
+from .metrics import Registry
+
+_logger = logging.getLogger("pyoctopus.stats")
+
+_PREFIX = "pyoctopus_"
+
+# 计算速率的时间窗口（秒）
+_RATE_WINDOW = 60
+
+
+def _escape(v) -> str:
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: dict, extra: dict = None) -> str:
+    items = {**labels, **(extra or {})}
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items.items()) + "}"
+
+
+def _number(v: float) -> str:
+    if v == math.inf:
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+class StatsServer:
+    """
+    内嵌的统计信息 HTTP 服务
+
+    GET /metrics 返回 Prometheus 文本格式，GET /stats 返回 JSON，
+    爬虫配置了采样分析器时 GET /profile 返回当前的 collapsed stack。
+    """
+
+    def __init__(self, octopus, registry: Registry, host: str = "127.0.0.1", port: int = 0):
+        self._octopus = octopus
+        self._registry = registry
+        self._address = (host, port)
+        self._server = None
+        self._thread = None
+        self._samples = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def port(self) -> int | None:
+        return self._server.server_address[1] if self._server else None
+
+    def start(self):
+        server = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                if path == "/metrics":
+                    self._reply(server.render_prometheus(), "text/plain; version=0.0.4; charset=utf-8")
+                elif path == "/stats":
+                    self._reply(json.dumps(server.collect(), ensure_ascii=False), "application/json; charset=utf-8")
+                elif path == "/profile" and server._octopus.profiler is not None:
+                    self._reply(server._octopus.profiler.collapsed(), "text/plain; charset=utf-8")
+                else:
+                    self.send_error(404)
+
+            def _reply(self, body: str, content_type: str):
+                data = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                _logger.debug(format % args)
+
+        self._server = ThreadingHTTPServer(self._address, _Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="StatsServer", daemon=True)
+        self._thread.start()
+        # 记录初始样本作为速率计算的起点
+        self.collect()
+        _logger.info(f"Pyoctopus stats server listening on http://{self._address[0]}:{self.port}/metrics")
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def collect(self) -> dict:
+        live = self._octopus.get_live_stats()
+        counters = {}
+        for c in self._registry.counters():
+            counters.setdefault(c.name, {})[",".join(f"{k}={v}" for k, v in c.labels.items())] = c.value
+        requests = counters.get("requests_total", {})
+        completed = requests.get("state=completed", 0)
+        failed = requests.get("state=failed", 0)
+        received = sum(counters.get("bytes_in_total", {}).values())
+        pages_rate, bytes_rate, errors_rate = self._rates(completed + failed, received, failed)
+        threads = live["threads"] or 1
+        return {
+            **live,
+            "pages_per_second": pages_rate,
+            "bytes_per_second": bytes_rate,
+            "errors_per_second": errors_rate,
+            "error_ratio": failed / (completed + failed) if completed + failed else 0.0,
+            "worker_utilization": live["busy_workers"] / threads,
+            "counters": counters,
+        }
+
+    def render_prometheus(self) -> str:
+        stats = self.collect()
+        lines = []
+
+        def _gauge(name: str, help_text: str, samples: list[tuple[dict, float]]):
+            lines.append(f"# HELP {_PREFIX}{name} {help_text}")
+            lines.append(f"# TYPE {_PREFIX}{name} gauge")
+            for labels, v in samples:
+                lines.append(f"{_PREFIX}{name}{_labels(labels)} {_number(v)}")
+
+        _gauge("pages_per_second", "Pages processed per second", [({}, stats["pages_per_second"])])
+        _gauge("bytes_per_second", "Response bytes received per second", [({}, stats["bytes_per_second"])])
+        _gauge("errors_per_second", "Failed requests per second", [({}, stats["errors_per_second"])])
+        _gauge("error_ratio", "Failed requests / processed requests", [({}, stats["error_ratio"])])
+        _gauge("in_flight", "Requests being processed per host",
+               [({"host": h}, n) for h, n in stats["in_flight"].items()])
+        _gauge("frontier_requests", "Requests in the store by state",
+               [({"state": s}, n) for s, n in stats["frontier"].items()])
+        _gauge("intake_requests", "Discovered requests waiting to be persisted", [({}, stats["intake"])])
+        _gauge("workers", "Configured worker threads", [({}, stats["threads"])])
+        _gauge("workers_busy", "Worker threads processing a request", [({}, stats["busy_workers"])])
+        _gauge("worker_utilization", "Busy workers / configured workers", [({}, stats["worker_utilization"])])
+        _gauge("paused_hosts", "Hosts paused by throttling", [({}, len(stats["paused_hosts"]))])
+
+        names = set()
+        for c in sorted(self._registry.counters(), key=lambda x: x.name):
+            if c.name not in names:
+                names.add(c.name)
+                lines.append(f"# TYPE {_PREFIX}{c.name} counter")
+            lines.append(f"{_PREFIX}{c.name}{_labels(c.labels)} {_number(c.value)}")
+        for h in sorted(self._registry.histograms(), key=lambda x: x.name):
+            snapshot = h.snapshot()
+            if h.name not in names:
+                names.add(h.name)
+                lines.append(f"# TYPE {_PREFIX}{h.name} histogram")
+            cumulative = 0
+            for le, count in snapshot["buckets"]:
+                cumulative += count
+                lines.append(f"{_PREFIX}{h.name}_bucket{_labels(h.labels, {'le': _number(le)})} {cumulative}")
+            lines.append(f"{_PREFIX}{h.name}_sum{_labels(h.labels)} {_number(snapshot['sum'])}")
+            lines.append(f"{_PREFIX}{h.name}_count{_labels(h.labels)} {snapshot['count']}")
+        return "\n".join(lines) + "\n"
+
+    def _rates(self, pages: float, received: float, errors: float) -> tuple[float, float, float]:
+        # 每次采集记录一个样本，用窗口内最早的样本计算速率
+        now = monotonic()
+        with self._lock:
+            self._samples.append((now, pages, received, errors))
+            while len(self._samples) > 2 and now - self._samples[1][0] >= _RATE_WINDOW:
+                self._samples.popleft()
+            t, p, b, e = self._samples[0]
+        elapsed = now - t
+        if elapsed <= 0:
+            return 0.0, 0.0, 0.0
+        return (pages - p) / elapsed, (received - b) / elapsed, (errors - e) / elapsed
@@ -1,6 +1,20 @@
-from .memory_store import new as memory_store
-from .redis_store import new as redis_store
-from .sqlite_store import new as sqlite_store
-from .store import Store
+from typing import TYPE_CHECKING
+
+from .._lazy import attach
+
+_EXPORTS = {
+    "memory_store": ".memory_store:new",
+    "sqlite_store": ".sqlite_store:new",
+    "redis_store": ".redis_store:new",
+    "Store": ".store:Store",
+}
 
 __all__ = ['memory_store', 'sqlite_store', 'redis_store', 'Store']
+
+__getattr__, __dir__ = attach(__name__, _EXPORTS)
+
+if TYPE_CHECKING:
+    from .memory_store import new as memory_store
+    from .redis_store import new as redis_store
+    from .sqlite_store import new as sqlite_store
+    from .store import Store
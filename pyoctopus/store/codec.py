@@ -0,0 +1,237 @@
+import hashlib
+import json
+import struct
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Callable
+
+from ..request import Request, SharedDict, State, intern_map
+
+VERSION = 2
+
+_FLAG_POST = 1
+_FLAG_REPEATABLE = 1 << 1
+_FLAG_INHERIT = 1 << 2
+_FLAG_NOT_BEFORE = 1 << 3
+_FLAG_HEADERS = 1 << 4
+_FLAG_ATTRS = 1 << 5
+_FLAG_QUERIES = 1 << 6
+
+_STATES = list(State)
+_STATE_INDEX = {s: i for i, s in enumerate(_STATES)}
+
+# version, flags, state, priority, depth, 后面 6 个字符串（id, url, data, parent, msg, queries）的长度
+_HEAD = struct.Struct("<BBBiI6I")
+_NOT_BEFORE = struct.Struct("<d")
+_NONE = 0xFFFFFFFF
+
+_DIGEST_SIZE = 16
+
+# 版本 2 中请求头和属性的存放方式：字典项摘要或内联的 JSON
+_MAP_DIGEST = 0
+_MAP_INLINE = 1
+_INLINE_LENGTH = struct.Struct("<I")
+
+
+def _digest(blob: bytes) -> bytes:
+    return hashlib.blake2b(blob, digest_size=_DIGEST_SIZE).digest()
+
+
+def _dump_map(m: dict) -> bytes:
+    return json.dumps(m, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+class RequestCodec:
+    """
+    Request 的紧凑二进制编码
+
+    定长字段用 struct 打包，字符串按长度前缀存放；请求头和属性在大量请求之间重复，
+    因此单独编码为字典项，请求中只保存其 16 字节摘要。字典项通过 save 持久化，解码时本地没有的摘要通过 load 取回。
+    相同内容第二次出现时才编码为字典项，第一次出现的内联保存，每个请求各不相同的属性不会产生字典项。
+    第一个字节为格式版本，仍可解码版本 1。
+
+    transactional 为 True 时 save 在存储的事务中执行，存储提交或回滚事务后必须调用 commit 或 rollback，
+    事务提交前写入的字典项不会被当作已保存；已保存的摘要最多记录 saved_size 个，超出后最久未用的会再次保存。
+    """
+
+    def __init__(self,
+                 load: Callable[[bytes], bytes | None],
+                 save: Callable[[bytes, bytes], None],
+                 cache_size: int = 4096,
+                 *,
+                 saved_size: int = 65536,
+                 transactional: bool = False):
+        self._load = load
+        self._save = save
+        self._cache_size = cache_size
+        self._saved_size = saved_size
+        self._transactional = transactional
+        # 共享字典对象 id -> (字典, 摘要)，持有字典引用以保证 id 不被复用
+        self._digests: OrderedDict[int, tuple[dict, bytes]] = OrderedDict()
+        # 摘要 -> 解码后的字典，解码出的请求共享同一个字典
+        self._maps: OrderedDict[bytes, SharedDict] = OrderedDict()
+        # 已确认保存的摘要
+        self._saved: OrderedDict[bytes, None] = OrderedDict()
+        # 只内联出现过一次的摘要
+        self._seen: OrderedDict[bytes, None] = OrderedDict()
+        # 当前线程的事务中保存、尚未提交的摘要
+        self._pending = threading.local()
+        self._lock = threading.Lock()
+
+    def commit(self):
+        """
+        当前线程的事务已提交，其中保存的字典项可以被后续请求引用
+        """
+        pending = getattr(self._pending, "digests", None)
+        if pending:
+            with self._lock:
+                for digest in pending:
+                    self._mark_saved(digest)
+            pending.clear()
+
+    def rollback(self):
+        """
+        当前线程的事务已回滚，其中保存的字典项需要重新保存
+        """
+        pending = getattr(self._pending, "digests", None)
+        if pending:
+            pending.clear()
+
+    def encode(self, r: Request) -> bytes:
+        flags = 0
+        if r.method == "POST":
+            flags |= _FLAG_POST
+        if r.repeatable:
+            flags |= _FLAG_REPEATABLE
+        if r.inherit:
+            flags |= _FLAG_INHERIT
+        tail = []
+        if r.not_before is not None:
+            flags |= _FLAG_NOT_BEFORE
+            tail.append(_NOT_BEFORE.pack(r.not_before))
+        headers, attrs = r.view()
+        if headers:
+            flags |= _FLAG_HEADERS
+            tail.append(self._encode_map(headers))
+        if attrs:
+            flags |= _FLAG_ATTRS
+            tail.append(self._encode_map(attrs))
+        queries = None
+        if r.queries:
+            flags |= _FLAG_QUERIES
+            queries = json.dumps(r.queries, ensure_ascii=False)
+        strings = [None if s is None else s.encode("utf-8") for s in (r.id, r.url, r.data, r.parent, r.msg, queries)]
+        head = _HEAD.pack(VERSION, flags, _STATE_INDEX[r.state], r.priority, r.depth,
+                          *[_NONE if s is None else len(s) for s in strings])
+        return b"".join([head, *[s for s in strings if s], *tail])
+
+    def decode(self, blob: bytes) -> Request:
+        version = blob[0]
+        if version != VERSION and version != 1:
+            raise ValueError(f"Unsupported request encoding version [{version}]")
+        _, flags, state, priority, depth, *lengths = _HEAD.unpack_from(blob)
+        offset = _HEAD.size
+        strings = []
+        for n in lengths:
+            if n == _NONE:
+                strings.append(None)
+            else:
+                strings.append(blob[offset:offset + n].decode("utf-8"))
+                offset += n
+        id, url, data, parent, msg, queries = strings
+        r = Request(url,
+                    "POST" if flags & _FLAG_POST else "GET",
+                    data=data,
+                    priority=priority,
+                    repeatable=bool(flags & _FLAG_REPEATABLE),
+                    inherit=bool(flags & _FLAG_INHERIT))
+        if flags & _FLAG_NOT_BEFORE:
+            r.not_before = _NOT_BEFORE.unpack_from(blob, offset)[0]
+            offset += _NOT_BEFORE.size
+        if flags & _FLAG_HEADERS:
+            r.headers, offset = self._read_map(blob, offset, version)
+        if flags & _FLAG_ATTRS:
+            r.attrs, offset = self._read_map(blob, offset, version)
+        if queries is not None:
+            r.queries = json.loads(queries)
+        r.id = id
+        r.parent = parent
+        r.msg = msg
+        r.state = _STATES[state]
+        r.depth = depth
+        return r
+
+    def _encode_map(self, data: Mapping) -> bytes:
+        # 只有共用的 SharedDict 不会再被修改，才能按对象缓存摘要
+        shared = isinstance(data, SharedDict)
+        pending = getattr(self._pending, "digests", None)
+        if pending is None:
+            pending = self._pending.digests = set()
+        if shared:
+            with self._lock:
+                cached = self._digests.get(id(data), None)
+                # 摘要对应的字典项已提交（或在当前事务中保存）时才能直接引用
+                if cached is not None and cached[0] is data and (cached[1] in self._saved or cached[1] in pending):
+                    self._digests.move_to_end(id(data))
+                    return bytes([_MAP_DIGEST]) + cached[1]
+        blob = _dump_map(data)
+        digest = _digest(blob)
+        with self._lock:
+            if shared:
+                self._remember_digest(data, digest)
+            saved = digest in self._saved
+            if saved:
+                self._saved.move_to_end(digest)
+            elif digest not in self._seen and digest not in pending:
+                # 第一次出现的内容内联保存
+                self._seen[digest] = None
+                if len(self._seen) > self._saved_size:
+                    self._seen.popitem(last=False)
+                return bytes([_MAP_INLINE]) + _INLINE_LENGTH.pack(len(blob)) + blob
+        if not saved and digest not in pending:
+            self._save(digest, blob)
+            if self._transactional:
+                pending.add(digest)
+            else:
+                with self._lock:
+                    self._mark_saved(digest)
+        return bytes([_MAP_DIGEST]) + digest
+
+    def _read_map(self, blob: bytes, offset: int, version: int) -> tuple[SharedDict, int]:
+        if version == 1 or blob[offset] == _MAP_DIGEST:
+            start = offset if version == 1 else offset + 1
+            return self._decode_map(blob[start:start + _DIGEST_SIZE]), start + _DIGEST_SIZE
+        n = _INLINE_LENGTH.unpack_from(blob, offset + 1)[0]
+        start = offset + 1 + _INLINE_LENGTH.size
+        return SharedDict(intern_map(json.loads(blob[start:start + n]))), start + n
+
+    def _mark_saved(self, digest: bytes):
+        self._saved[digest] = None
+        self._saved.move_to_end(digest)
+        if len(self._saved) > self._saved_size:
+            self._saved.popitem(last=False)
+        self._seen.pop(digest, None)
+
+    def _decode_map(self, digest: bytes) -> SharedDict:
+        with self._lock:
+            data = self._maps.get(digest, None)
+            if data is not None:
+                self._maps.move_to_end(digest)
+        if data is None:
+            blob = self._load(digest)
+            if blob is None:
+                raise ValueError(f"Dictionary entry [{digest.hex()}] not found")
+            data = SharedDict(intern_map(json.loads(blob)))
+            with self._lock:
+                self._maps[digest] = data
+                if len(self._maps) > self._cache_size:
+                    self._maps.popitem(last=False)
+                self._mark_saved(digest)
+                self._remember_digest(data, digest)
+        return data
+
+    def _remember_digest(self, data: SharedDict, digest: bytes):
+        self._digests[id(data)] = (data, digest)
+        if len(self._digests) > self._cache_size:
+            self._digests.popitem(last=False)
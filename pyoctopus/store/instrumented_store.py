@@ -0,0 +1,99 @@
+from time import perf_counter
+
+from .store import Store
+from ..metrics import Registry
+from ..request import Request, State
+
+
+class InstrumentedStore(Store):
+    """
+    记录每个存储操作耗时的包装器，指标名为 store_seconds，标签 op 为操作名
+    """
+
+    def __init__(self, store: Store, registry: Registry):
+        self._store = store
+        self._registry = registry
+
+    @property
+    def store(self) -> Store:
+        return self._store
+
+    def _observe(self, op: str, start: float):
+        self._registry.observe("store_seconds", perf_counter() - start, op=op)
+
+    def put(self, r: Request) -> bool:
+        start = perf_counter()
+        try:
+            return self._store.put(r)
+        finally:
+            self._observe("put", start)
+
+    def get(self) -> Request | None:
+        start = perf_counter()
+        try:
+            return self._store.get()
+        finally:
+            self._observe("get", start)
+
+    def exists(self, id: str) -> bool:
+        start = perf_counter()
+        try:
+            return self._store.exists(id)
+        finally:
+            self._observe("exists", start)
+
+    def put_all(self, requests: list[Request]) -> int:
+        start = perf_counter()
+        try:
+            return self._store.put_all(requests)
+        finally:
+            self._observe("put_all", start)
+
+    def exists_all(self, ids: list[str]) -> set[str]:
+        start = perf_counter()
+        try:
+            return self._store.exists_all(ids)
+        finally:
+            self._observe("exists_all", start)
+
+    def update_state(self, r: Request, state: State, msg: str = None):
+        start = perf_counter()
+        try:
+            return self._store.update_state(r, state, msg)
+        finally:
+            self._observe("update_state", start)
+
+    def reply_failed(self) -> int:
+        start = perf_counter()
+        try:
+            return self._store.reply_failed()
+        finally:
+            self._observe("reply_failed", start)
+
+    def get_statistics(self) -> tuple[int, int, int, int, int]:
+        start = perf_counter()
+        try:
+            return self._store.get_statistics()
+        finally:
+            self._observe("get_statistics", start)
+
+    def get_waiting_count(self) -> int:
+        start = perf_counter()
+        try:
+            return self._store.get_waiting_count()
+        finally:
+            self._observe("get_waiting_count", start)
+
+    def has_waiting_requests(self) -> bool:
+        start = perf_counter()
+        try:
+            return self._store.has_waiting_requests()
+        finally:
+            self._observe("has_waiting_requests", start)
+
+    def get_next_delay(self) -> float | None:
+        start = perf_counter()
+        try:
+            return self._store.get_next_delay()
+        finally:
+            self._observe("get_next_delay", start)
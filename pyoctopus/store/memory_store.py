@@ -1,10 +1,15 @@
+import heapq
+import itertools
 import queue
+import time
 
 from .store import Store
 from ..request import Request, State
 
 
 class _Wrapper:
+    __slots__ = ("id", "priority")
+
     def __init__(self, id: str, priority: int):
         self.id = id
         self.priority = priority
@@ -16,6 +21,9 @@ class _Wrapper:
 class _MemoryStore(Store):
     def __init__(self):
         self._queue = queue.PriorityQueue()
+        # 未到期的请求按 not_before 放在最小堆中，到期后再进入优先级队列
+        self._delayed: list[tuple[float, int, str]] = []
+        self._sequence = itertools.count()
         self._all: dict[str, Request] = {}
         self._fails = set()
         self._executing = set()
@@ -23,10 +31,11 @@ class _MemoryStore(Store):
 
     def put(self, r: Request) -> bool:
         self._all[r.id] = r
-        self._queue.put(_Wrapper(r.id, r.priority))
+        self._enqueue(r)
         return True
 
     def get(self) -> Request | None:
+        self._release_due()
         try:
             r = self._queue.get(False)
             req = self._all[r.id] if r else None
@@ -51,7 +60,7 @@ class _MemoryStore(Store):
             self._completed.discard(r.id)
             self._executing.discard(r.id)
             self._fails.discard(r.id)
-            self._queue.put(_Wrapper(r.id, r.priority))
+            self._enqueue(r)
         else:
             raise ValueError(f"Invalid state: {state}")
 
@@ -67,10 +76,33 @@ class _MemoryStore(Store):
         return len(fails)
 
     def get_statistics(self) -> tuple[int, int, int, int, int]:
-        return len(self._all), self._queue.qsize(), len(self._executing), len(self._completed), len(self._fails)
+        waiting = self._queue.qsize() + len(self._delayed)
+        return len(self._all), waiting, len(self._executing), len(self._completed), len(self._fails)
+
+    def get_waiting_count(self) -> int:
+        return self._queue.qsize() + len(self._delayed)
 
     def has_waiting_requests(self) -> bool:
-        return self._queue.qsize() > 0 or len(self._executing) > 0
+        return self._queue.qsize() > 0 or len(self._delayed) > 0 or len(self._executing) > 0
+
+    def get_next_delay(self) -> float | None:
+        if not self._delayed:
+            return None
+        return max(0.0, self._delayed[0][0] - time.time())
+
+    def _enqueue(self, r: Request):
+        if r.is_delayed():
+            heapq.heappush(self._delayed, (r.not_before, next(self._sequence), r.id))
+        else:
+            self._queue.put(_Wrapper(r.id, r.priority))
+
+    def _release_due(self):
+        if not self._delayed:
+            return
+        now = time.time()
+        while self._delayed and self._delayed[0][0] <= now:
+            _, _, id = heapq.heappop(self._delayed)
+            self._queue.put(_Wrapper(id, self._all[id].priority))
 
 
 def new() -> Store:
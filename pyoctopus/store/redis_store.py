@@ -1,7 +1,9 @@
 import re
+import time
 
 import redis
 
+from .codec import RequestCodec
 from .store import Store
 from ..request import State, Request
 
@@ -17,15 +19,17 @@ class RedisStore(Store):
         self._pool = redis.ConnectionPool(host=host, port=port, db=db, password=password)
         self._client = redis.Redis(connection_pool=self._pool)
         self._waiting_priority_pattern = re.compile(f"^{prefix}:waiting:(.*):(.*)$")
+        self._codec = RequestCodec(self._load_dict, self._save_dict)
         # executing -> waiting
         self._re_waiting()
 
     def put(self, r: Request) -> bool:
-        self._client.set(f"{self._prefix}:all:{r.id}", r.to_json())
-        self._client.set(f"{self._prefix}:waiting:{r.priority}:{r.id}", "")
+        self._client.set(f"{self._prefix}:all:{r.id}", self._codec.encode(r))
+        self._wait(r)
         return True
 
     def get(self) -> Request | None:
+        self._release_due()
         cursor = 0
         while True:
             cursor, keys = self._client.scan(cursor, match=f"{self._prefix}:waiting:*", count=20)
@@ -33,7 +37,7 @@ class RedisStore(Store):
                 key = sorted([k.decode() for k in keys], reverse=True)[0]
                 m = self._waiting_priority_pattern.match(key)
                 id = m.group(2)
-                req = Request.from_json(self._client.get(f"{self._prefix}:all:{id}"))
+                req = self._decode(self._client.get(f"{self._prefix}:all:{id}"))
                 self._client.delete(key)
                 self._client.set(f"{self._prefix}:executing:{id}", req.priority)
                 return req
@@ -43,8 +47,22 @@ class RedisStore(Store):
     def exists(self, id: str) -> bool:
         return self._client.exists(f"{self._prefix}:all:{id}")
 
+    def put_all(self, requests: list[Request]) -> int:
+        pipe = self._client.pipeline(transaction=False)
+        for r in requests:
+            pipe.set(f"{self._prefix}:all:{r.id}", self._codec.encode(r))
+            self._wait(r, pipe)
+        pipe.execute()
+        return len(requests)
+
+    def exists_all(self, ids: list[str]) -> set[str]:
+        pipe = self._client.pipeline(transaction=False)
+        for id in ids:
+            pipe.exists(f"{self._prefix}:all:{id}")
+        return {id for id, found in zip(ids, pipe.execute()) if found}
+
     def update_state(self, r: Request, state: State, msg: str = None):
-        self._client.set(f"{self._prefix}:all:{r.id}", r.to_json())
+        self._client.set(f"{self._prefix}:all:{r.id}", self._codec.encode(r))
         if state == State.COMPLETED:
             self._client.set(f"{self._prefix}:completed:{r.id}", "")
             self._client.delete(f"{self._prefix}:executing:{r.id}")
@@ -57,7 +75,7 @@ class RedisStore(Store):
             self._client.delete(f"{self._prefix}:failed:{r.id}")
             self._client.delete(f"{self._prefix}:executing:{r.id}")
             self._client.delete(f"{self._prefix}:completed:{r.id}")
-            self._client.set(f"{self._prefix}:waiting:{r.priority}:{r.id}", "")
+            self._wait(r)
         else:
             raise ValueError(f"Invalid state: {state}")
 
@@ -77,12 +95,16 @@ class RedisStore(Store):
     def get_statistics(self) -> tuple[int, int, int, int, int]:
         return (
             self._get_key_size(f"{self._prefix}:all:*"),
-            self._get_key_size(f"{self._prefix}:waiting:*"),
+            self._get_key_size(f"{self._prefix}:waiting:*") + self._client.zcard(f"{self._prefix}:delayed"),
             self._get_key_size(f"{self._prefix}:executing:*"),
             self._get_key_size(f"{self._prefix}:completed:*"),
             self._get_key_size(f"{self._prefix}:failed:*"),
         )
 
+    def get_waiting_count(self) -> int:
+        # 只扫描待处理的键，不统计其他状态
+        return self._get_key_size(f"{self._prefix}:waiting:*") + self._client.zcard(f"{self._prefix}:delayed")
+
     def _get_key_size(self, key: str) -> int:
         cursor = 0
         count = 0
@@ -105,7 +127,43 @@ class RedisStore(Store):
                 break
 
     def has_waiting_requests(self) -> bool:
-        return self._client.exists(f"{self._prefix}:waiting:*") or self._client.exists(f"{self._prefix}:executing:*")
+        return (
+            self._client.exists(f"{self._prefix}:waiting:*")
+            or self._client.exists(f"{self._prefix}:executing:*")
+            or self._client.zcard(f"{self._prefix}:delayed") > 0
+        )
+
+    def get_next_delay(self) -> float | None:
+        first = self._client.zrange(f"{self._prefix}:delayed", 0, 0, withscores=True)
+        if not first:
+            return None
+        return max(0.0, first[0][1] - time.time())
+
+    def _decode(self, blob: bytes) -> Request:
+        # 兼容旧版本以 JSON 保存的请求
+        if blob[:1] == b"{":
+            return Request.from_json(blob)
+        return self._codec.decode(blob)
+
+    def _save_dict(self, digest: bytes, value: bytes):
+        self._client.hsetnx(f"{self._prefix}:dict", digest, value)
+
+    def _load_dict(self, digest: bytes) -> bytes | None:
+        return self._client.hget(f"{self._prefix}:dict", digest)
+
+    def _wait(self, r: Request, client=None):
+        # 未到期的请求以 "priority:id" 为成员、not_before 为分值放入有序集合
+        client = client or self._client
+        if r.is_delayed():
+            client.zadd(f"{self._prefix}:delayed", {f"{r.priority}:{r.id}": r.not_before})
+        else:
+            client.set(f"{self._prefix}:waiting:{r.priority}:{r.id}", "")
+
+    def _release_due(self):
+        key = f"{self._prefix}:delayed"
+        for member in self._client.zrangebyscore(key, "-inf", time.time()):
+            self._client.set(f"{self._prefix}:waiting:{member.decode()}", "")
+            self._client.zrem(key, member)
 
 
 def new(
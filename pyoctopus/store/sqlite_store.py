@@ -1,9 +1,11 @@
 import json
 import sqlite3
 import threading
+import time
 
 from .store import Store
-from ..request import Request, State
+from .codec import RequestCodec
+from ..request import Request, State, intern_map
 
 _COL_ID = ("id", "TEXT PRIMARY KEY")
 _COLS = [
@@ -20,43 +22,73 @@ _COLS = [
     ("depth", "INTEGER"),
     ("msg", "TEXT"),
     ("inherit", "INTEGER"),
+    ("not_before", "REAL"),
+    ("payload", "BLOB"),
 ]
 
+# queries、headers、attrs 三列只用于读取旧版本写入的数据，新数据整体编码在 payload 中
+
+# 未到期请求在表中的内部状态，到期后转为 WAITING
+_STATE_DELAYED = "DELAYED"
+
 _SQL_CREATE_TABLE = "CREATE TABLE IF NOT EXISTS {} (" + ", ".join([f"{c[0]} {c[1]}" for c in [_COL_ID, *_COLS]]) + ")"
 
 _COL_NAMES = ", ".join([c[0] for c in [_COL_ID, *_COLS]])
 
 _COL_UPDATE_BY_ID = ", ".join([f"{c[0]} = ?" for c in [*_COLS]])
 
-_local = threading.local()
-
+# 批量查询时单条 SQL 中 IN 的参数个数，低于 SQLite 默认的变量数上限
+_BATCH_SIZE = 500
 
 class SqliteStore(Store):
     def __init__(self, db: str, table: str = "pyoctopus"):
         super(SqliteStore, self).__init__()
         self._db = db
         self._table = table
+        # 每个实例单独维护线程内连接，避免同一线程中的多个实例共用连接
+        self._local = threading.local()
 
         self._sql_create_table = _SQL_CREATE_TABLE.format(self._table)
         self._sql_create_idx_priority = (
             f"CREATE INDEX IF NOT EXISTS idx_{self._table}_priority on {self._table}(priority)"
         )
+        self._sql_create_idx_delayed = (
+            f"CREATE INDEX IF NOT EXISTS idx_{self._table}_state_not_before on {self._table}(state, not_before)"
+        )
         self._sql_exist_by_id = f"SELECT count(1) FROM {self._table} WHERE id = ?"
         self._sql_update_state_by_id = f"UPDATE {self._table} SET state = ?, msg = ? WHERE id = ?"
+        self._sql_update_state_delay_by_id = (
+            f"UPDATE {self._table} SET state = ?, msg = ?, not_before = ? WHERE id = ?"
+        )
+        self._sql_release_due = f"UPDATE {self._table} SET state = ? WHERE state = ? AND not_before <= ?"
+        self._sql_next_due = f"SELECT min(not_before) FROM {self._table} WHERE state = ?"
         self._sql_get = f"SELECT {_COL_NAMES} FROM {self._table} WHERE state = ? ORDER BY priority DESC LIMIT 1"
         self._sql_update_by_id = f"UPDATE {self._table} SET {_COL_UPDATE_BY_ID} WHERE id = ?"
         self._sql_put = (
             f'INSERT INTO {self._table} ({_COL_NAMES}) VALUES ({", ".join(["?" for _ in [_COL_ID, *_COLS]])})'
         )
+        self._sql_put_or_replace = (
+            f'INSERT OR REPLACE INTO {self._table} ({_COL_NAMES}) VALUES ({", ".join(["?" for _ in [_COL_ID, *_COLS]])})'
+        )
+        self._sql_exist_by_ids = f"SELECT id FROM {self._table} WHERE id IN ({{}})"
         self._sql_update_state = f"UPDATE {self._table} SET state = ?, msg = ? WHERE state = ?"
         self._sql_paged_select = f"SELECT {_COL_NAMES} FROM {self._table} WHERE state = ? LIMIT ? OFFSET ?"
         self._sql_count_by_state = f"SELECT count(1) FROM {self._table} WHERE state = ?"
+        self._sql_count_waiting = f"SELECT count(1) FROM {self._table} WHERE state IN (?, ?)"
+        self._dict_table = f"{self._table}_dict"
+        self._sql_create_dict_table = (
+            f"CREATE TABLE IF NOT EXISTS {self._dict_table} (digest BLOB PRIMARY KEY, value BLOB)"
+        )
+        self._sql_put_dict = f"INSERT OR IGNORE INTO {self._dict_table} (digest, value) VALUES (?, ?)"
+        self._sql_get_dict = f"SELECT value FROM {self._dict_table} WHERE digest = ?"
+        self._codec = RequestCodec(self._load_dict, self._save_dict, transactional=True)
         self._init_table()
 
     def put(self, r: Request) -> bool:
         with self._get_connection() as _connection:
             try:
                 _cursor = _connection.cursor()
+                payload = self._codec.encode(r)
                 if self.exists(r.id):
                     _cursor.execute(
                         self._sql_update_by_id,
@@ -67,13 +99,15 @@ class SqliteStore(Store):
                             r.repeatable,
                             r.parent,
                             r.data,
-                            json.dumps(r.queries, ensure_ascii=False),
-                            json.dumps(r.headers, ensure_ascii=False),
-                            json.dumps(r.attrs, ensure_ascii=False),
-                            State.WAITING.value,
+                            None,
+                            None,
+                            None,
+                            _STATE_DELAYED if r.is_delayed() else State.WAITING.value,
                             r.depth,
                             r.msg,
                             r.inherit,
+                            r.not_before,
+                            payload,
                             r.id,
                         ),
                     )
@@ -88,22 +122,77 @@ class SqliteStore(Store):
                             r.repeatable,
                             r.parent,
                             r.data,
-                            json.dumps(r.queries, ensure_ascii=False),
-                            json.dumps(r.headers, ensure_ascii=False),
-                            json.dumps(r.attrs, ensure_ascii=False),
-                            r.state.value,
+                            None,
+                            None,
+                            None,
+                            _STATE_DELAYED if r.is_delayed() else r.state.value,
                             r.depth,
                             r.msg,
                             r.inherit,
+                            r.not_before,
+                            payload,
                         ),
                     )
                 _connection.commit()
+                self._codec.commit()
                 return True
-            except sqlite3.Error as e:
+            except BaseException as e:
+                # 编码时保存的字典项随事务一起回滚
+                _connection.rollback()
+                self._codec.rollback()
+                raise e
+
+    def put_all(self, requests: list[Request]) -> int:
+        # 一个事务内写入整批请求，已存在的请求整行覆盖
+        with self._get_connection() as _connection:
+            try:
+                rows = [
+                    (
+                        r.id,
+                        r.url,
+                        r.method,
+                        r.priority,
+                        r.repeatable,
+                        r.parent,
+                        r.data,
+                        None,
+                        None,
+                        None,
+                        _STATE_DELAYED if r.is_delayed() else r.state.value,
+                        r.depth,
+                        r.msg,
+                        r.inherit,
+                        r.not_before,
+                        self._codec.encode(r),
+                    )
+                    for r in requests
+                ]
+                _connection.executemany(self._sql_put_or_replace, rows)
+                _connection.commit()
+                self._codec.commit()
+                return len(rows)
+            except BaseException as e:
                 _connection.rollback()
+                self._codec.rollback()
                 raise e
 
+    def exists_all(self, ids: list[str]) -> set[str]:
+        found = set()
+        _connection = self._get_connection()
+        for i in range(0, len(ids), _BATCH_SIZE):
+            chunk = ids[i:i + _BATCH_SIZE]
+            sql = self._sql_exist_by_ids.format(", ".join(["?"] * len(chunk)))
+            found.update(row[0] for row in _connection.execute(sql, chunk))
+        return found
+
     def _row_to_request(self, row) -> Request:
+        if row[15] is not None:
+            # 状态、消息和延迟时间会单独更新，以列中的值为准
+            r = self._codec.decode(row[15])
+            r.state = State.WAITING if row[10] == _STATE_DELAYED else State(row[10])
+            r.msg = row[12]
+            r.not_before = row[14]
+            return r
         r = Request(
             row[1],
             method=row[2],
@@ -111,21 +200,23 @@ class SqliteStore(Store):
             repeatable=row[4],
             data=row[6],
             queries=json.loads(row[7]),
-            headers=json.loads(row[8]),
-            attrs=json.loads(row[9]),
+            headers=intern_map(json.loads(row[8])),
+            attrs=intern_map(json.loads(row[9])),
         )
         r.id = row[0]
         r.parent = row[5]
-        r.state = State(row[10])
+        r.state = State.WAITING if row[10] == _STATE_DELAYED else State(row[10])
         r.depth = row[11]
         r.msg = row[12]
         r.inherit = bool(row[13])
+        r.not_before = row[14]
         return r
 
     def get(self) -> Request | None:
         with self._get_connection() as _connection:
             try:
                 _cursor = _connection.cursor()
+                _cursor.execute(self._sql_release_due, (State.WAITING.value, _STATE_DELAYED, time.time()))
                 _cursor.execute(self._sql_get, (State.WAITING.value,))
                 row = _cursor.fetchone()
                 if row is not None:
@@ -153,14 +244,25 @@ class SqliteStore(Store):
         with self._get_connection() as _connection:
             try:
                 _cursor = _connection.cursor()
-                _cursor.execute(
-                    self._sql_update_state_by_id,
-                    (
-                        state.value,
-                        msg,
-                        r.id,
-                    ),
-                )
+                if state == State.WAITING:
+                    _cursor.execute(
+                        self._sql_update_state_delay_by_id,
+                        (
+                            _STATE_DELAYED if r.is_delayed() else state.value,
+                            msg,
+                            r.not_before,
+                            r.id,
+                        ),
+                    )
+                else:
+                    _cursor.execute(
+                        self._sql_update_state_by_id,
+                        (
+                            state.value,
+                            msg,
+                            r.id,
+                        ),
+                    )
                 _connection.commit()
             except sqlite3.Error as e:
                 _connection.rollback()
@@ -182,7 +284,14 @@ class SqliteStore(Store):
             try:
                 _cursor = _connection.cursor()
                 _cursor.execute(self._sql_create_table.format(self._table))
+                _cursor.execute(self._sql_create_dict_table)
+                _cursor.execute(f"PRAGMA table_info({self._table})")
+                existing_cols = {row[1] for row in _cursor.fetchall()}
+                for c in _COLS:
+                    if c[0] not in existing_cols:
+                        _cursor.execute(f"ALTER TABLE {self._table} ADD COLUMN {c[0]} {c[1]}")
                 _cursor.execute(self._sql_create_idx_priority)
+                _cursor.execute(self._sql_create_idx_delayed)
                 _cursor.execute(self._sql_update_state, (State.WAITING.value, "等待处理", State.EXECUTING.value))
                 _connection.commit()
             except sqlite3.Error as e:
@@ -200,10 +309,18 @@ class SqliteStore(Store):
                 _connection.rollback()
                 raise e
 
+    def _save_dict(self, digest: bytes, value: bytes):
+        # 在当前线程的连接上执行，与写入请求处于同一个事务
+        self._get_connection().execute(self._sql_put_dict, (digest, value))
+
+    def _load_dict(self, digest: bytes) -> bytes | None:
+        row = self._get_connection().execute(self._sql_get_dict, (digest,)).fetchone()
+        return row[0] if row is not None else None
+
     def _get_connection(self) -> sqlite3.Connection:
-        if not hasattr(_local, "conn"):
-            _local.conn = sqlite3.connect(self._db)
-        return _local.conn
+        if not hasattr(self._local, "conn"):
+            self._local.conn = sqlite3.connect(self._db)
+        return self._local.conn
 
     def get_statistics(self) -> tuple[int, int, int, int, int]:
         with self._get_connection() as _connection:
@@ -213,6 +330,8 @@ class SqliteStore(Store):
                 all = _cursor.fetchone()[0]
                 _cursor.execute(self._sql_count_by_state, (State.WAITING.value,))
                 waiting = _cursor.fetchone()[0]
+                _cursor.execute(self._sql_count_by_state, (_STATE_DELAYED,))
+                waiting += _cursor.fetchone()[0]
                 _cursor.execute(self._sql_count_by_state, (State.EXECUTING.value,))
                 executing = _cursor.fetchone()[0]
                 _cursor.execute(self._sql_count_by_state, (State.COMPLETED.value,))
@@ -225,14 +344,28 @@ class SqliteStore(Store):
                 _connection.rollback()
                 raise e
 
+    def get_waiting_count(self) -> int:
+        # 使用 state 列上的索引计数
+        row = self._get_connection().execute(self._sql_count_waiting, (State.WAITING.value, _STATE_DELAYED)).fetchone()
+        return row[0]
+
     def has_waiting_requests(self) -> bool:
         with self._get_connection() as _connection:
             _cursor = _connection.cursor()
-            _cursor.execute(self._sql_count_by_state, (State.WAITING.value,))
-            if _cursor.fetchone()[0] <= 0:
-                _cursor.execute(self._sql_count_by_state, (State.EXECUTING.value,))
-                return _cursor.fetchone()[0] > 0
-            return True
+            for state in (State.WAITING.value, _STATE_DELAYED, State.EXECUTING.value):
+                _cursor.execute(self._sql_count_by_state, (state,))
+                if _cursor.fetchone()[0] > 0:
+                    return True
+            return False
+
+    def get_next_delay(self) -> float | None:
+        with self._get_connection() as _connection:
+            _cursor = _connection.cursor()
+            _cursor.execute(self._sql_next_due, (_STATE_DELAYED,))
+            not_before = _cursor.fetchone()[0]
+            if not_before is None:
+                return None
+            return max(0.0, not_before - time.time())
 
 
 def new(db: str, table: str = "pyoctopus") -> SqliteStore:
@@ -17,6 +17,18 @@ class Store:
     def exists(self, id: str) -> bool:
         pass
 
+    def put_all(self, requests: list[Request]) -> int:
+        """
+        批量写入请求，返回写入的数量；默认逐个调用 put
+        """
+        return sum(1 for r in requests if self.put(r))
+
+    def exists_all(self, ids: list[str]) -> set[str]:
+        """
+        返回 ids 中已经存在的请求 ID；默认逐个调用 exists
+        """
+        return {id for id in ids if self.exists(id)}
+
     @abstractmethod
     def update_state(self, r: Request, state: State, msg: str = None):
         pass
@@ -32,3 +44,15 @@ class Store:
     @abstractmethod
     def has_waiting_requests(self) -> bool:
         pass
+
+    def get_waiting_count(self) -> int:
+        """
+        待处理（包括延迟）的请求数量；默认取 get_statistics 的结果，存储可以提供更快的实现
+        """
+        return self.get_statistics()[1]
+
+    def get_next_delay(self) -> float | None:
+        """
+        距离最早的延迟请求到期还有多少秒，没有延迟请求时返回 None
+        """
+        return None
@@ -0,0 +1,72 @@
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+
+def parse_retry_after(value: str | None, now: float = None) -> float | None:
+    """
+    解析 Retry-After 响应头，支持秒数和 HTTP 日期两种格式
+
+    :return: 需要等待的秒数，无法解析时返回 None
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        d = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if d is None:
+        return None
+    return max(0.0, d.timestamp() - (time.time() if now is None else now))
+
+
+class HostThrottle:
+    """
+    按站点记录的熔断状态
+
+    站点返回限流状态码后在 resume_at 之前暂停调度该站点的请求。
+    响应未携带 Retry-After 时，连续限流的等待时间按 default_delay 指数增长，成功请求后重置。
+    """
+
+    def __init__(self, default_delay: float = 60, max_backoff_exponent: int = 6):
+        self._default_delay = default_delay
+        self._max_backoff_exponent = max_backoff_exponent
+        self._resume_at: dict[str, float] = {}
+        self._strikes: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def throttle(self, host: str, retry_after: float | None = None) -> float:
+        with self._lock:
+            strikes = self._strikes.get(host, 0) + 1
+            self._strikes[host] = strikes
+            if retry_after is None:
+                retry_after = self._default_delay * 2 ** min(strikes - 1, self._max_backoff_exponent)
+            resume_at = max(self._resume_at.get(host, 0.0), time.time() + retry_after)
+            self._resume_at[host] = resume_at
+            return resume_at
+
+    def resume_at(self, host: str) -> float | None:
+        if host not in self._resume_at:
+            return None
+        with self._lock:
+            t = self._resume_at.get(host, None)
+            if t is None:
+                return None
+            if t <= time.time():
+                del self._resume_at[host]
+                return None
+            return t
+
+    def reset(self, host: str):
+        if host not in self._strikes:
+            return
+        with self._lock:
+            self._strikes.pop(host, None)
+
+    def paused_hosts(self) -> dict[str, float]:
+        now = time.time()
+        with self._lock:
+            return {h: t for h, t in self._resume_at.items() if t > now}
@@ -45,6 +45,7 @@ def collect(res):
 excel_collector = pyoctopus.excel_collector(
     os.path.expanduser("~/Downloads/gitee.xlsx"),
     False,
+    streaming=True,
     columns=[
         pyoctopus.excel_column("name", "名称"),
         pyoctopus.excel_column("address", "地址"),
@@ -63,3 +64,4 @@ if __name__ == "__main__":
     octopus = pyoctopus.new(downloader=pyoctopus.curl_cffi_downloader, store=pyoctopus.memory_store(),
                             processors=processors, sites=sites, threads=4)
     octopus.start(seed)
+    excel_collector.close()
@@ -14,6 +14,11 @@ setup(
         "redis",
         "openpyxl",
     ],
+    extras_require={  # 可选依赖
+        "parquet": ["pyarrow"],
+        "xxhash": ["xxhash"],
+        "streaming": ["ijson"],
+    },
     author="yangshoulai",  # 作者信息
     author_email="shoulai.yang@gmail.com",  # 作者邮箱
     description="A simple Python library for web crawler",  # 库的简短描述
@@ -0,0 +1,25 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 只在真正用到时才应该加载的依赖
+_HEAVY = ("curl_cffi", "requests", "redis", "openpyxl", "bs4", "lxml", "jsonpath_ng")
+
+
+class ImportTest(unittest.TestCase):
+
+    def test_import_does_not_load_heavy_dependencies(self):
+        # 在新的解释器中导入，当前进程可能已经加载了这些依赖
+        code = f"import json, sys; import pyoctopus; print(json.dumps([m for m in {_HEAVY!r} if m in sys.modules]))"
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [_ROOT, os.environ.get("PYTHONPATH")])))
+        out = subprocess.run([sys.executable, "-c", code], cwd=_ROOT, env=env, check=True, capture_output=True,
+                             text=True).stdout
+        self.assertEqual([], json.loads(out.strip().splitlines()[-1]))
+
+
+if __name__ == "__main__":
+    unittest.main()